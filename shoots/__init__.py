@@ -1,8 +1,10 @@
 from .shoots_server import ShootsServer
 from .shoots_client import ShootsClient, PutMode, BucketDeleteMode, DataFusionError, BucketNotEmptyError
+from .async_shoots_client import AsyncShootsClient
 
 __all__ = ['ShootsServer', 
            'ShootsClient', 
+           'AsyncShootsClient',
            'PutMode', 
            'BucketDeleteMode',
            'DataFusionError',
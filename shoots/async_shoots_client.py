@@ -0,0 +1,295 @@
+from typing import Optional, Union, List
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import os
+import pandas as pd
+import pyarrow as pa
+from .shoots_client import ShootsClient, PutMode, BucketDeleteMode
+
+class AsyncShootsClient:
+    """
+    Asyncio client class for interacting with a ShootsServer instance.
+
+    It has the same methods as ShootsClient, as coroutines. Flight calls block the thread that makes
+    them, so each call is run in a thread pool of the client, rather than on the event loop. The size of
+    the pool limits how many calls are in flight at once, further calls wait for one of them to finish.
+    The calls share one Flight connection, over which gRPC multiplexes them.
+    """
+    def __init__(self,
+                 host: str,
+                 port: int,
+                 tls: Optional[bool] = False,
+                 root_cert: Optional[str] = None,
+                 token: Optional[str] = None,
+                 max_concurrency: int = 8):
+        """
+        Initializes the AsyncShootsClient with the specified host, port, credentials, and secrets,
+        as for ShootsClient.
+
+        Args:
+            host (str): The hostname or IP address of the FlightServer.
+            port (int): The port number on which the FlightServer is listening.
+            tls (bool): Whether or not the server to connect to uses TLS.
+            root_cert (string): A root certificate used by the server for tls signing if the server is using self-signed tls.
+            token (string): A JWT to provide to the server. Requires TLS to be True.
+            max_concurrency (int): The most calls to the server that are in flight at once.
+
+        Raises:
+            ValueError: max_concurrency is less than 1.
+            ValidationError: Occurs:
+                 - If the provided host or port values are not valid
+                 - A token is provided but tls is False
+
+        Example:
+            To put several dataframes at once, from a coroutine:
+
+            ```python
+            client = AsyncShootsClient("localhost", 8081, max_concurrency=4)
+            await asyncio.gather(*[client.put(name, df, mode=PutMode.REPLACE) for name, df in dataframes.items()])
+            await client.close()
+            ```
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"Invalid max_concurrency {max_concurrency}, must be 1 or more")
+        # connecting and authenticating block, but only once
+        self.client = ShootsClient(host, port, tls=tls, root_cert=root_cert, token=token)
+        self.max_concurrency = max_concurrency
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="shoots-client")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """
+        Waits for the calls in flight to finish, and stops the client's threads.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+
+    async def _run(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(method, *args, **kwargs))
+
+    async def put(self,
+                  name: str,
+                  dataframe: Union[pd.DataFrame, pa.Table, pa.RecordBatch, pa.RecordBatchReader, str, os.PathLike],
+                  mode: PutMode = PutMode.ERROR,
+                  bucket: Optional[str] = None,
+                  batch_size: Optional[int] = 500000,
+                  partition_by: Optional[str] = None,
+                  partition_granularity: str = "day",
+                  compression: Optional[str] = None,
+                  compression_level: Optional[int] = None,
+                  row_group_rows: Optional[int] = None,
+                  use_dictionary: Optional[Union[bool, List[str]]] = None,
+                  write_statistics: Optional[Union[bool, List[str]]] = None):
+        """
+        Sends a dataframe to the server, see ShootsClient.put().
+        """
+        return await self._run(self.client.put,
+                               name,
+                               dataframe,
+                               mode=mode,
+                               bucket=bucket,
+                               batch_size=batch_size,
+                               partition_by=partition_by,
+                               partition_granularity=partition_granularity,
+                               compression=compression,
+                               compression_level=compression_level,
+                               row_group_rows=row_group_rows,
+                               use_dictionary=use_dictionary,
+                               write_statistics=write_statistics)
+
+    async def get(self, name: str,
+                  sql: Optional[str] = None,
+                  bucket: Optional[str] = None,
+                  columns: Optional[List[str]] = None,
+                  filter: Optional[list] = None,
+                  glob: Optional[str] = None):
+        """
+        Retrieves a dataframe from the server, see ShootsClient.get().
+        """
+        return await self._run(self.client.get,
+                               name,
+                               sql=sql,
+                               bucket=bucket,
+                               columns=columns,
+                               filter=filter,
+                               glob=glob)
+
+    async def get_arrow(self, name: str,
+                        sql: Optional[str] = None,
+                        bucket: Optional[str] = None,
+                        columns: Optional[List[str]] = None,
+                        filter: Optional[list] = None,
+                        glob: Optional[str] = None):
+        """
+        Retrieves a dataframe from the server as an Apache Arrow table, see ShootsClient.get_arrow().
+        """
+        return await self._run(self.client.get_arrow,
+                               name,
+                               sql=sql,
+                               bucket=bucket,
+                               columns=columns,
+                               filter=filter,
+                               glob=glob)
+
+    async def get_batches(self, name: str,
+                          sql: Optional[str] = None,
+                          bucket: Optional[str] = None,
+                          columns: Optional[List[str]] = None,
+                          filter: Optional[list] = None,
+                          glob: Optional[str] = None):
+        """
+        Retrieves a dataframe from the server as an async iterator of Apache Arrow record batches,
+        see ShootsClient.get_batches(). Each batch is read from the server in the client's thread pool.
+
+        Example:
+            ```python
+            async for batch in client.get_batches("my_dataframe"):
+                process(batch)
+            ```
+        """
+        batches = await self._run(self.client.get_batches,
+                                  name,
+                                  sql=sql,
+                                  bucket=bucket,
+                                  columns=columns,
+                                  filter=filter,
+                                  glob=glob)
+        try:
+            while True:
+                batch = await self._run(next, batches, None)
+                if batch is None:
+                    break
+                yield batch
+        finally:
+            batches.close()
+
+    async def info(self, name: str, sql: Optional[str] = None, bucket: Optional[str] = None):
+        """
+        Retrieves the metadata of a dataframe, see ShootsClient.info().
+        """
+        return await self._run(self.client.info, name, sql=sql, bucket=bucket)
+
+    async def schema(self, name: str, sql: Optional[str] = None, bucket: Optional[str] = None):
+        """
+        Retrieves the schema of a dataframe, see ShootsClient.schema().
+        """
+        return await self._run(self.client.schema, name, sql=sql, bucket=bucket)
+
+    async def buckets(self):
+        """
+        Lists the buckets on the server, see ShootsClient.buckets().
+        """
+        return await self._run(self.client.buckets)
+
+    async def delete_bucket(self, name: str, mode: BucketDeleteMode = BucketDeleteMode.ERROR):
+        """
+        Deletes a bucket, see ShootsClient.delete_bucket().
+        """
+        return await self._run(self.client.delete_bucket, name, mode=mode)
+
+    async def list(self, bucket: Optional[str] = None,
+                   regex: Optional[str] = None,
+                   prefix: Optional[str] = None,
+                   limit: Optional[int] = None,
+                   continuation_token: Optional[str] = None):
+        """
+        Lists the dataframes on the server, see ShootsClient.list().
+        """
+        return await self._run(self.client.list,
+                               bucket=bucket,
+                               regex=regex,
+                               prefix=prefix,
+                               limit=limit,
+                               continuation_token=continuation_token)
+
+    async def shutdown(self):
+        """
+        Sends a shutdown request to the server, see ShootsClient.shutdown().
+        """
+        return await self._run(self.client.shutdown)
+
+    async def delete(self, name: str, bucket: Optional[str] = None):
+        """
+        Deletes a dataframe, see ShootsClient.delete().
+        """
+        return await self._run(self.client.delete, name, bucket=bucket)
+
+    async def resample(self,
+                       source: str,
+                       target: str,
+                       rule: Optional[str] = None,
+                       time_col: Optional[str] = None,
+                       aggregation_func: Optional[str] = None,
+                       sql: Optional[str] = None,
+                       mode: Optional[PutMode] = PutMode.APPEND,
+                       source_bucket: Optional[str] = None,
+                       target_bucket: Optional[str] = None,
+                       incremental: bool = False):
+        """
+        Resamples data on the server, see ShootsClient.resample().
+        """
+        return await self._run(self.client.resample,
+                               source,
+                               target,
+                               rule=rule,
+                               time_col=time_col,
+                               aggregation_func=aggregation_func,
+                               sql=sql,
+                               mode=mode,
+                               source_bucket=source_bucket,
+                               target_bucket=target_bucket,
+                               incremental=incremental)
+
+    async def create_view(self,
+                          name: str,
+                          source: str,
+                          sql: Optional[str] = None,
+                          rule: Optional[str] = None,
+                          time_col: Optional[str] = None,
+                          aggregation_func: Optional[str] = None,
+                          bucket: Optional[str] = None,
+                          source_bucket: Optional[str] = None,
+                          refresh_lag: float = 0):
+        """
+        Creates a materialized view, see ShootsClient.create_view().
+        """
+        return await self._run(self.client.create_view,
+                               name,
+                               source,
+                               sql=sql,
+                               rule=rule,
+                               time_col=time_col,
+                               aggregation_func=aggregation_func,
+                               bucket=bucket,
+                               source_bucket=source_bucket,
+                               refresh_lag=refresh_lag)
+
+    async def drop_view(self, name: str, bucket: Optional[str] = None):
+        """
+        Stops refreshing a materialized view, see ShootsClient.drop_view().
+        """
+        return await self._run(self.client.drop_view, name, bucket=bucket)
+
+    async def views(self, bucket: Optional[str] = None):
+        """
+        Lists the materialized views in a bucket, see ShootsClient.views().
+        """
+        return await self._run(self.client.views, bucket=bucket)
+
+    async def ping(self):
+        """
+        Sends a 'ping' to the server, see ShootsClient.ping().
+        """
+        return await self._run(self.client.ping)
+
+    async def stats(self):
+        """
+        Retrieves counters from the server, see ShootsClient.stats().
+        """
+        return await self._run(self.client.stats)
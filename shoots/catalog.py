@@ -0,0 +1,94 @@
+import threading
+
+class DatasetInfo:
+    """
+    The metadata of a dataset, as read from the footers of its parquet files.
+
+    Attributes:
+        schema (pyarrow.Schema): The arrow schema of the dataset.
+        num_rows (int): The number of rows written to disk.
+        num_bytes (int): The size of the dataset's parquet files on disk.
+        num_row_groups (int): The number of row groups across all of the dataset's parquet files.
+        num_parts (int): The number of parquet files, 1 for a dataset stored as a single file.
+        column_bytes (dict): The uncompressed size of each top level column, by name.
+        writer_options (WriterOptions): The options the dataset's parquet files are written with.
+    """
+    def __init__(self, schema, num_rows, num_bytes, num_row_groups, num_parts, column_bytes=None, writer_options=None):
+        self.schema = schema
+        self.num_rows = num_rows
+        self.num_bytes = num_bytes
+        self.num_row_groups = num_row_groups
+        self.num_parts = num_parts
+        self.column_bytes = column_bytes or {}
+        self.writer_options = writer_options
+
+    def with_parts(self, parts_info):
+        """
+        Returns the metadata of the dataset once parts with the metadata parts_info are appended to it.
+        The appended parts have the dataset's columns, so the schema and writer options are kept.
+        """
+        column_bytes = dict(self.column_bytes)
+        for name, num_bytes in parts_info.column_bytes.items():
+            column_bytes[name] = column_bytes.get(name, 0) + num_bytes
+        return DatasetInfo(self.schema,
+                           self.num_rows + parts_info.num_rows,
+                           self.num_bytes + parts_info.num_bytes,
+                           self.num_row_groups + parts_info.num_row_groups,
+                           self.num_parts + parts_info.num_parts,
+                           column_bytes,
+                           self.writer_options)
+
+class Catalog:
+    """
+    An in-memory index of the buckets and datasets in the bucket directory, with the metadata of
+    each dataset, so that listing them doesn't touch the file system.
+
+    The server builds the catalog when it starts, and updates it as it writes and deletes datasets,
+    so changes made to the bucket directory by other processes aren't seen until it restarts.
+    Datasets outside of a bucket are stored under the bucket None.
+    """
+
+    def __init__(self):
+        self._buckets = {None:{}}
+        self._lock = threading.Lock()
+
+    def add_bucket(self, bucket):
+        with self._lock:
+            self._buckets.setdefault(bucket, {})
+
+    def remove_bucket(self, bucket):
+        with self._lock:
+            self._buckets.pop(bucket, None)
+
+    def has_bucket(self, bucket):
+        with self._lock:
+            return bucket in self._buckets
+
+    def buckets(self):
+        """
+        Returns the names of the buckets, in order.
+        """
+        with self._lock:
+            return sorted(bucket for bucket in self._buckets if bucket is not None)
+
+    def put(self, bucket, name, info):
+        with self._lock:
+            self._buckets.setdefault(bucket, {})[name] = info
+
+    def remove(self, bucket, name):
+        with self._lock:
+            self._buckets.get(bucket, {}).pop(name, None)
+
+    def get(self, bucket, name):
+        """
+        Returns the DatasetInfo of a dataset, or None if there is no such dataset.
+        """
+        with self._lock:
+            return self._buckets.get(bucket, {}).get(name)
+
+    def datasets(self, bucket):
+        """
+        Returns the names and DatasetInfos of the datasets in a bucket, in order of name.
+        """
+        with self._lock:
+            return sorted(self._buckets.get(bucket, {}).items(), key=lambda item: item[0])
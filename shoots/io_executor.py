@@ -0,0 +1,134 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+class _DatasetQueue:
+    """
+    The pending and running operations for one dataset.
+    """
+    def __init__(self, key):
+        self.key = key
+        self.pending = deque()
+        self.readers = 0
+        self.writing = False
+
+    def idle(self):
+        return not self.pending and not self.readers and not self.writing
+
+class IOExecutor:
+    """
+    Runs i/o operations on datasets with a bounded pool of worker threads.
+
+    Each dataset has its own queue, and operations on a dataset are started in the order they were
+    submitted. Read only operations run concurrently with each other, and any other operation runs
+    alone. A request is never overtaken by a later one, so a reader that arrives while a writer is
+    waiting queues behind the writer, and a steady stream of either readers or writers can't starve
+    the other.
+
+    Submitting to a dataset whose queue is full blocks until there is room, which pushes back on
+    the caller. Queues are dropped as soon as they are idle, so there is only an entry for each
+    dataset with operations in flight.
+    """
+
+    def __init__(self, max_workers=8, max_queue_depth=64):
+        """
+        Args:
+            max_workers (int): The number of worker threads that perform operations.
+            max_queue_depth (int): The number of operations that can wait in a dataset's queue before submit() blocks.
+        """
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self._workers = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shoots-io")
+        self._condition = threading.Condition()
+        self._queues = {}
+        self._shutdown = False
+
+    def submit(self, key, function, args, read_only=False):
+        """
+        Queues function(**args) as an operation on the dataset identified by key.
+
+        Blocks while the dataset's queue is full.
+
+        Returns:
+            concurrent.futures.Future: The result of the operation.
+
+        Raises:
+            RuntimeError: The executor has been shut down.
+        """
+        future = Future()
+        with self._condition:
+            while True:
+                if self._shutdown:
+                    raise RuntimeError("cannot queue an i/o operation after the executor has been shut down")
+                dataset_queue = self._queues.get(key)
+                if dataset_queue is None:
+                    dataset_queue = self._queues[key] = _DatasetQueue(key)
+                if len(dataset_queue.pending) < self.max_queue_depth:
+                    break
+                self._condition.wait()
+            dataset_queue.pending.append((function, args, read_only, future))
+            self._dispatch(dataset_queue)
+            if dataset_queue.idle():
+                # the operation couldn't be started, and has already failed
+                del self._queues[key]
+        return future
+
+    def run(self, key, function, args, read_only=False):
+        """
+        Queues an operation like submit(), and blocks until it is done, returning its result.
+        """
+        return self.submit(key, function, args, read_only).result()
+
+    def queue_depths(self):
+        """
+        Returns the number of waiting operations for each dataset with operations in flight.
+        """
+        with self._condition:
+            return {key: len(dataset_queue.pending) for key, dataset_queue in self._queues.items()}
+
+    def shutdown(self, wait=True):
+        with self._condition:
+            self._shutdown = True
+            # submitters waiting for room in a queue give up rather than wait forever
+            self._condition.notify_all()
+        self._workers.shutdown(wait=wait)
+
+    def _dispatch(self, dataset_queue):
+        # must be called while holding self._condition
+        while dataset_queue.pending and not dataset_queue.writing:
+            function, args, read_only, future = dataset_queue.pending[0]
+            if not read_only and dataset_queue.readers:
+                break
+            dataset_queue.pending.popleft()
+            if read_only:
+                dataset_queue.readers += 1
+            else:
+                dataset_queue.writing = True
+            try:
+                self._workers.submit(self._run_operation, dataset_queue, function, args, read_only, future)
+            except RuntimeError as e:
+                # the worker pool was shut down while the operation waited in the queue
+                if read_only:
+                    dataset_queue.readers -= 1
+                else:
+                    dataset_queue.writing = False
+                future.set_exception(e)
+        # wake any submitters waiting for room in the queue
+        self._condition.notify_all()
+
+    def _run_operation(self, dataset_queue, function, args, read_only, future):
+        try:
+            result = function(**args)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            with self._condition:
+                if read_only:
+                    dataset_queue.readers -= 1
+                else:
+                    dataset_queue.writing = False
+                self._dispatch(dataset_queue)
+                if dataset_queue.idle():
+                    del self._queues[dataset_queue.key]
@@ -0,0 +1,43 @@
+import threading
+import time
+
+class MemTable:
+    """
+    Buffers small appends to a dataset in memory, until they are flushed to disk as a single part.
+
+    The batches are not guarded by the MemTable, ShootsServer changes them while holding its memtables lock.
+    flush_lock is held for the whole of a flush, so the same batches are never flushed twice.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.appended_at = []
+        self.num_rows = 0
+        self.nbytes = 0
+        self.flush_lock = threading.Lock()
+
+    def append(self, batches):
+        now = time.monotonic()
+        for batch in batches:
+            self.batches.append(batch)
+            self.appended_at.append(now)
+            self.num_rows += batch.num_rows
+            self.nbytes += batch.nbytes
+
+    def remove_flushed(self, num_batches):
+        """
+        Removes the first num_batches batches, once they have been committed to disk.
+        """
+        for batch in self.batches[:num_batches]:
+            self.num_rows -= batch.num_rows
+            self.nbytes -= batch.nbytes
+        self.batches = self.batches[num_batches:]
+        self.appended_at = self.appended_at[num_batches:]
+
+    def age(self):
+        """
+        Returns the number of seconds since the oldest buffered batch was appended.
+        """
+        if not self.appended_at:
+            return 0
+        return time.monotonic() - self.appended_at[0]
@@ -0,0 +1,127 @@
+import os
+import json
+import pyarrow as pa
+import pyarrow.parquet as pq
+import fastparquet as fp
+
+compressions = ["none", "snappy", "gzip", "brotli", "lz4", "zstd"]
+
+# the key of the writer options in the key-value metadata of a parquet file
+writer_options_key = b"shoots.writer_options"
+
+class WriterOptions:
+    """
+    Options for writing the parquet files of a dataset. Options that are None are left to the write engine's defaults.
+
+    Attributes:
+        compression (str): The compression codec, one of none, snappy, gzip, brotli, lz4 or zstd.
+        compression_level (int): The compression level, for the codecs that have levels.
+        row_group_rows (int): The target number of rows per row group.
+        use_dictionary (bool or list): Whether to dictionary encode columns, or the names of the columns to dictionary encode.
+            Only applies to the pyarrow write engine, fastparquet only dictionary encodes categorical columns.
+        write_statistics (bool or list): Whether to write column statistics, or the names of the columns to write them for.
+    """
+    def __init__(self, compression=None, compression_level=None, row_group_rows=None, use_dictionary=None, write_statistics=None):
+        if compression is not None and compression not in compressions:
+            raise ValueError(f"Invalid compression {compression}, expected one of {compressions}")
+        if row_group_rows is not None and (not isinstance(row_group_rows, int) or row_group_rows < 1):
+            raise ValueError(f"row_group_rows must be a positive integer, got {row_group_rows}")
+        self.compression = compression
+        self.compression_level = compression_level
+        self.row_group_rows = row_group_rows
+        self.use_dictionary = use_dictionary
+        self.write_statistics = write_statistics
+
+    @classmethod
+    def from_dict(cls, options_info):
+        return cls(**(options_info or {}))
+
+    @classmethod
+    def from_parquet_metadata(cls, metadata):
+        """
+        Returns the writer options stored in the key-value metadata of a parquet file, or the defaults if there aren't any.
+        """
+        if metadata.metadata is None or writer_options_key not in metadata.metadata:
+            return cls()
+        return cls.from_dict(json.loads(metadata.metadata[writer_options_key]))
+
+    def to_dict(self):
+        return {name:value for name, value in vars(self).items() if value is not None}
+
+    def merge(self, defaults):
+        """
+        Returns these options, with the options that are None taken from defaults.
+        """
+        return WriterOptions.from_dict({**defaults.to_dict(), **self.to_dict()})
+
+class ParquetPartWriter:
+    """
+    Writes the row groups of a single put to a new parquet file, with either write engine.
+
+    The file is written in full before it is committed to a dataset, so readers never see it while it is incomplete.
+    The writer options are stored in the file's key-value metadata, so that later writes to the dataset can reuse them.
+    """
+
+    def __init__(self, path, write_engine, row_group_rows, options=None):
+        """
+        Args:
+            path (str): The path of the file to write.
+            write_engine (str): Either "fastparquet" or "pyarrow".
+            row_group_rows (int): The maximum number of rows per row group, unless the options set it.
+            options (WriterOptions): The options to write the file with.
+        """
+        self.path = path
+        self.write_engine = write_engine
+        self.options = options or WriterOptions()
+        self.row_group_rows = self.options.row_group_rows or row_group_rows
+        self.num_rows = 0
+        self.started = False
+        self._writer = None
+
+    def write(self, data_table):
+        """
+        Writes an arrow table or record batch to the end of the file.
+        """
+        if isinstance(data_table, pa.RecordBatch):
+            data_table = pa.Table.from_batches([data_table])
+        options = self.options
+        if self.write_engine == "pyarrow":
+            if self._writer is None:
+                schema = data_table.schema.with_metadata({**(data_table.schema.metadata or {}),
+                                                          writer_options_key:json.dumps(options.to_dict())})
+                engine_options = {"compression":options.compression,
+                                  "compression_level":options.compression_level,
+                                  "use_dictionary":options.use_dictionary,
+                                  "write_statistics":options.write_statistics}
+                self._writer = pq.ParquetWriter(self.path, 
+                                                schema,
+                                                **{name:value for name, value in engine_options.items() if value is not None})
+            self._writer.write_table(data_table, row_group_size=self.row_group_rows)
+        else:
+            compression = None
+            if options.compression not in (None, "none"):
+                compression = options.compression.upper()
+                if options.compression_level is not None:
+                    compression = {"_default":{"type":compression, "args":{"level":options.compression_level}}}
+            fp.write(self.path,
+                     data_table.to_pandas(),
+                     row_group_offsets=self.row_group_rows,
+                     compression=compression,
+                     stats="auto" if options.write_statistics is None else options.write_statistics,
+                     custom_metadata=None if self.started else {writer_options_key.decode():json.dumps(options.to_dict())},
+                     append=self.started)
+        self.started = True
+        self.num_rows += data_table.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def discard(self):
+        """
+        Closes and removes a file that won't be committed.
+        """
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,122 @@
+import datetime
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# the format of the partition value for each granularity
+granularities = {"hour":"%Y-%m-%dT%H",
+                 "day":"%Y-%m-%d",
+                 "month":"%Y-%m",
+                 "year":"%Y"}
+
+# the partition of rows with a null partition column
+null_partition = "__HIVE_DEFAULT_PARTITION__"
+
+class Partitioning:
+    """
+    Splits the rows of a dataset into hive style partition directories by a time column,
+    e.g. timestamp_day=2024-01-31, so that reads with a filter on the column can skip the
+    partitions that can't match.
+
+    Timestamps with a time zone are partitioned by their UTC time.
+
+    Attributes:
+        column (str): The name of the timestamp or date column to partition by.
+        granularity (str): The length of time in a partition, one of hour, day, month or year.
+    """
+    def __init__(self, column, granularity="day"):
+        if granularity not in granularities:
+            raise ValueError(f"Invalid partition granularity {granularity}, expected one of {list(granularities)}")
+        self.column = column
+        self.granularity = granularity
+
+    @classmethod
+    def from_dict(cls, partitioning_info):
+        if partitioning_info is None:
+            return None
+        return cls(partitioning_info["column"], partitioning_info.get("granularity", "day"))
+
+    def to_dict(self):
+        return {"column":self.column, "granularity":self.granularity}
+
+    def split(self, table):
+        """
+        Returns the rows of an arrow table grouped by partition, as a dict of partition directory names to tables.
+        """
+        if self.column not in table.column_names:
+            raise ValueError(f"No partition column {self.column}")
+        column = table.column(self.column)
+        if pa.types.is_date(column.type):
+            column = column.cast(pa.timestamp("s"))
+        elif pa.types.is_timestamp(column.type):
+            column = column.cast(pa.timestamp(column.type.unit))
+        else:
+            raise ValueError(f"The partition column {self.column} must be a timestamp or a date, not {column.type}")
+
+        values = pc.fill_null(pc.strftime(column, format=granularities[self.granularity]), null_partition)
+        partitions = {}
+        for value in pc.unique(values).to_pylist():
+            partitions[self.directory(value)] = table.filter(pc.equal(values, value))
+        return partitions
+
+    def directory(self, value):
+        return f"{self.column}_{self.granularity}={value}"
+
+    def bounds(self, directory):
+        """
+        Returns the start and the exclusive end of the time range of a partition directory,
+        or None for the partition of null values.
+        """
+        value = directory.split("=", 1)[1]
+        if value == null_partition:
+            return None
+        start = datetime.datetime.strptime(value, granularities[self.granularity])
+        if self.granularity == "hour":
+            end = start + datetime.timedelta(hours=1)
+        elif self.granularity == "day":
+            end = start + datetime.timedelta(days=1)
+        elif self.granularity == "month":
+            end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+        else:
+            end = start.replace(year=start.year + 1)
+        return start, end
+
+    def may_match(self, directory, filters, column_type):
+        """
+        Returns False if the rows of a partition directory can't match the [column, operator, value]
+        comparisons of a filter, which must all be true. Values are cast to the column's type, and
+        comparisons that can't be evaluated against the partition don't rule it out.
+        """
+        bounds = self.bounds(directory)
+        for comparison in filters:
+            if len(comparison) != 3 or comparison[0] != self.column:
+                continue
+            _, operator, value = comparison
+            # nulls only match not in
+            if bounds is None:
+                if operator != "not in":
+                    return False
+                continue
+            start, end = bounds
+            try:
+                if operator in ("in", "not in"):
+                    values = [self._to_datetime(v, column_type) for v in value]
+                else:
+                    value = self._to_datetime(value, column_type)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, TypeError):
+                continue
+            if operator in ("=", "==") and not start <= value < end:
+                return False
+            if operator == "<" and not start < value:
+                return False
+            if operator == "<=" and not start <= value:
+                return False
+            if operator in (">", ">=") and not value < end:
+                return False
+            if operator == "in" and not any(start <= v < end for v in values):
+                return False
+        return True
+
+    def _to_datetime(self, value, column_type):
+        # the same conversion as the rows get, a UTC timestamp without a time zone
+        scalar = pa.scalar(value).cast(column_type)
+        return scalar.cast(pa.timestamp("us")).as_py()
@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+
+class Registration:
+    """
+    A DataFusion SessionContext with a version of a dataset registered as a table.
+
+    Attributes:
+        ctx (datafusion.SessionContext): The context the table is registered in.
+        version: The version of the dataset that is registered.
+    """
+    def __init__(self, ctx, version):
+        self.ctx = ctx
+        self.version = version
+
+class RegistrationCache:
+    """
+    Keeps the SessionContext for recently queried datasets, so that queries against a dataset that
+    hasn't changed skip reading its parquet footers and inferring its schema.
+
+    A registration is only returned for the version of the dataset it was created for, and the
+    least recently used registrations are evicted once there are more than max_entries.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._registrations = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, key, version):
+        """
+        Returns the registration for the given version of a dataset, or None if there isn't one.
+        """
+        with self._lock:
+            registration = self._registrations.get(key)
+            if registration is not None and registration.version != version:
+                del self._registrations[key]
+                self.invalidations += 1
+                registration = None
+            if registration is None:
+                self.misses += 1
+                return None
+            self._registrations.move_to_end(key)
+            self.hits += 1
+            return registration
+
+    def put(self, key, registration):
+        with self._lock:
+            self._registrations[key] = registration
+            self._registrations.move_to_end(key)
+            while len(self._registrations) > self.max_entries:
+                self._registrations.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """
+        Drops the registration for a dataset that has changed, so the files it pins can be freed.
+        """
+        with self._lock:
+            if self._registrations.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {"entries":len(self._registrations),
+                    "hits":self.hits,
+                    "misses":self.misses,
+                    "invalidations":self.invalidations,
+                    "evictions":self.evictions}
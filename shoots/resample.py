@@ -0,0 +1,104 @@
+import re
+import pyarrow as pa
+
+# the DataFusion interval unit of each pandas offset alias, including the deprecated aliases
+rule_units = {"ns":"nanoseconds", "N":"nanoseconds",
+              "us":"microseconds", "U":"microseconds",
+              "ms":"milliseconds", "L":"milliseconds",
+              "s":"seconds", "S":"seconds",
+              "min":"minutes", "T":"minutes",
+              "h":"hours", "H":"hours",
+              "D":"days", "d":"days",
+              "MS":"months",
+              "YS":"years", "AS":"years"}
+
+# the DataFusion aggregate of each pandas aggregation function, {column} and {time_col} are quoted identifiers
+aggregations = {"mean":"avg({column})",
+                "sum":"sum({column})",
+                "min":"min({column})",
+                "max":"max({column})",
+                "count":"count({column})",
+                "first":"first_value({column} IGNORE NULLS ORDER BY {time_col})",
+                "last":"last_value({column} IGNORE NULLS ORDER BY {time_col})",
+                "median":"median({column})",
+                "std":"stddev({column})",
+                "var":"var_samp({column})",
+                "nunique":"count(DISTINCT {column})"}
+
+# aggregations that, like pandas, skip the columns that aren't numeric
+numeric_aggregations = ["mean", "sum", "median", "std", "var"]
+
+class Resample:
+    """
+    Downsamples a time series into fixed time bins, the same as pandas'
+    ```DataFrame.resample(rule).<aggregation_func>()```, as a DataFusion ```date_bin``` and
+    group by query, so that the source is streamed rather than read into memory.
+
+    Bins start at multiples of the rule since the unix epoch, and are labelled by their start.
+    Unlike pandas, bins without any rows are left out rather than filled with nulls.
+
+    Attributes:
+        rule (str): A pandas offset alias, e.g. 10s, 15min, 1h, 1D or 1MS.
+        time_col (str): The name of the timestamp column to bin by.
+        aggregation_func (str): The name of the pandas aggregation, e.g. mean, max or count.
+    """
+    def __init__(self, rule, time_col, aggregation_func):
+        if aggregation_func not in aggregations:
+            raise ValueError(f"Invalid aggregation function {aggregation_func}, expected one of {list(aggregations)}")
+        self.interval = self._interval(rule)
+        self.rule = rule
+        self.time_col = time_col
+        self.aggregation_func = aggregation_func
+
+    @classmethod
+    def from_dict(cls, resample_info):
+        return cls(resample_info["rule"], resample_info["time_col"], resample_info["aggregation_func"])
+
+    def to_dict(self):
+        return {"rule":self.rule, "time_col":self.time_col, "aggregation_func":self.aggregation_func}
+
+    def _interval(self, rule):
+        match = re.fullmatch(r"\s*(\d*)\s*([A-Za-z]+)\s*", rule or "")
+        if match is None or match.group(2) not in rule_units or match.group(1) == "0":
+            raise ValueError(f"Invalid resample rule {rule}, expected a number and one of {list(rule_units)}")
+        return f"{match.group(1) or 1} {rule_units[match.group(2)]}"
+
+    def query(self, table, schema, since=None):
+        """
+        Returns the SQL query that resamples a table with the given arrow schema.
+
+        If since is given, only the rows from that time on are resampled. It should be the start of
+        a bin, as an arrow timestamp cast to a string, so that the first bin is complete.
+        """
+        if self.time_col not in schema.names:
+            raise ValueError(f"No time column {self.time_col}")
+        if not pa.types.is_timestamp(schema.field(self.time_col).type):
+            raise ValueError(f"The time column {self.time_col} must be a timestamp, not {schema.field(self.time_col).type}")
+
+        time_col = quote(self.time_col)
+        columns = [f"date_bin(INTERVAL '{self.interval}', {time_col}, TIMESTAMP '1970-01-01T00:00:00') AS {time_col}"]
+        for field in schema:
+            if field.name == self.time_col:
+                continue
+            if self.aggregation_func in numeric_aggregations and not _is_numeric(field.type):
+                continue
+            aggregation = aggregations[self.aggregation_func].format(column=quote(field.name), time_col=time_col)
+            columns.append(f"{aggregation} AS {quote(field.name)}")
+
+        condition = f"{time_col} IS NOT NULL"
+        if since is not None:
+            # DataFusion casts the string to the column's type, and skips the row groups before it by their statistics
+            condition = f"{time_col} >= '{since}'"
+
+        # DataFusion lower cases the names that tables are registered with
+        return (f"SELECT {', '.join(columns)} FROM {quote(table.lower())} "
+                f"WHERE {condition} GROUP BY 1 ORDER BY 1")
+
+def quote(identifier):
+    """
+    Quotes a table or column name for DataFusion SQL, which keeps its case.
+    """
+    return '"' + identifier.replace('"', '""') + '"'
+
+def _is_numeric(data_type):
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_decimal(data_type)
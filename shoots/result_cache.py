@@ -0,0 +1,108 @@
+import re
+import threading
+from collections import OrderedDict
+
+# queries calling these functions can return a different result each time they run
+volatile_functions = re.compile(r"\b(now|random|uuid|current_date|current_time|current_timestamp)\b", re.IGNORECASE)
+
+def normalize_sql(sql):
+    """
+    Collapses the whitespace outside of quotes and drops a trailing semicolon, so that
+    queries that only differ in formatting share a cache entry.
+    """
+    normalized = []
+    quote = None
+    in_whitespace = False
+    for char in sql.strip().rstrip(";").strip():
+        if quote is None and char.isspace():
+            in_whitespace = True
+            continue
+        if in_whitespace:
+            normalized.append(" ")
+            in_whitespace = False
+        if quote is None and char in ("'", '"'):
+            quote = char
+        elif char == quote:
+            quote = None
+        normalized.append(char)
+    return "".join(normalized)
+
+def is_cacheable(sql):
+    return volatile_functions.search(sql) is None
+
+class ResultCache:
+    """
+    Caches the results of SQL queries as arrow tables, within a budget of max_bytes.
+
+    Entries are keyed by the dataset, its version, and the normalized SQL, so a result is never
+    returned for a version of the dataset other than the one it was computed from. The result of
+    a query over several datasets is keyed by a tuple of them, and a tuple of their versions. The least
+    recently used entries are evicted to stay within the budget. A result larger than max_entry_bytes isn't
+    cached, so that one large result neither evicts the others nor has to be buffered whole to be cached.
+    """
+
+    def __init__(self, max_bytes, max_entry_bytes=None):
+        """
+        Args:
+            max_bytes (int): The most bytes of results to keep. 0 disables the cache.
+            max_entry_bytes (int): The most bytes of a single result to keep. Defaults to an eighth of max_bytes.
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 8 if max_entry_bytes is None else min(max_entry_bytes, max_bytes)
+        self.nbytes = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, dataset, version, sql):
+        """
+        Returns the cached result of a query, or None if it isn't cached.
+        """
+        key = (dataset, version, normalize_sql(sql))
+        with self._lock:
+            table = self._results.get(key)
+            if table is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return table
+
+    def put(self, dataset, version, sql, table):
+        if table.nbytes > self.max_entry_bytes or not is_cacheable(sql):
+            return
+        key = (dataset, version, normalize_sql(sql))
+        with self._lock:
+            previous = self._results.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            self._results[key] = table
+            self.nbytes += table.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._results.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def invalidate(self, dataset):
+        """
+        Drops the cached results for a dataset that has changed, including those of queries over several datasets.
+        """
+        with self._lock:
+            for key in [key for key in self._results if key[0] == dataset
+                        or (isinstance(key[0], tuple) and dataset in key[0])]:
+                self.nbytes -= self._results.pop(key).nbytes
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {"entries":len(self._results),
+                    "bytes":self.nbytes,
+                    "max_bytes":self.max_bytes,
+                    "max_entry_bytes":self.max_entry_bytes,
+                    "hits":self.hits,
+                    "misses":self.misses,
+                    "evictions":self.evictions,
+                    "invalidations":self.invalidations}
@@ -1,10 +1,12 @@
 from pydantic import BaseModel, ValidationError, validator, model_validator
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Optional, Union, List, Tuple, Any
 import pyarrow as pa
+import pyarrow.parquet as pq
 from pyarrow.flight import FlightDescriptor, FlightClient, Ticket, Action, FlightServerError
 import pandas as pd
 import json
+import os
 from enum import Enum
 from .jwt_client_auth_handler import JWTClientAuthHandler
 
@@ -76,19 +78,27 @@ class PutRequest(BaseModel):
     """
     Internal class for configuring a put request
     """
-    dataframe: pd.DataFrame
+    dataframe: Any
     name: str
     mode: PutMode = PutMode.APPEND
     bucket: Optional[str] = None
     batch_size: Optional[int] = 500000
+    partition_by: Optional[str] = None
+    partition_granularity: str = "day"
+    compression: Optional[str] = None
+    compression_level: Optional[int] = None
+    row_group_rows: Optional[int] = None
+    use_dictionary: Optional[Union[bool, List[str]]] = None
+    write_statistics: Optional[Union[bool, List[str]]] = None
 
     class Config:
         arbitrary_types_allowed = True
 
     @validator('dataframe')
     def validate_dataframe(cls, v):
-        if not isinstance(v, pd.DataFrame):
-            raise ValueError('table must be a pandas DataFrame')
+        if not isinstance(v, (pd.DataFrame, pa.Table, pa.RecordBatch, pa.RecordBatchReader, str, os.PathLike)):
+            raise ValueError('dataframe must be a pandas DataFrame, an arrow Table, RecordBatch or RecordBatchReader, '
+                             'or the path of a parquet file')
         return v
 
 class ListRequest(BaseModel):
@@ -111,6 +121,7 @@ class ResampleRequest(BaseModel):
     source_bucket: Optional[str] = None
     target_bucket_bucket: Optional[str] = None
     sql: Optional[str] = None
+    incremental: bool = False
 
     @model_validator(mode='before')
     def check_sql_and_fields(cls, values):
@@ -119,6 +130,8 @@ class ResampleRequest(BaseModel):
         time_col = values.get('time_col')
         aggregation_func = values.get('aggregation_func')
 
+        if sql is not None and values.get('incremental'):
+            raise ValueError("incremental resampling requires a rule, time_col and aggregation_func rather than sql")
         if sql is None:
             if rule is None or time_col is None or aggregation_func is None:
                 raise ValueError("rule, time_col, and aggregation_func are required if sql is not provided")
@@ -129,6 +142,30 @@ class ResampleRequest(BaseModel):
 
         return values
 
+class ViewRequest(BaseModel):
+    """
+    Internal class for configuring a create_view request.
+    """
+    name: str
+    source: str
+    sql: Optional[str] = None
+    rule: Optional[str] = None
+    time_col: Optional[str] = None
+    aggregation_func: Optional[str] = None
+    bucket: Optional[str] = None
+    source_bucket: Optional[str] = None
+    refresh_lag: float = 0
+
+    @model_validator(mode='before')
+    def check_sql_or_resample(cls, values):
+        resample = [values.get('rule'), values.get('time_col'), values.get('aggregation_func')]
+        if values.get('sql') is None:
+            if None in resample:
+                raise ValueError("rule, time_col, and aggregation_func are required if sql is not provided")
+        elif resample != [None, None, None]:
+            raise ValueError("a view is defined by either sql, or rule, time_col and aggregation_func")
+        return values
+
 class GetRequest(BaseModel):
     """
     Internal class for configuring a get request.
@@ -136,6 +173,9 @@ class GetRequest(BaseModel):
     name: str
     sql: Optional[str] = None
     bucket: Optional[str] = None
+    columns: Optional[List[str]] = None
+    filter: Optional[List[Tuple[str, str, Any]]] = None
+    glob: Optional[str] = None
 
     @validator('name')
     def validate_name(cls, v):
@@ -143,6 +183,14 @@ class GetRequest(BaseModel):
             raise ValueError('name must be a non-empty string')
         return v
 
+    @model_validator(mode='before')
+    def check_sql_or_pushdown(cls, values):
+        if values.get('sql') is not None and (values.get('columns') is not None or values.get('filter')):
+            raise ValueError("columns and filter can't be combined with sql, select the columns in the sql instead")
+        if values.get('glob') is not None and (values.get('columns') is not None or values.get('filter')):
+            raise ValueError("columns and filter can't be combined with a glob, select the columns in the sql instead")
+        return values
+
 class ShootsIOError(Exception):
     """Custom exception for DataFusion-related errors."""
     def __init__(self, message):
@@ -246,10 +294,17 @@ class ShootsClient:
 
     def put(self, 
             name: str, 
-            dataframe: pd.DataFrame, 
+            dataframe: Union[pd.DataFrame, pa.Table, pa.RecordBatch, pa.RecordBatchReader, str, os.PathLike], 
             mode: PutMode = PutMode.ERROR,
             bucket: Optional[str] = None,
-            batch_size: Optional[int] = 500000):
+            batch_size: Optional[int] = 500000,
+            partition_by: Optional[str] = None,
+            partition_granularity: str = "day",
+            compression: Optional[str] = None,
+            compression_level: Optional[int] = None,
+            row_group_rows: Optional[int] = None,
+            use_dictionary: Optional[Union[bool, List[str]]] = None,
+            write_statistics: Optional[Union[bool, List[str]]] = None):
         """
         Sends a dataframe to the server to be stored or appended to an existing dataframe.
 
@@ -259,20 +314,40 @@ class ShootsClient:
         is sent to a specified bucket, which is a logical grouping or directory on the 
         server.
 
+        Arrow data is sent as it is, without a conversion to pandas. A RecordBatchReader or parquet file
+        is read a batch at a time as it is sent, so the client never holds more than a batch of it, 
+        however large it is.
+
         Args:
             name (str): The name of the datafra e to which the data will be written.
-            dataframe (pd.DataFrame): The pandas DataFrame containing the data to be sent.
+            dataframe (Union[pd.DataFrame, pa.Table, pa.RecordBatch, pa.RecordBatchReader, str, os.PathLike]): The data to be sent, 
+                            as a pandas DataFrame, an arrow Table, RecordBatch or RecordBatchReader, or the path of a parquet file.
             mode (PutMode): The mode of operation when writing the data. The default mode 
                             is ERROR, which will raise an error if the dataframe already exists. 
                             Other modes are REPLACE and APPEND.
             bucket (Optional[str]): The name of the bucket where the dataframe will be stored. 
                                     If None, a default bucket may be used.
             batch_size(Optional[int]): The number of rows to write per batch. May be useful for optimizing write performance or memory on the server or client. Default is 5,000 rows.
+            partition_by (Optional[str]): A timestamp or date column to partition the dataframe by on the server, so that 
+                                    reads filtering on the column skip the partitions that can't match. Only applies
+                                    when the put creates or replaces the dataframe, appends follow the existing partitioning.
+            partition_granularity (str): The length of time in a partition, one of hour, day (the default), month or year.
+            compression (Optional[str]): The compression codec of the parquet files, one of none, snappy, gzip, brotli, lz4 or zstd.
+            compression_level (Optional[int]): The compression level, for the codecs that have levels.
+            row_group_rows (Optional[int]): The target number of rows per parquet row group.
+            use_dictionary (Optional[Union[bool, List[str]]]): Whether to dictionary encode columns, or the names of the columns 
+                                    to dictionary encode, which suits repetitive strings. Only applies with the pyarrow write engine.
+            write_statistics (Optional[Union[bool, List[str]]]): Whether to write column statistics, or the names of the columns to write them for.
+                                    The writer options that aren't set are taken from the dataframe when appending, and otherwise 
+                                    from the server's defaults. They are stored with the dataframe, so later appends reuse them.
 
         Raises:
             ValidationError: If the provided arguments are not valid or if there is a 
                             problem with the DataFrame format.
             FileExistsError: If the dataframe already exists and the put mode was set to ERROR.
+            FileNotFoundError: If the parquet file to send doesn't exist.
+            ValueError: If the partition column is missing or isn't a timestamp or date, the granularity is invalid,
+                        or a writer option is invalid.
             FlightServerError: Unhandled errors encountered on the server while trying to write.
 
         Example:
@@ -283,6 +358,12 @@ class ShootsClient:
             client = ShootsClient("localhost", 8080)
             client.put(name="my_dataframe", dataframe=df, mode=PutMode.REPLACE, bucket="my_bucket")
             ```
+
+            To upload a parquet file, however large, without reading all of it into memory:
+
+            ```python
+            client.put(name="my_dataframe", dataframe="/data/export.parquet", mode=PutMode.REPLACE)
+            ```
         
         Note:
             If no bucket is specified, the dataframe will be available in the default, unnamed, bucket.
@@ -294,32 +375,84 @@ class ShootsClient:
                              name=name, 
                              mode=mode, 
                              bucket=bucket, 
-                             batch_size=batch_size)
+                             batch_size=batch_size,
+                             partition_by=partition_by,
+                             partition_granularity=partition_granularity,
+                             compression=compression,
+                             compression_level=compression_level,
+                             row_group_rows=row_group_rows,
+                             use_dictionary=use_dictionary,
+                             write_statistics=write_statistics)
+
+            partitioning = None
+            if req.partition_by is not None:
+                partitioning = {"column":req.partition_by, "granularity":req.partition_granularity}
+
+            writer_options = {"compression":req.compression,
+                              "compression_level":req.compression_level,
+                              "row_group_rows":req.row_group_rows,
+                              "use_dictionary":req.use_dictionary,
+                              "write_statistics":req.write_statistics}
 
             command_info = json.dumps({"name": req.name,
                                  "mode": req.mode.value,
                                  "bucket":req.bucket,
-                                 "batch_size":req.batch_size}).encode()
+                                 "batch_size":req.batch_size,
+                                 "partitioning":partitioning,
+                                 "writer_options":{name:value for name, value in writer_options.items() if value is not None}}).encode()
             
             descriptor = FlightDescriptor.for_command(command_info)
-            table = pa.Table.from_pandas(req.dataframe)
+            schema, batches = self._put_batches(req.dataframe, req.batch_size)
 
             try:
-                writer, _ = self.client.do_put(descriptor, table.schema)
+                writer, _ = self.client.do_put(descriptor, schema)
                 
-                row_count = table.num_rows
                 with writer:
-                    for start_idx in range(0, row_count, batch_size):
-                        end_idx = min(start_idx + batch_size, row_count)
-                        chunk = table.slice(start_idx, end_idx - start_idx)
-                        writer.write_table(chunk)
+                    for batch in batches:
+                        writer.write_batch(batch)
             except FlightServerError as e:
                 raise self._translate_flight_error(e)
                 
         except ValidationError as e:
             print(f"Validation error: {e}")
 
-    def get(self, name: str, sql: Optional[str] = None, bucket: Optional[str] = None):
+    def _put_batches(self, data, batch_size):
+        """
+        Returns the schema of the data to put, and an iterator of its record batches of at most batch_size rows.
+        Tables are sliced without copying, and readers and parquet files are read as the batches are consumed.
+        """
+        if isinstance(data, pd.DataFrame):
+            data = pa.Table.from_pandas(data)
+        elif isinstance(data, pa.RecordBatch):
+            data = pa.Table.from_batches([data])
+
+        if isinstance(data, pa.Table):
+            return data.schema, iter(data.to_batches(max_chunksize=batch_size))
+        if isinstance(data, pa.RecordBatchReader):
+            return data.schema, self._slice_batches(data, batch_size)
+        parquet_file = pq.ParquetFile(data)
+        return parquet_file.schema_arrow, self._iter_parquet_file(parquet_file, batch_size)
+
+    def _slice_batches(self, batches, batch_size):
+        for batch in batches:
+            if batch_size is None or batch.num_rows <= batch_size:
+                yield batch
+                continue
+            for offset in range(0, batch.num_rows, batch_size):
+                yield batch.slice(offset, batch_size)
+
+    def _iter_parquet_file(self, parquet_file, batch_size):
+        with parquet_file:
+            # only one row group is read into memory at a time
+            for batch in parquet_file.iter_batches(**({"batch_size":batch_size} if batch_size else {})):
+                yield batch
+
+    def get(self, name: str, 
+            sql: Optional[str] = None,
+            bucket: Optional[str] = None,
+            columns: Optional[List[str]] = None,
+            filter: Optional[list] = None,
+            glob: Optional[str] = None):
         """
         Retrieves a dataframe from the server based on the specified dataframe name, optional SQL query, and bucket.
 
@@ -327,12 +460,26 @@ class ShootsClient:
         or a subset of it if an SQL query is provided. The data is returned as a pandas DataFrame.
         If a bucket is specified, it retrieves the data from that particular bucket.
 
+        Without SQL, a subset can be retrieved with columns and filter, which the server pushes into
+        its parquet reader, so that the other columns are never read and row groups that can't 
+        match the filter are skipped.
+
+        With a glob, all of the dataframes in the bucket whose names match it are read by the server
+        as a single dataframe, which the SQL refers to by the given name. Columns that only some of the
+        dataframes have are null in the rows of the others.
+
         Args:
             name (str): The name of the dataframe to retrieve.
             sql (Optional[str]): An optional SQL query string to filter the dataframe. If None, 
                                 the entire dataframe is retrieved.
             bucket (Optional[str]): The name of the bucket where the dataframe is stored. If None, 
                                     a default bucket is assumed.
+            columns (Optional[List[str]]): The columns to retrieve. If None, all of the columns are retrieved.
+            filter (Optional[list]): Comparisons that the retrieved rows must all match, as (column, operator, value)
+                                    tuples, where the operator is one of =, ==, !=, <, <=, >, >=, in or not in.
+                                    Values are converted to the type of the column, so timestamps can be strings.
+            glob (Optional[str]): A pattern of dataframe names, e.g. "day_*" or "*" for the whole bucket,
+                                    whose dataframes are retrieved together under the given name.
 
         Returns:
             pd.DataFrame: A DataFrame containing the retrieved data.
@@ -352,17 +499,27 @@ class ShootsClient:
             client = ShootsClient("localhost", 8080)
             df = client.get(name="my_dataframe", sql="SELECT * FROM my_dataframe WHERE condition", bucket="my_bucket")
             ```
+
+            To retrieve two columns of the rows after a point in time, without SQL:
+
+            ```python
+            df = client.get(name="my_dataframe", 
+                            columns=["timestamp", "value"],
+                            filter=[("timestamp", ">=", "2024-01-01 00:00:00")])
+            ```
+
+            To query the dataframes of every day in January, stored as day_2024-01-01 etc., in one go:
+
+            ```python
+            df = client.get(name="january",
+                            glob="day_2024-01-*",
+                            sql="SELECT date_trunc('day', timestamp) AS day, avg(value) FROM january GROUP BY 1",
+                            bucket="days")
+            ```
         """
         try:
-            req = GetRequest(name=name, sql=sql, bucket=bucket)
-            ticket_info = {"name":req.name, "bucket":req.bucket}
-            if sql is not None:
-                ticket_info["sql"] = req.sql
-
-            ticket_bytes = json.dumps(ticket_info)
-            ticket = Ticket(ticket_bytes)
+            reader = self._do_get(name, sql, bucket, columns, filter, glob)
             try:
-                reader = self.client.do_get(ticket)
                 df = reader.read_all().to_pandas()
                 return df
             except FlightServerError as e:
@@ -371,6 +528,188 @@ class ShootsClient:
         except ValidationError as e:
             print(f"Validation error: {e}")
 
+    def get_arrow(self, name: str,
+                  sql: Optional[str] = None,
+                  bucket: Optional[str] = None,
+                  columns: Optional[List[str]] = None,
+                  filter: Optional[list] = None,
+                  glob: Optional[str] = None):
+        """
+        Retrieves a dataframe from the server as an Apache Arrow table, without converting it to pandas.
+
+        Takes the same arguments as ```get()```. The table is made of the record batches as the server
+        sent them, so no data is copied, and types that pandas can't represent, such as nested types and
+        timestamps of other units, are kept as they are.
+
+        Returns:
+            pa.Table: A table containing the retrieved data.
+
+        Raises:
+            ValidationError: If the provided arguments are not valid.
+            DataFusionError: The supplied SQL could not be processed by the server.
+            FileNotFoundError: The specified dataframe cannot be found.
+            FlightServerError: Unhandled errors arising from the server.
+
+        Example:
+            ```python
+            table = client.get_arrow("my_dataframe", sql="SELECT * FROM my_dataframe WHERE condition")
+            ```
+        """
+        reader = self._do_get(name, sql, bucket, columns, filter, glob)
+        try:
+            return reader.read_all()
+        except FlightServerError as e:
+            raise self._translate_flight_error(e)
+
+    def get_batches(self, name: str,
+                    sql: Optional[str] = None,
+                    bucket: Optional[str] = None,
+                    columns: Optional[List[str]] = None,
+                    filter: Optional[list] = None,
+                    glob: Optional[str] = None):
+        """
+        Retrieves a dataframe from the server as an iterator of Apache Arrow record batches,
+        which are read from the server as they are consumed.
+
+        Takes the same arguments as ```get()```. Only one batch is held by the client at a time, so a
+        result much larger than memory can be processed, as long as the batches aren't kept. The server
+        streams the batches of a dataframe or query result as it reads or computes them, and the stream
+        is cancelled if the iterator is closed before it is exhausted.
+
+        Returns:
+            Iterator[pa.RecordBatch]: The record batches of the retrieved data.
+
+        Raises:
+            ValidationError: If the provided arguments are not valid.
+            DataFusionError: The supplied SQL could not be processed by the server.
+            FileNotFoundError: The specified dataframe cannot be found.
+            FlightServerError: Unhandled errors arising from the server.
+
+        Example:
+            To sum a column of a large dataframe, a batch at a time:
+
+            ```python
+            total = 0
+            for batch in client.get_batches("my_dataframe", columns=["value"]):
+                total += pc.sum(batch.column("value")).as_py() or 0
+            ```
+        """
+        reader = self._do_get(name, sql, bucket, columns, filter, glob)
+        return self._iter_batches(reader)
+
+    def _do_get(self, name, sql, bucket, columns, filter, glob):
+        req = GetRequest(name=name, sql=sql, bucket=bucket, columns=columns, filter=filter, glob=glob)
+        ticket_info = {"name":req.name, "bucket":req.bucket}
+        if sql is not None:
+            ticket_info["sql"] = req.sql
+        if req.columns is not None:
+            ticket_info["columns"] = req.columns
+        if req.filter:
+            ticket_info["filter"] = [list(comparison) for comparison in req.filter]
+        if req.glob is not None:
+            ticket_info["glob"] = req.glob
+
+        # values such as timestamps are sent as strings, and converted to the column's type on the server
+        ticket_bytes = json.dumps(ticket_info, default=str)
+        ticket = Ticket(ticket_bytes)
+        try:
+            return self.client.do_get(ticket)
+        except FlightServerError as e:
+            raise self._translate_flight_error(e)
+
+    def _iter_batches(self, reader):
+        try:
+            for chunk in reader:
+                yield chunk.data
+        except FlightServerError as e:
+            raise self._translate_flight_error(e)
+        finally:
+            # stops the server sending the rest of the stream if the iterator is closed early
+            reader.cancel()
+
+    def info(self, name: str, sql: Optional[str] = None, bucket: Optional[str] = None):
+        """
+        Retrieves the metadata of a dataframe, without retrieving any of its data.
+
+        If an SQL query is provided, the query is planned on the server but not run, and the schema
+        and estimated size are those of its result.
+
+        Args:
+            name (str): The name of the dataframe.
+            sql (Optional[str]): An optional SQL query against the dataframe.
+            bucket (Optional[str]): The name of the bucket where the dataframe is stored.
+
+        Returns:
+            dict: The metadata of the dataframe:
+             - schema: the arrow schema, of the dataframe or of the result of the query
+             - num_rows: the number of rows, or -1 if the query hasn't been run yet
+             - num_bytes: the size of the dataframe's parquet files on the server
+             - num_row_groups: the number of row groups in the dataframe's parquet files
+             - num_parts: the number of parquet files the dataframe is stored as
+             - estimated_bytes: an estimate of the size of the data in memory, which for a query 
+                doesn't account for filters or aggregation
+             - writer_options: the options the dataframe's parquet files are written with
+
+        Raises:
+            DataFusionError: The supplied SQL could not be processed by the server.
+            FileNotFoundError: The specified dataframe cannot be found.
+            FlightServerError: Unhandled errors arising from the server.
+
+        Example:
+            ```python
+            client = ShootsClient("localhost", 8080)
+            info = client.info("my_dataframe", sql="SELECT col1 FROM my_dataframe")
+            print(info["schema"], info["estimated_bytes"])
+            ```
+        """
+        req = GetRequest(name=name, sql=sql, bucket=bucket)
+        descriptor = self._get_request_descriptor(req)
+        try:
+            flight_info = self.client.get_flight_info(descriptor)
+        except FlightServerError as e:
+            raise self._translate_flight_error(e)
+
+        metadata = json.loads(flight_info.app_metadata)
+        return {"schema":flight_info.schema,
+                "num_rows":flight_info.total_records,
+                "num_bytes":flight_info.total_bytes,
+                "num_row_groups":metadata["num_row_groups"],
+                "num_parts":metadata["num_parts"],
+                "estimated_bytes":metadata["estimated_bytes"],
+                "writer_options":metadata["writer_options"]}
+
+    def schema(self, name: str, sql: Optional[str] = None, bucket: Optional[str] = None):
+        """
+        Retrieves the schema of a dataframe, or of the result of an SQL query against it, without retrieving any data.
+
+        Args:
+            name (str): The name of the dataframe.
+            sql (Optional[str]): An optional SQL query against the dataframe.
+            bucket (Optional[str]): The name of the bucket where the dataframe is stored.
+
+        Returns:
+            pa.Schema: The arrow schema.
+
+        Raises:
+            DataFusionError: The supplied SQL could not be processed by the server.
+            FileNotFoundError: The specified dataframe cannot be found.
+            FlightServerError: Unhandled errors arising from the server.
+        """
+        req = GetRequest(name=name, sql=sql, bucket=bucket)
+        descriptor = self._get_request_descriptor(req)
+        try:
+            # pyarrow doesn't pass the errors raised by the server's get_schema on to the client,
+            # so the schema is taken from get_flight_info, which costs the same on the server
+            return self.client.get_flight_info(descriptor).schema
+        except FlightServerError as e:
+            raise self._translate_flight_error(e)
+
+    def _get_request_descriptor(self, req):
+        descriptor_info = {"name":req.name, "bucket":req.bucket}
+        if req.sql is not None:
+            descriptor_info["sql"] = req.sql
+        return FlightDescriptor.for_command(json.dumps(descriptor_info).encode())
+
     def buckets(self):
         """
         Retrieves a list of all available buckets from the server.
@@ -438,15 +777,24 @@ class ShootsClient:
         except FlightServerError as e:
             raise self._translate_flight_error(e)
         
-    def list(self, bucket: Optional[str] = None, regex: Optional[str] = None):
+    def list(self, bucket: Optional[str] = None, 
+             regex: Optional[str] = None,
+             prefix: Optional[str] = None,
+             limit: Optional[int] = None,
+             continuation_token: Optional[str] = None):
         """
         Lists dataframes available on the server, optionally filtered by a specific bucket.
 
-        Each dataframe is returned with its name and schema.
+        Each dataframe is returned with its name and schema, in order of name. The filtering
+        is done on the server, so only the matching dataframes are sent.
 
         Args:
             bucket (Optional[str]): The name of the bucket to filter dataframes. If None, dataframes from the default bucket are listed.
-            regex (Optional[str]): Currently ignored.
+            regex (Optional[str]): Only list dataframes whose name matches this regular expression anywhere.
+            prefix (Optional[str]): Only list dataframes whose name starts with this prefix.
+            limit (Optional[int]): The most dataframes to return.
+            continuation_token (Optional[str]): The name of the last dataframe of the previous page,
+                to list the dataframes after it.
 
         Returns:
             list[dict]: A list of dictionaries, each containing the 'name' and 'schema' of a dataframe.
@@ -460,15 +808,30 @@ class ShootsClient:
             for dataframe in dataframes:
                 print(dataframe["name"], dataframe["schema"])
             ```
+
+            To page through the dataframes whose names start with "sensor_", 100 at a time:
+
+            ```python
+            page = client.list(prefix="sensor_", limit=100)
+            while page:
+                for dataframe in page:
+                    print(dataframe["name"])
+                page = client.list(prefix="sensor_", limit=100, continuation_token=page[-1]["name"])
+            ```
         Raises:
             FileNotFounderror: The specified bucket does not exist on the server.
+            ValueError: The regex is invalid, or limit is not a positive integer.
             FlightServerError: Unhandled errors arising from the server.
         Note:
             The method returns an empty list if no dataframes match the filtering criteria or if 
             the server does not have any dataframes. The 'schema' in the returned dictionary is 
             an Apache Arrow schema object.
         """
-        descriptor_info = {"bucket":bucket, "regex":regex}
+        descriptor_info = {"bucket":bucket, 
+                           "regex":regex,
+                           "prefix":prefix,
+                           "limit":limit,
+                           "continuation_token":continuation_token}
         descriptor_bytes = json.dumps(descriptor_info).encode()
         try:
             flights = self.client.list_flights(criteria=descriptor_bytes)
@@ -555,7 +918,8 @@ class ShootsClient:
                 sql: Optional[str] = None,
                 mode: Optional[PutMode] = PutMode.APPEND,
                 source_bucket: Optional[str] = None,
-                target_bucket: Optional[str] = None):
+                target_bucket: Optional[str] = None,
+                incremental: bool = False):
         """
         Resamples (a.k.a. downsamples) data on the server. Works with a provided SQL query, or, if the data is time series,
         callers can supply a rule, time column, and aggregation function.
@@ -572,14 +936,25 @@ class ShootsClient:
             target_bucket (Optional[str]): Bucket for where to store the resampled dataframe, if any
 
             The following arguments are ignoed if the sql argument is provide, and required if not.
-            rule (str): String representation of time delta for windowing (example: 1s)
+            rule (str): String representation of time delta for windowing (examples: 1s, 15min, 1h, 1D, 1MS)
             time_col (str): The name of the time stamp column to window on
-            aggregation_func (str): The name of the function to aggregate (examples: mean, max, count)
+            aggregation_func (str): The name of the function to aggregate (one of mean, sum, min, max, count, first, last, median, std, var, nunique)
+            incremental (bool): Only resample the rows added to the source since the last incremental resample
+                into the target, and merge them into the target, rather than resampling the whole source.
+                The first incremental resample, or one with a different source, rule, time_col or
+                aggregation_func, replaces the target. mode is ignored. Rows added to the source with a time
+                before the last bin of the target are not picked up. (defaults to False)
+
+        Returns:
+            dict: target_rows, the number of rows written to the target, and for time series source_rows,
+                the number of rows in the source, and if incremental, watermark, the start of the last bin written.
 
         Raises:
             FlightServerError: Unhandled errors arising from the server.
             FileNotFoundError: Either the source dataframe or the target bucket do not exist.
+            ValueError: The rule, time column or aggregation function is invalid.
             DataFusionError: The supplied SQL could not be processed.
+            ShootsIOError: The target was written to during an incremental resample.
         
         Example:
             Resampling with a SQL query:
@@ -599,6 +974,16 @@ class ShootsClient:
                                 aggregation_func="mean",
                                 mode=PutMode.APPEND)
             ```
+
+            Rolling up the rows added since the last run:
+            ```python
+            self.client.resample(source="my_source_dataframe", 
+                                target="my_resampled_dataframe",
+                                rule="1min",
+                                time_col="timestamp",
+                                aggregation_func="mean",
+                                incremental=True)
+            ```
         """
 
         req = ResampleRequest(
@@ -610,7 +995,8 @@ class ShootsClient:
                 aggregation_func=aggregation_func,
                 mode=mode,
                 source_bucket=source_bucket,
-                target_bucket=target_bucket)
+                target_bucket=target_bucket,
+                incremental=incremental)
 
         resample_info = {"source":req.source,
                 "target":req.target,
@@ -624,6 +1010,8 @@ class ShootsClient:
             resample_info["rule"] = req.rule
             resample_info["time_col"] = req.time_col
             resample_info["aggregation_func"] = req.aggregation_func
+            if req.incremental:
+                resample_info["incremental"] = True
         
         action_bytes = json.dumps(resample_info).encode()
         action = Action("resample",action_bytes)
@@ -632,6 +1020,114 @@ class ShootsClient:
             return json.loads(self._flight_result_to_string(result))
         except FlightServerError as e:
             raise self._translate_flight_error(e)
+
+    def create_view(self,
+                    name: str,
+                    source: str,
+                    sql: Optional[str] = None,
+                    rule: Optional[str] = None,
+                    time_col: Optional[str] = None,
+                    aggregation_func: Optional[str] = None,
+                    bucket: Optional[str] = None,
+                    source_bucket: Optional[str] = None,
+                    refresh_lag: float = 0):
+        """
+        Creates a materialized view: a dataframe that the server computes from a source dataframe, with
+        either a SQL query or a time series resample, and refreshes in the background after each put to the source.
+
+        Resample views only aggregate the rows appended to the source since their last refresh, like
+        ```resample(..., incremental=True)```. SQL views are recomputed in full. A view can be the source
+        of other views. Creating a view that already exists redefines it.
+
+        Args:
+            name (str): The name of the view's dataframe, which must not be an existing dataframe
+            source (str): The name of the dataframe the view is computed from
+            sql (str): A sql query against the source dataframe
+            rule (str): String representation of time delta for windowing, if there is no sql (examples: 1s, 15min, 1h)
+            time_col (str): The name of the time stamp column to window on, if there is no sql
+            aggregation_func (str): The name of the function to aggregate, if there is no sql (examples: mean, max, count)
+            bucket (Optional[str]): Bucket for the view's dataframe, if any
+            source_bucket (Optional[str]): Bucket containing the source dataframe, if any
+            refresh_lag (float): Seconds to wait after a put to the source before refreshing the view, so that
+                the puts made in the meantime are picked up by the same refresh (defaults to 0)
+
+        Returns:
+            dict: The result of materializing the view, as returned by ```resample()```
+
+        Raises:
+            FlightServerError: Unhandled errors arising from the server.
+            FileNotFoundError: The source dataframe does not exist.
+            FileExistsError: A dataframe that isn't a view already has the view's name.
+            ValueError: The definition of the view is invalid.
+            DataFusionError: The supplied SQL could not be processed.
+
+        Example:
+            ```python
+            client.create_view("events_per_minute",
+                               source="events",
+                               rule="1min",
+                               time_col="timestamp",
+                               aggregation_func="count",
+                               refresh_lag=5)
+            # after puts to events, the dashboard reads the small view instead
+            df = client.get("events_per_minute")
+            ```
+        """
+        req = ViewRequest(name=name,
+                          source=source,
+                          sql=sql,
+                          rule=rule,
+                          time_col=time_col,
+                          aggregation_func=aggregation_func,
+                          bucket=bucket,
+                          source_bucket=source_bucket,
+                          refresh_lag=refresh_lag)
+        action_bytes = json.dumps(req.model_dump()).encode()
+        action = Action("create_view", action_bytes)
+        try:
+            result = self.client.do_action(action)
+            return json.loads(self._flight_result_to_string(result))
+        except FlightServerError as e:
+            raise self._translate_flight_error(e)
+
+    def drop_view(self, name: str, bucket: Optional[str] = None):
+        """
+        Stops refreshing a materialized view. The view's dataframe is kept, and can be deleted with ```delete()```.
+
+        Args:
+            name (str): The name of the view
+            bucket (Optional[str]): The bucket of the view, if any
+
+        Raises:
+            FileNotFoundError: There is no such view.
+            FlightServerError: Unhandled errors arising from the server.
+        """
+        action_bytes = json.dumps({"name":name, "bucket":bucket}).encode()
+        action = Action("drop_view", action_bytes)
+        try:
+            result = self.client.do_action(action)
+            return self._flight_result_to_string(result)
+        except FlightServerError as e:
+            raise self._translate_flight_error(e)
+
+    def views(self, bucket: Optional[str] = None):
+        """
+        Lists the materialized views in a bucket.
+
+        Args:
+            bucket (Optional[str]): The bucket to list the views of, if any
+
+        Returns:
+            list: The definitions of the views, as dicts with the arguments of ```create_view()```, in order of name.
+        """
+        action_bytes = json.dumps({"bucket":bucket}).encode()
+        action = Action("views", action_bytes)
+        try:
+            result = self.client.do_action(action)
+            return self._flight_result_to_list(result)
+        except FlightServerError as e:
+            raise self._translate_flight_error(e)
+
     def ping(self):
         """
         Sends a 'ping' to th server.
@@ -645,6 +1141,30 @@ class ShootsClient:
         action = Action("ping", b'')
         result = self.client.do_action(action)
         return self._flight_result_to_string(result)
+
+    def stats(self):
+        """
+        Retrieves counters from the server, for sizing its caches and queues.
+
+        Returns:
+            dict: The counters, by name:
+             - registrations: entries, hits, misses, invalidations and evictions of the cached DataFusion contexts
+             - results: entries, bytes, max_bytes, hits, misses, evictions and invalidations of the cached query results
+             - io_queue_depths: the number of i/o operations waiting on each dataframe with operations in flight
+
+        Example:
+            ```python
+            client = ShootsClient("localhost", 8080)
+            stats = client.stats()
+            print(stats["registrations"]["hits"])
+            ```
+        """
+        action = Action("stats", b'')
+        try:
+            result = self.client.do_action(action)
+            return json.loads(self._flight_result_to_string(result))
+        except FlightServerError as e:
+            raise self._translate_flight_error(e)
     
     def _flight_result_to_list(self, result):
         list_string = None
@@ -671,7 +1191,8 @@ class ShootsClient:
                 "DataFusionError": DataFusionError,
                 "FileNotFoundError": FileNotFoundError,
                 "BucketNotEmptyError":BucketNotEmptyError,
-                "ShootsIOError":ShootsIOError
+                "ShootsIOError":ShootsIOError,
+                "ValueError":ValueError
             }
             return exception_map[exception_type](message)
         except:
@@ -2,16 +2,23 @@ import os
 import pyarrow as pa
 from pyarrow import flight, ArrowInvalid
 import pyarrow.parquet as pq
-import fastparquet as fp
-from datafusion import SessionContext
+import pyarrow.dataset as ds
+import pyarrow.compute as pc
+from datafusion import SessionContext, RuntimeEnvBuilder
+from datafusion.catalog import Schema, Table
 import json
 import shutil
 import threading
 import argparse
 import jwt
 import datetime
-import queue
-from concurrent.futures import Future
+import uuid
+import itertools
+import re
+import time
+import weakref
+import fnmatch
+from concurrent import futures
 import logging
 
 app_name = os.getenv("PYTHON_APP_NAME", "shoots")
@@ -25,10 +32,36 @@ logger.info(f"logging initialized for {app_name}")
 
 try:
     from .jwt_server_auth import JWTServerAuthHandler, JWTMiddleware
+    from .io_executor import IOExecutor
+    from .parquet_writer import ParquetPartWriter, WriterOptions, compressions
+    from .memtable import MemTable
+    from .registration_cache import RegistrationCache, Registration
+    from .result_cache import ResultCache, is_cacheable
+    from .catalog import Catalog, DatasetInfo
+    from .partitioning import Partitioning
+    from .resample import Resample, quote
+    from .views import View, Views
+    from .table_references import find_references
 except ImportError:
     from shoots.jwt_server_auth import JWTServerAuthHandler, JWTMiddleware
+    from shoots.io_executor import IOExecutor
+    from shoots.parquet_writer import ParquetPartWriter, WriterOptions, compressions
+    from shoots.memtable import MemTable
+    from shoots.registration_cache import RegistrationCache, Registration
+    from shoots.result_cache import ResultCache, is_cacheable
+    from shoots.catalog import Catalog, DatasetInfo
+    from shoots.partitioning import Partitioning
+    from shoots.resample import Resample, quote
+    from shoots.views import View, Views
+    from shoots.table_references import find_references
 
 put_modes = ["error", "append", "replace"]
+write_engines = ["fastparquet", "pyarrow"]
+layouts = ["file", "segmented"]
+manifest_name = "_manifest.json"
+resample_state_name = "_resample.json"
+parquet_format = ds.ParquetFileFormat()
+filter_operators = ["=", "==", "!=", "<", "<=", ">", ">=", "in", "not in"]
 
 class ShootsServer(flight.FlightServerBase):
     """
@@ -38,6 +71,23 @@ class ShootsServer(flight.FlightServerBase):
         location (pyarrow.flight.Location): The server location.
         bucket_dir (str): Directory path for storing parquet datasets.
         secret (str): A secret string supplied by the user to encode and decode JWTs.
+        write_engine (str): The engine used to write parquet files, either "fastparquet" or "pyarrow".
+        row_group_rows (int): The target number of rows per parquet row group.
+        row_group_bytes (int): The target size in bytes of the arrow data in a parquet row group.
+        streaming (bool): Whether do_get streams row groups lazily rather than reading the whole dataframe first.
+        query_memory_limit (int): The maximum bytes of memory that SQL queries against a dataset can use, or None for no limit.
+        io_executor (IOExecutor): Performs the i/o operations on datasets with a bounded pool of worker threads.
+        layout (str): How new datasets are stored, either "file" or "segmented".
+        compaction_interval (float): Seconds between runs of the background compactor, or None if it is disabled.
+        compaction_min_parts (int): The number of consecutive small parts that the compactor merges as soon as they exist.
+        compaction_max_age (float): Seconds after which the compactor merges two or more consecutive small parts.
+        memtable (bool): Whether small appends are buffered in memory before they are written to disk.
+        memtable_max_age (float): The most seconds that appended rows are buffered before they are written to disk.
+        registrations (RegistrationCache): The DataFusion contexts of recently queried datasets.
+        results (ResultCache): The results of recent SQL queries.
+        catalog (Catalog): The buckets and datasets on disk, with the metadata of each dataset.
+        writer_options (WriterOptions): The default options for writing the parquet files of new datasets.
+        views (Views): The materialized views, which are refreshed by a background thread after puts to their sources.
 
     Note:
         You most likely don't want to use the server directly, except for starting it up. It is easiest to interact with the server via ShootsClient.
@@ -48,6 +98,25 @@ class ShootsServer(flight.FlightServerBase):
                  bucket_dir,
                  certs = None,
                  secret = None,
+                 write_engine = "fastparquet",
+                 row_group_rows = 1_000_000,
+                 row_group_bytes = 128 * 1024 * 1024,
+                 streaming = True,
+                 query_memory_limit = None,
+                 io_workers = 8,
+                 io_queue_depth = 64,
+                 layout = "file",
+                 compaction_interval = 60,
+                 compaction_min_parts = 10,
+                 compaction_max_age = 300,
+                 memtable = False,
+                 memtable_max_age = 5,
+                 registration_cache_size = 64,
+                 result_cache_bytes = 64 * 1024 * 1024,
+                 compression = None,
+                 compression_level = None,
+                 use_dictionary = None,
+                 write_statistics = None,
                  *args, **kwargs):
         """
         Initializes the ShootsServer.
@@ -57,11 +126,71 @@ class ShootsServer(flight.FlightServerBase):
             bucket_dir (str): Directory path where the parquet files will be stored.
             certs (tuple of str): An TLS certificate and key (in that order) for providing TLS support for the server.
             If no certs are provided, the server will run without TLS.
+            secret (str): A secret string used to generate and verify JWTs. Requires certs.
+            write_engine (str): The engine used for writing parquet files. "fastparquet" (default) converts
+            incoming data to pandas before writing it. "pyarrow" writes Arrow data directly.
+            With either engine, appended datasets are stored as a directory of parquet parts.
+            row_group_rows (int): The chunks of a put are coalesced into row groups of up to this many rows.
+            row_group_bytes (int): The chunks of a put are coalesced into row groups of up to this many bytes.
+            streaming (bool): If True (default), do_get reads and sends parquet row groups one at a time, so only a
+            few batches are held in memory. If False, the whole dataframe is read into memory before it is sent.
+            query_memory_limit (int): Caps the memory used by the SQL queries against a dataset, which is shared by
+            queries that run at the same time. Sorts and aggregations spill to disk
+            when they reach the limit, and queries that can't spill fail with a DataFusionError. Defaults to no limit.
+            io_workers (int): The number of worker threads that read and write datasets.
+            io_queue_depth (int): The number of operations that can wait on a single dataset. Once a dataset's queue
+            is full, puts to it stop reading from the client until there is room.
+            layout (str): "file" (default) stores a new or replaced dataset as a single parquet file, which becomes
+            a directory of parts when it is appended to. "segmented" always stores datasets as a directory of parts.
+            compaction_interval (float): How often, in seconds, a background thread merges small parts (smaller than
+            row_group_bytes) of datasets into larger ones. Pass None to disable compaction.
+            compaction_min_parts (int): A run of this many consecutive small parts is merged on the next compaction.
+            compaction_max_age (float): A run of two or more small parts is merged once its oldest part is this many seconds old.
+            memtable (bool): If True, appends smaller than a row group are buffered in memory, and written to disk
+            as a single part once the buffered rows for a dataset add up to a row group, are memtable_max_age seconds
+            old, or the server shuts down. Reads include the buffered rows. Buffered rows are lost if the server
+            stops without shutting down. Defaults to False.
+            memtable_max_age (float): How long, in seconds, appended rows can be buffered in memory.
+            registration_cache_size (int): The number of datasets whose DataFusion context is kept between SQL
+            queries, with the dataset registered as a table. A context is reused until its dataset changes.
+            result_cache_bytes (int): The memory budget for caching the results of SQL queries. A cached result is
+            returned for the same query until its dataset changes, and the least recently used results are evicted
+            to stay within the budget. Results larger than an eighth of the budget, and those of queries that call
+            now(), random() and similar functions, aren't cached. Pass 0 to disable the cache.
+            compression (str): The default compression codec of new datasets, one of none, snappy, gzip, brotli,
+            lz4 or zstd. Defaults to the write engine's default, snappy for pyarrow and none for fastparquet.
+            compression_level (int): The default compression level, for the codecs that have levels.
+            use_dictionary (bool): Whether new datasets dictionary encode their columns by default, with the pyarrow write engine.
+            write_statistics (bool): Whether new datasets write column statistics by default.
+            The writer options given to a put override these defaults, and are stored with the dataset, so that
+            later appends to it, memtable flushes and compactions write the same way.
         """
+        if write_engine not in write_engines:
+            logger.error(f"write engine is {write_engine}, must be one of {write_engines}")
+            raise ValueError(f"write engine is {write_engine}, must be one of {write_engines}")
+        if layout not in layouts:
+            logger.error(f"layout is {layout}, must be one of {layouts}")
+            raise ValueError(f"layout is {layout}, must be one of {layouts}")
+
         self.location = location
         self.bucket_dir = bucket_dir
         self.secret = secret
-        logger.info(f"initializing with location: {str(location)}, bucket_dir:{bucket_dir}, with secret:{secret is not None}, with certs: {certs is not None}")
+        self.write_engine = write_engine
+        self.row_group_rows = row_group_rows
+        self.row_group_bytes = row_group_bytes
+        self.streaming = streaming
+        self.query_memory_limit = query_memory_limit
+        self.layout = layout
+        self.compaction_interval = compaction_interval
+        self.compaction_min_parts = compaction_min_parts
+        self.compaction_max_age = compaction_max_age
+        self.memtable = memtable
+        self.memtable_max_age = memtable_max_age
+        self.writer_options = WriterOptions(compression=compression,
+                                            compression_level=compression_level,
+                                            use_dictionary=use_dictionary,
+                                            write_statistics=write_statistics)
+        logger.info(f"initializing with location: {str(location)}, bucket_dir:{bucket_dir}, with secret:{secret is not None}, with certs: {certs is not None}, write_engine: {write_engine}, row_group_rows: {row_group_rows}, row_group_bytes: {row_group_bytes}, streaming: {streaming}, query_memory_limit: {query_memory_limit}, io_workers: {io_workers}, io_queue_depth: {io_queue_depth}, layout: {layout}, compaction_interval: {compaction_interval}, memtable: {memtable}, writer_options: {self.writer_options.to_dict()}")
         # set up the bucket directory
         os.makedirs(self.bucket_dir, exist_ok=True)
         auth_handler = None
@@ -86,8 +215,38 @@ class ShootsServer(flight.FlightServerBase):
                                    middleware=middleware,
                                    *args, **kwargs)
         
-        self.io_queues = {}
-        self.queue_locks = {}
+        self.io_executor = IOExecutor(max_workers=io_workers, max_queue_depth=io_queue_depth)
+        self.dataset_versions = {}
+        self.registrations = RegistrationCache(max_entries=registration_cache_size)
+        self.results = ResultCache(max_bytes=result_cache_bytes)
+        self.catalog = Catalog()
+        # snapshots left behind by a previous run are no longer in use
+        shutil.rmtree(self._snapshots_dir(), ignore_errors=True)
+        self._build_catalog()
+        self.views = Views(os.path.join(self.bucket_dir, ".views.json"))
+
+        self.compactor_stopped = threading.Event()
+        self.compactor_thread = None
+        if self.compaction_interval:
+            self.compactor_thread = threading.Thread(target=self._run_compactor, daemon=True)
+            self.compactor_thread.start()
+
+        self.memtables = {}
+        self.memtables_lock = threading.Lock()
+        self.memtable_flush_requested = threading.Event()
+        self.memtable_flusher_stopped = threading.Event()
+        self.memtable_flusher_thread = None
+        if self.memtable:
+            self.memtable_flusher_thread = threading.Thread(target=self._run_memtable_flusher, daemon=True)
+            self.memtable_flusher_thread.start()
+
+        # the bucket and name of the views waiting for a refresh, with when it is due and whether it has to be full
+        self.view_refreshes = {}
+        self.view_refreshes_lock = threading.Lock()
+        self.view_refresh_requested = threading.Event()
+        self.view_refresher_stopped = threading.Event()
+        self.view_refresher_thread = threading.Thread(target=self._run_view_refresher, daemon=True)
+        self.view_refresher_thread.start()
 
     def generate_admin_jwt(self):
         if self.secret:
@@ -115,7 +274,8 @@ class ShootsServer(flight.FlightServerBase):
             ticket (flight.Ticket): The ticket object containing the dataset request details.
 
         Returns:
-            flight.RecordBatchStream: A stream of record batches for the requested dataset.
+            flight.GeneratorStream: A stream of record batches for the requested dataset, 
+            or a flight.RecordBatchStream if the server is not streaming.
 
         Raises:
             flight.FlightServerError: If there is an issue in processing the request.
@@ -130,6 +290,10 @@ class ShootsServer(flight.FlightServerBase):
             # Define the request details
             # sql and bucket are both optional
             # Leave out the sql statement to return the whole dataframe
+            # Instead of sql, columns and filter can be pushed down into the parquet reader,
+            # e.g. "columns":["col1"], "filter":[["col2", ">", 0]]
+            # With a glob, e.g. "glob":"day_*", the dataframes of the bucket whose names match it
+            # are read together as a single table, which the sql refers to by name
             ticket_data = {
                 "name": "my_dataset",
                 "bucket": "my_bucket",
@@ -152,9 +316,24 @@ class ShootsServer(flight.FlightServerBase):
             name = ticket_info["name"]
             bucket = ticket_info["bucket"]
             sql_query = ticket_info.get("sql", None)
-            logger.info(f"do_get: {name}, bucket:{bucket}, sql:{sql_query}")
-
-            table = self._do_get_arrow_table(name, bucket, sql_query)
+            columns = ticket_info.get("columns", None)
+            filters = ticket_info.get("filter", None)
+            glob = ticket_info.get("glob", None)
+            logger.info(f"do_get: {name}, bucket:{bucket}, sql:{sql_query}, columns:{columns}, filter:{filters}, glob:{glob}")
+
+            if glob is not None:
+                if columns is not None or filters:
+                    self._raise_value_error("columns and filter can't be combined with a glob, use sql instead")
+                schema, batches = self._query_glob(name, bucket, glob, sql_query)
+                if self.streaming:
+                    stream = flight.GeneratorStream(schema, batches)
+                else:
+                    stream = flight.RecordBatchStream(pa.Table.from_batches(batches, schema=schema))
+            elif self.streaming:
+                stream = self._do_get_batch_stream(name, bucket, sql_query, columns, filters)
+            else:
+                table = self._do_get_arrow_table(name, bucket, sql_query, columns, filters)
+                stream = flight.RecordBatchStream(table)
         
         except flight.FlightServerError as e:
             logger.exception(str(e))
@@ -164,29 +343,212 @@ class ShootsServer(flight.FlightServerBase):
             logger.exception(str(e))
             raise flight.FlightServerError(extra_info=str(e))
         
-        return flight.RecordBatchStream(table)
+        return stream
 
-    def _do_get_arrow_table(self, name, bucket, sql_query=None):
+    def _do_get_batch_stream(self, name, bucket, sql_query=None, columns=None, filters=None):
+        # a missing dataframe is detected in the i/o queue, rather than checked here,
+        # so that a commit in progress isn't mistaken for a missing dataframe
         file_path = self._create_file_path(name, bucket)
-        if not os.path.exists(file_path):
-            exception = {"type":"FileNotFoundError",
-                             "message": f"dataframe {name} in bucket {bucket} not found"}
+
+        if sql_query:
+            # the query is planned in the i/o queue, and the batches are computed
+            # by DataFusion as the client consumes them
+            try:
+                schema, batches = self._query(name, bucket, file_path, sql_query)
+            except FileNotFoundError:
+                self._raise_dataframe_not_found_error(name, bucket)
+            return flight.GeneratorStream(schema, batches)
+
+        if columns is not None or filters:
+            # only the requested columns and the row groups that can match the filter are read
+            return flight.GeneratorStream(*self._read_with_pushdown(name, bucket, file_path, columns, filters))
+
+        try:
+            # the files are opened in the i/o queue, which pins the current version of the dataset,
+            # the row groups are read later as the client consumes them
+            logger.debug(f"enqueing open of {file_path}")
+            parquet_files, buffered_batches = self._enqueue_io_request(self._open_dataset,
+                                                                       args={"file_path":file_path},
+                                                                       read_only=True)
+        except FileNotFoundError:
+            self._raise_dataframe_not_found_error(name, bucket)
+        except ArrowInvalid as e:
+            msg = f"Failed to read from {file_path}. Most likely the file is open by another proecess."
+            exception = {"type":"ShootsIOError", "message":msg}
             logger.exception(exception)
-            raise flight.FlightServerError(extra_info=json.dumps(exception))
-            
+            raise flight.FlightServerError(extra_info = json.dumps(exception))
+
+        schema = parquet_files[0].schema_arrow
+        return flight.GeneratorStream(schema, self._iter_parquet_batches(parquet_files, schema, buffered_batches))
+
+    def _open_dataset(self, file_path):
+        """
+        Opens the parts of a dataset and takes the rows buffered in its memtable,
+        which together are the current version of the dataset.
+        """
+        return self._open_parquet_files(file_path), self._buffered_batches(file_path)
+
+    def _open_parquet_files(self, file_path):
+        """
+        Opens the parts of a dataset. The open files can still be read after a write replaces or deletes them.
+        """
+        return [pq.ParquetFile(part) for part in self._parquet_parts(file_path)]
+
+    def _iter_parquet_batches(self, parquet_files, schema, buffered_batches=()):
+        """
+        Lazily yields the record batches of the given parquet files one row group at a time,
+        followed by any buffered batches that haven't been written to the files yet.
+        """
+        try:
+            for parquet_file in parquet_files:
+                for batch in parquet_file.iter_batches():
+                    # parts written by different engines may have slightly different types
+                    if not batch.schema.equals(schema):
+                        batch = batch.cast(schema)
+                    yield batch
+            for batch in buffered_batches:
+                if not batch.schema.equals(schema):
+                    batch = batch.cast(schema)
+                yield batch
+        finally:
+            for parquet_file in parquet_files:
+                parquet_file.close()
+
+    def _read_with_pushdown(self, name, bucket, file_path, columns, filters):
+        """
+        Returns the schema of the projected columns, and a generator of the projected and filtered
+        record batches of the current version of a dataset.
+        """
+        try:
+            schema, files, buffered_batches = self._enqueue_io_request(self._open_dataset_files,
+                                                                       args={"file_path":file_path,
+                                                                             "filters":filters},
+                                                                       read_only=True)
+        except FileNotFoundError:
+            self._raise_dataframe_not_found_error(name, bucket)
+
+        try:
+            schema, expression = self._pushdown(schema, columns, filters)
+        except BaseException:
+            for file in files:
+                file.close()
+            raise
+        return schema, self._iter_fragment_batches(files, schema, expression, buffered_batches)
+
+    def _open_dataset_files(self, file_path, filters=None):
+        """
+        Opens the parts of a dataset as arrow files and takes the rows buffered in its memtable.
+        The open files can still be read after a write replaces or deletes them.
+
+        The parts in partitions that can't match the filters aren't opened at all.
+        Returns the schema of the dataset, the open files and the buffered batches.
+        """
+        parts = self._parquet_parts(file_path)
+        schema = pq.read_schema(parts[0])
+        partitioning = self._read_partitioning(file_path)
+        if filters and partitioning is not None and partitioning.column in schema.names:
+            column_type = schema.field(partitioning.column).type
+            parts = [part for part in parts 
+                     if not self._partition_of(file_path, part)
+                     or partitioning.may_match(self._partition_of(file_path, part), filters, column_type)]
+        return schema, [pa.OSFile(part) for part in parts], self._buffered_batches(file_path)
+
+    def _partition_of(self, file_path, part):
+        """
+        Returns the name of the partition directory of a part, or None if it isn't in one.
+        """
+        partition = os.path.relpath(os.path.dirname(part), file_path)
+        return partition if "=" in partition else None
+
+    def _pushdown(self, schema, columns, filters):
+        """
+        Returns the schema of the projected columns, and the filter as a pyarrow expression.
+        
+        The filter is a list of [column, operator, value] comparisons that must all be true. 
+        The values are cast to the type of their column, so timestamps can be given as strings.
+        """
+        if columns is None:
+            columns = schema.names
+        for column in columns:
+            if column not in schema.names:
+                self._raise_value_error(f"No such column {column}")
+
+        expression = None
+        for comparison in filters or []:
+            if len(comparison) != 3 or comparison[1] not in filter_operators:
+                self._raise_value_error(f"Invalid filter {comparison}, expected [column, operator, value] "
+                                        f"with an operator in {filter_operators}")
+            column, operator, value = comparison
+            if column not in schema.names:
+                self._raise_value_error(f"No such column {column}")
+            field = pc.field(column)
+            column_type = schema.field(column).type
+            try:
+                if operator in ("in", "not in"):
+                    condition = field.isin(pa.array(value).cast(column_type))
+                    if operator == "not in":
+                        condition = ~condition
+                else:
+                    value = pa.scalar(value).cast(column_type)
+                    condition = {"=":field == value,
+                                 "==":field == value,
+                                 "!=":field != value,
+                                 "<":field < value,
+                                 "<=":field <= value,
+                                 ">":field > value,
+                                 ">=":field >= value}[operator]
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, TypeError) as e:
+                self._raise_value_error(f"Invalid value in filter {comparison}: {e}")
+            expression = condition if expression is None else expression & condition
+
+        return pa.schema([schema.field(column) for column in columns]), expression
+
+    def _iter_fragment_batches(self, files, schema, expression, buffered_batches=()):
+        """
+        Lazily yields the projected and filtered record batches of the given parquet files, followed by
+        those of any buffered batches that haven't been written to the files yet. Only the projected
+        columns are decoded, and row groups whose statistics rule out the filter are skipped.
+        """
+        try:
+            for file in files:
+                fragment = parquet_format.make_fragment(file)
+                for batch in fragment.to_batches(columns=schema.names, filter=expression):
+                    # parts written by different engines may have slightly different types
+                    if not batch.schema.equals(schema):
+                        batch = batch.cast(schema)
+                    yield batch
+            for batch in buffered_batches:
+                table = pa.Table.from_batches([batch])
+                if expression is not None:
+                    table = table.filter(expression)
+                yield from table.select(schema.names).cast(schema).to_batches()
+        finally:
+            for file in files:
+                file.close()
+
+    def _do_get_arrow_table(self, name, bucket, sql_query=None, columns=None, filters=None):
+        file_path = self._create_file_path(name, bucket)
+
+        if sql_query is None and (columns is not None or filters):
+            schema, batches = self._read_with_pushdown(name, bucket, file_path, columns, filters)
+            return pa.Table.from_batches(batches, schema=schema)
+
         if sql_query:
-            table = self._enqueue_io_request(self._read_arrow_from_parquet,
-                                        args={"name":name, 
-                                              "file_path":file_path,
-                                              "sql_query":sql_query})
+            try:
+                schema, batches = self._query(name, bucket, file_path, sql_query)
+                table = pa.Table.from_batches(batches, schema=schema)
+            except FileNotFoundError:
+                self._raise_dataframe_not_found_error(name, bucket)
             
         else:
             try:
                 logger.debug(f"enqueing read from {file_path}")
                 table = self._enqueue_io_request(self._read_arrow_from_parquet,
-                                                     args={"file_path":file_path})
+                                                     args={"file_path":file_path},
+                                                     read_only=True)
                 
-                    
+            except FileNotFoundError:
+                self._raise_dataframe_not_found_error(name, bucket)
             except ArrowInvalid as e:
                 msg = f"Failed to read from {file_path}. Most likely the file is open by another proecess."
                 exception = {"type":"ShootsIOError", "message":msg}
@@ -197,21 +559,321 @@ class ShootsServer(flight.FlightServerBase):
     def _read_arrow_from_parquet(self, name=None, file_path=None, sql_query=None):
         logger.debug(f"reading from parquest with {(name, file_path,sql_query)}")
         if sql_query is None:
-            table = pq.read_table(file_path)
+            parquet_files, buffered_batches = self._open_dataset(file_path)
+            schema = parquet_files[0].schema_arrow
+            table = pa.Table.from_batches(self._iter_parquet_batches(parquet_files, schema, buffered_batches),
+                                          schema=schema)
             logger.debug(f"read table from {file_path}")
         else:
+            schema, batches = self._query_parquet(name, file_path, sql_query)
+            table = pa.Table.from_batches(batches, schema=schema)
+        return table
+
+    def _query(self, name, bucket, file_path, sql_query):
+        """
+        Plans a SQL query against the named dataset, and any other datasets it references, by name for
+        the datasets in the same bucket and as bucket.name for those in other buckets.
+
+        Returns the schema of the result and a generator of its record batches.
+        """
+        _, references = self._find_references(name, bucket, sql_query)
+        if references is None:
+            return self._enqueue_io_request(self._query_parquet,
+                                            args={"name":name,
+                                                  "file_path":file_path,
+                                                  "sql_query":sql_query},
+                                            read_only=True)
+        return self._query_datasets(references, sql_query)
+
+    def _find_references(self, name, bucket, sql_query):
+        """
+        Returns the schema of the result of a query and the TableReferences of the datasets it refers to,
+        or None and None if it only refers to the named dataset, or can't be planned.
+        """
+        try:
+            schema, references = find_references(self.catalog, sql_query, bucket)
+        except Exception:
+            # the error is raised when the query is planned against the named dataset
+            return None, None
+        if all(reference.schema_name == "public" and reference.key() == (bucket, name) for reference in references):
+            return None, None
+        return schema, references
+
+    def _query_datasets(self, references, sql_query):
+        """
+        Plans a SQL query against several datasets, registered together in one SessionContext, so that
+        joins and unions across them run in DataFusion. Each dataset is pinned in its own i/o queue, and the
+        result is cached for the versions of all of them.
+        """
+        registrations = []
+        for reference in references:
+            registrations.append(self._enqueue_io_request(self._pin_registration,
+                                                          args={"name":reference.name,
+                                                                "file_path":self._create_file_path(reference.name, reference.bucket)},
+                                                          read_only=True))
+        file_paths = tuple(self._create_file_path(reference.name, reference.bucket) for reference in references)
+        version = tuple(registration.version for registration in registrations)
+        table = self.results.get(file_paths, version, sql_query)
+        if table is not None:
+            return table.schema, iter(table.to_batches())
+
+        try:
+            ctx = SessionContext(runtime=self._runtime_env())
+            for reference, registration in zip(references, registrations):
+                if reference.schema_name not in ctx.catalog().schema_names():
+                    ctx.catalog().register_schema(reference.schema_name, Schema.memory_schema())
+                table = Table(registration.ctx.table(reference.name).into_view())
+                ctx.catalog().schema(reference.schema_name).register_table(reference.table_name, table)
+            result = ctx.sql(sql_query)
+            schema = result.schema()
+            stream = result.execute_stream()
+        except Exception as e:
+            self._raise_datafusion_error(e)
+        # the registrations pin the snapshots of the datasets until the stream is done
+        batches = self._iter_datafusion_batches(stream, schema, registrations)
+        return schema, self._cache_result(file_paths, version, sql_query, schema, batches)
+
+    def _query_glob(self, name, bucket, glob, sql_query=None):
+        """
+        Plans a SQL query against the datasets of a bucket whose names match a glob, as a single
+        listing table with the given name, so that DataFusion scans all of their parts in parallel.
+        Without SQL, all of the rows are returned.
+
+        The schemas of the datasets are unified, so columns missing from some of them are null
+        and columns of different types are promoted to a common one. Each dataset is pinned in its
+        own i/o queue, and the result is cached for the versions of all of them.
+
+        Returns the schema of the result and a generator of its record batches.
+        """
+        if not sql_query:
+            sql_query = f"SELECT * FROM {quote(name.lower())}"
+
+        names = sorted(dataset_name for dataset_name, _ in self.catalog.datasets(bucket)
+                       if fnmatch.fnmatchcase(dataset_name, glob))
+        snapshot_dir = os.path.join(self._snapshots_dir(), uuid.uuid4().hex)
+        os.makedirs(snapshot_dir)
+        try:
+            file_paths, versions, parts, buffered_batches = [], [], [], []
+            for i, dataset_name in enumerate(names):
+                file_path = self._create_file_path(dataset_name, bucket)
+                try:
+                    version, dataset_parts, dataset_batches = self._enqueue_io_request(self._link_glob_dataset,
+                                                                                       args={"file_path":file_path,
+                                                                                             "snapshot_dir":snapshot_dir,
+                                                                                             "prefix":f"{i:05d}"},
+                                                                                       read_only=True)
+                except FileNotFoundError:
+                    # deleted since the catalog was listed
+                    continue
+                file_paths.append(file_path)
+                versions.append(version)
+                parts += dataset_parts
+                buffered_batches += dataset_batches
+            if not file_paths:
+                exception = {"type":"FileNotFoundError",
+                             "message":f"no dataframes in bucket {bucket} match {glob}"}
+                logger.exception(exception)
+                raise flight.FlightServerError(extra_info=json.dumps(exception))
+
+            file_paths, version = tuple(file_paths), tuple(versions)
+            table = self.results.get(file_paths, version, sql_query)
+            if table is not None:
+                shutil.rmtree(snapshot_dir, ignore_errors=True)
+                return table.schema, iter(table.to_batches())
+
+            try:
+                schema = pa.unify_schemas([pq.read_schema(part).remove_metadata() for part in parts] +
+                                          [batch.schema.remove_metadata() for batch in buffered_batches],
+                                          promote_options="permissive")
+            except (ArrowInvalid, pa.ArrowTypeError) as e:
+                self._raise_value_error(f"The schemas of the dataframes matching {glob} can't be unified: {e}")
+
             try:
-                ctx = SessionContext()
-                ctx.register_parquet(name, file_path)
+                ctx = SessionContext(runtime=self._runtime_env())
+                dataframe = ctx.read_parquet(snapshot_dir, schema=schema)
+                if buffered_batches:
+                    buffered = self._conform_batches(buffered_batches, schema)
+                    dataframe = dataframe.union(ctx.from_arrow(buffered))
+                ctx.register_view(name, dataframe)
                 result = ctx.sql(sql_query)
-                table = result.to_arrow_table()
-                   
+                result_schema = result.schema()
+                stream = result.execute_stream()
             except Exception as e:
-                if "DataFusion error" in str(e):
-                    exception = {"type":"DataFusionError", "message":str(e)}
-                    logger.exception(exception)
-                    raise flight.FlightServerError(extra_info = json.dumps(exception))
-        return table
+                self._raise_datafusion_error(e)
+        except BaseException:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+            raise
+
+        registration = Registration(ctx, version)
+        # the snapshot is removed once the query is done
+        weakref.finalize(registration, shutil.rmtree, snapshot_dir, ignore_errors=True)
+        batches = self._iter_datafusion_batches(stream, result_schema, registration)
+        return result_schema, self._cache_result(file_paths, version, sql_query, result_schema, batches)
+
+    def _link_glob_dataset(self, file_path, snapshot_dir, prefix):
+        """
+        Links the parts of one of the datasets matching a glob into the shared snapshot directory, and
+        takes its buffered batches. Returns the version of the dataset, its linked parts and the batches.
+        """
+        buffered_batches = self._buffered_batches(file_path)
+        version = self._dataset_version(file_path, buffered_batches)
+        _, parts = self._link_snapshot(file_path, snapshot_dir, prefix)
+        return version, parts, buffered_batches
+
+    def _conform_batches(self, batches, schema):
+        """
+        Returns batches with differing schemas as a table of the given schema, with nulls for missing columns.
+        """
+        tables = []
+        for batch in batches:
+            columns = [batch.column(field.name).cast(field.type) if field.name in batch.schema.names
+                       else pa.nulls(batch.num_rows, field.type)
+                       for field in schema]
+            tables.append(pa.Table.from_arrays(columns, schema=schema))
+        return pa.concat_tables(tables)
+
+    def _pin_registration(self, name, file_path):
+        buffered_batches = self._buffered_batches(file_path)
+        version = self._dataset_version(file_path, buffered_batches)
+        return self._registration(name, file_path, version, buffered_batches)
+
+    def _query_parquet(self, name, file_path, sql_query):
+        """
+        Plans a SQL query against a dataset with DataFusion. 
+        
+        Returns the schema of the result and a generator of its record batches, 
+        which are computed by DataFusion as the generator is consumed.
+        """
+        buffered_batches = self._buffered_batches(file_path)
+        version = self._dataset_version(file_path, buffered_batches)
+        table = self.results.get(file_path, version, sql_query)
+        if table is not None:
+            return table.schema, iter(table.to_batches())
+
+        registration = self._registration(name, file_path, version, buffered_batches)
+        try:
+            result = registration.ctx.sql(sql_query)
+            schema = result.schema()
+            stream = result.execute_stream()
+        except Exception as e:
+            self._raise_datafusion_error(e)
+        batches = self._iter_datafusion_batches(stream, schema, registration)
+        return schema, self._cache_result(file_path, version, sql_query, schema, batches)
+
+    def _cache_result(self, file_path, version, sql_query, schema, batches):
+        """
+        Yields the batches of a query result, and caches the result once all of it has been read,
+        if it fits in an entry of the result cache. The batches stop being buffered as soon as they don't.
+        """
+        cached = [] if is_cacheable(sql_query) else None
+        size = 0
+        for batch in batches:
+            if cached is not None:
+                size += batch.nbytes
+                if size <= self.results.max_entry_bytes:
+                    cached.append(batch)
+                else:
+                    cached = None
+            yield batch
+        if cached is not None:
+            self.results.put(file_path, version, sql_query, pa.Table.from_batches(cached, schema=schema))
+
+    def _registration(self, name, file_path, version, buffered_batches):
+        """
+        Returns a SessionContext with the given version of a dataset registered as a table,
+        reusing the one from a previous query if the dataset hasn't changed since.
+        """
+        registration = self.registrations.get(file_path, version)
+        if registration is not None:
+            return registration
+
+        snapshot_dir, parts = self._link_snapshot(file_path)
+        try:
+            ctx = SessionContext(runtime=self._runtime_env())
+            self._register_parquet(ctx, name, parts, buffered_batches)
+        except Exception as e:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+            self._raise_datafusion_error(e)
+        registration = Registration(ctx, version)
+        # the snapshot is removed once the registration is evicted and the queries using it are done
+        weakref.finalize(registration, shutil.rmtree, snapshot_dir, ignore_errors=True)
+        self.registrations.put(file_path, registration)
+        return registration
+
+    def _dataset_version(self, file_path, buffered_batches):
+        # appends to the memtable don't publish a version, so the buffered batches are counted as well
+        return (self.dataset_versions.get(file_path, 0), len(buffered_batches))
+
+    def _link_snapshot(self, file_path, snapshot_dir=None, prefix="part"):
+        """
+        Hard links the parts of a dataset into a private directory, which pins the current version of
+        the dataset for a query that reads the parts by path. The parts stay on disk until the links are
+        removed, even if a write replaces or deletes the dataset.
+
+        If a snapshot directory is given, the parts are linked into it alongside those of other datasets,
+        named by the prefix.
+
+        Returns the snapshot directory and the paths of the linked parts.
+        """
+        shared = snapshot_dir is not None
+        if not shared:
+            snapshot_dir = os.path.join(self._snapshots_dir(), uuid.uuid4().hex)
+            os.makedirs(snapshot_dir)
+        parts = []
+        try:
+            for i, part in enumerate(self._parquet_parts(file_path)):
+                link = os.path.join(snapshot_dir, f"{prefix}-{i:05d}.parquet")
+                os.link(part, link)
+                parts.append(link)
+        except BaseException:
+            if shared:
+                for link in parts:
+                    os.remove(link)
+            else:
+                shutil.rmtree(snapshot_dir)
+            raise
+        return snapshot_dir, parts
+
+    def _snapshots_dir(self):
+        # hidden, so that it isn't listed as a bucket
+        return os.path.join(self.bucket_dir, ".snapshots")
+
+    def _runtime_env(self):
+        runtime = RuntimeEnvBuilder().with_disk_manager_os()
+        if self.query_memory_limit:
+            runtime = runtime.with_fair_spill_pool(self.query_memory_limit)
+        return runtime
+
+    def _register_parquet(self, ctx, name, parts, buffered_batches=()):
+        if len(parts) == 1 and not buffered_batches:
+            ctx.register_parquet(name, parts[0])
+            return
+
+        # parts written by different engines may have slightly different schemas, which DataFusion
+        # won't merge in a single listing table, but will coerce in a union
+        dataframe = ctx.read_parquet(parts[0])
+        for part in parts[1:]:
+            dataframe = dataframe.union(ctx.read_parquet(part))
+        if buffered_batches:
+            dataframe = dataframe.union(ctx.from_arrow(pa.Table.from_batches(buffered_batches)))
+        ctx.register_view(name, dataframe)
+
+    def _iter_datafusion_batches(self, stream, schema, registration=None):
+        # the registration is referenced until the stream is done, so that its snapshot isn't removed
+        try:
+            for batch in stream:
+                batch = batch.to_pyarrow()
+                # the batches can be stricter about nullability than the planned schema
+                if not batch.schema.equals(schema):
+                    batch = pa.RecordBatch.from_arrays(batch.columns, schema=schema)
+                yield batch
+        except Exception as e:
+            self._raise_datafusion_error(e)
+
+    def _raise_datafusion_error(self, e):
+        exception = {"type":"DataFusionError", "message":str(e)}
+        logger.exception(exception)
+        raise flight.FlightServerError(extra_info = json.dumps(exception))
         
     def do_put(self, context, descriptor, reader, writer):
         """
@@ -262,49 +924,448 @@ class ShootsServer(flight.FlightServerBase):
 
         # bail if there is incorrect data in the mode
         self._raise_if_invalid_put_mode(mode)
+        try:
+            partitioning = Partitioning.from_dict(command_info.get("partitioning"))
+        except (ValueError, KeyError) as e:
+            self._raise_value_error(f"Invalid partitioning: {e}")
+        try:
+            writer_options = WriterOptions.from_dict(command_info.get("writer_options"))
+        except (ValueError, TypeError) as e:
+            self._raise_value_error(f"Invalid writer options: {e}")
 
         file_path = self._create_file_path(name, bucket)
         
-        # In order to avoid calling os.path.exists for each written chunk
-        # it's necessary to track whether the target file has been created yet
-        # in the code that calls enqueue_write_request
+        # fail fast rather than reading the whole stream before the commit finds the dataframe exists,
+        # the existing data is only replaced or appended to once the new data is fully written
         self._handle_put_modes(name, mode, file_path)
 
         logger.debug(f"do_put() called")
+        self._write_batches(file_path, self._read_chunks(reader), mode, partitioning, writer_options)
+        # views only pick up appends incrementally, a new or replaced source is resampled in full
+        self._schedule_view_refresh(file_path, full=mode != "append")
+        logger.debug(f"do_put() returning")
+
+    def _read_chunks(self, reader):
+        """
+        Yields the record batches sent to do_put.
+        """
         chunks = 0
         while True:
             try:
                 data_chunk = reader.read_chunk()
                 logger.debug(f"chunck {chunks} read")
                 chunks += 1
-                if data_chunk is None:
+                if data_chunk is None or data_chunk.data is None:
                     break
-                logger.debug(f"enqueing chunck {chunks}")
-                self._enqueue_io_request(function=self._write_arrow_to_parquet,
-                                        args={"data_table":data_chunk.data,
-                                         "file_path":file_path,
-                                        "mode":mode})
-                
-                logger.debug(f"chunk {chunks} enqueued")
-                parquet_exists = True
-                
             # the Apache Arrow API uses an exception for signaling
             # that the reader has no more data
             except StopIteration:
                 break
-        logger.debug(f"do_put() returning")
+            yield data_chunk.data
+
+    def _write_batches(self, file_path, batches, mode, partitioning=None, writer_options=None):
+        """
+        Writes a stream of record batches to a new parquet file, coalescing them into row groups
+        rather than writing each batch separately, and then commits the file to the dataset.
+        Returns the number of rows written.
+
+        partitioning only applies when the dataset is created or replaced, appends follow
+        the partitioning of the dataset they are appended to. Appends also reuse the writer
+        options of the dataset, for any options that writer_options doesn't set.
+        """
+        if mode == "append" and os.path.exists(file_path):
+            partitioning = self._enqueue_io_request(self._read_partitioning,
+                                                    args={"file_path":file_path},
+                                                    read_only=True)
+            # fail fast rather than writing the whole stream before the commit finds the columns don't match
+            batches = iter(batches)
+            first_batch = next(batches, None)
+            info = self.catalog.get(*self._bucket_and_name(file_path))
+            if first_batch is not None and info is not None:
+                self._check_append_columns(file_path, first_batch.schema, info.schema)
+            batches = itertools.chain([first_batch] if first_batch is not None else [], batches)
+        writer_options = self._resolve_writer_options(file_path, mode, writer_options)
+        if partitioning is not None:
+            return self._write_partitioned_batches(file_path, batches, mode, partitioning, writer_options)
+
+        if self.memtable and mode == "append" and os.path.exists(file_path):
+            batches = iter(batches)
+            head, is_small = self._read_small_append(batches)
+            if is_small:
+                return self._append_to_memtable(file_path, head)
+            # too large to buffer, so the rows that are already buffered are flushed first to keep them ahead of it
+            self._flush_memtable(file_path)
+            batches = itertools.chain(head, batches)
+
+        writer = self._part_writer(file_path, writer_options)
+        last_write = None
+        try:
+            # keep reading the stream while the previous row group is written, but don't buffer more than
+            # one row group ahead of the writer. The writes are queued on the dataset, so that a put to a busy
+            # dataset waits for room in its queue. They only touch the temporary file, so they run alongside
+            # the dataset's readers, and one at a time since each waits for the previous one to be done.
+            for row_group in self._coalesce_batches(batches, writer.row_group_rows):
+                if last_write is not None:
+                    last_write.result()
+                last_write = self.io_executor.submit(file_path,
+                                                     writer.write,
+                                                     args={"data_table":row_group},
+                                                     read_only=True)
+            if last_write is not None:
+                last_write.result()
+        except BaseException:
+            # the writes to the temporary file run one at a time, so once the last one is done they all are
+            if last_write is not None:
+                futures.wait([last_write])
+            writer.discard()
+            raise
+        writer.close()
+
+        # nothing was sent, so there is nothing to commit
+        if not writer.started:
+            return 0
+
+        self._enqueue_io_request(self._commit_temp_parquet,
+                                 args={"file_path":file_path,
+                                       "temp_path":writer.path,
+                                       "mode":mode})
+        return writer.num_rows
+
+    def _part_writer(self, file_path, writer_options):
+        return ParquetPartWriter(self._temp_path(file_path), self.write_engine, self.row_group_rows, writer_options)
+
+    def _resolve_writer_options(self, file_path, mode, writer_options=None):
+        """
+        Returns the options to write a part of a dataset with: the given options, then those stored with
+        the dataset for an append, then the server's defaults.
+        """
+        writer_options = writer_options or WriterOptions()
+        if mode == "append":
+            info = self.catalog.get(*self._bucket_and_name(file_path))
+            if info is not None and info.writer_options is not None:
+                writer_options = writer_options.merge(info.writer_options)
+        return writer_options.merge(self.writer_options)
+
+    def _write_partitioned_batches(self, file_path, batches, mode, partitioning, writer_options=None):
+        """
+        Writes a stream of record batches to a new parquet file per partition, and then commits
+        the files to the dataset together. Returns the number of rows written.
+        """
+        writers = {}
+        try:
+            for row_group in self._coalesce_batches(batches, writer_options.row_group_rows):
+                for directory, rows in partitioning.split(row_group).items():
+                    if directory not in writers:
+                        writers[directory] = self._part_writer(file_path, writer_options)
+                    writers[directory].write(rows)
+            for writer in writers.values():
+                writer.close()
+        except BaseException as e:
+            for writer in writers.values():
+                writer.discard()
+            if isinstance(e, ValueError):
+                self._raise_value_error(str(e))
+            raise
+
+        # nothing was sent, so there is nothing to commit
+        if not writers:
+            return 0
+
+        self._enqueue_io_request(self._commit_partitioned_parquet,
+                                 args={"file_path":file_path,
+                                       "temp_paths":{directory:writer.path for directory, writer in writers.items()},
+                                       "mode":mode,
+                                       "partitioning":partitioning})
+        return sum(writer.num_rows for writer in writers.values())
+
+    def _coalesce_batches(self, batches, row_group_rows=None):
+        """
+        Yields record batches as arrow tables of up to row_group_rows rows or row_group_bytes bytes.
+        """
+        row_group_rows = row_group_rows or self.row_group_rows
+        buffered = []
+        rows = 0
+        size = 0
+        for batch in batches:
+            buffered.append(batch)
+            rows += batch.num_rows
+            size += batch.nbytes
+            if rows >= row_group_rows or size >= self.row_group_bytes:
+                yield pa.Table.from_batches(buffered)
+                buffered = []
+                rows = 0
+                size = 0
+
+        if buffered:
+            yield pa.Table.from_batches(buffered)
+
+    def _read_small_append(self, batches):
+        """
+        Reads batches until they add up to a row group. Returns the batches that were read,
+        and whether the whole stream was read before reaching a row group.
+        """
+        head = []
+        rows = 0
+        size = 0
+        for batch in batches:
+            head.append(batch)
+            rows += batch.num_rows
+            size += batch.nbytes
+            if rows >= self.row_group_rows or size >= self.row_group_bytes:
+                return head, False
+        return head, True
+
+    def _append_to_memtable(self, file_path, batches):
+        with self.memtables_lock:
+            memtable = self.memtables.get(file_path)
+            if memtable is None:
+                memtable = self.memtables[file_path] = MemTable()
+            memtable.append(batches)
+            is_full = memtable.num_rows >= self.row_group_rows or memtable.nbytes >= self.row_group_bytes
+        # buffered appends don't publish a version, so the dataset's cached results are dropped here
+        self.results.invalidate(file_path)
+        if is_full:
+            self.memtable_flush_requested.set()
+        return sum(batch.num_rows for batch in batches)
+
+    def _buffered_batches(self, file_path):
+        with self.memtables_lock:
+            memtable = self.memtables.get(file_path)
+            return list(memtable.batches) if memtable else []
+
+    def _buffered_rows(self, file_path):
+        with self.memtables_lock:
+            memtable = self.memtables.get(file_path)
+            return memtable.num_rows if memtable else 0
+
+    def _buffered_file_paths(self):
+        with self.memtables_lock:
+            return list(self.memtables)
+
+    def _discard_memtable(self, file_path):
+        # called when a dataset is replaced or deleted, which replaces or deletes its buffered rows too
+        with self.memtables_lock:
+            self.memtables.pop(file_path, None)
+
+    def _run_memtable_flusher(self):
+        while not self.memtable_flusher_stopped.is_set():
+            self.memtable_flush_requested.wait(self.memtable_max_age / 2)
+            self.memtable_flush_requested.clear()
+            self._flush_memtables()
+
+    def _flush_memtables(self, force=False):
+        """
+        Flushes the memtables that have reached a row group in size or memtable_max_age in age,
+        or all of them if force is True.
+        """
+        with self.memtables_lock:
+            to_flush = [file_path for file_path, memtable in self.memtables.items()
+                        if force
+                        or memtable.num_rows >= self.row_group_rows
+                        or memtable.nbytes >= self.row_group_bytes
+                        or memtable.age() >= self.memtable_max_age]
+        for file_path in to_flush:
+            try:
+                self._flush_memtable(file_path)
+            except Exception as e:
+                logger.exception(f"flushing buffered rows of {file_path} failed: {e}")
+
+    def _flush_memtable(self, file_path):
+        """
+        Writes the rows buffered for a dataset to a new part, and removes them from the memtable
+        once the part is committed.
+        """
+        with self.memtables_lock:
+            memtable = self.memtables.get(file_path)
+        if memtable is None:
+            return
+
+        with memtable.flush_lock:
+            with self.memtables_lock:
+                batches = list(memtable.batches)
+            if not batches:
+                return
+
+            logger.debug(f"flushing {len(batches)} buffered batches of {file_path}")
+            writer = self._part_writer(file_path, self._resolve_writer_options(file_path, "append"))
+            try:
+                for row_group in self._coalesce_batches(batches, writer.row_group_rows):
+                    writer.write(row_group)
+                writer.close()
+            except BaseException:
+                writer.discard()
+                raise
+            self._enqueue_io_request(self._commit_memtable_flush,
+                                     args={"file_path":file_path,
+                                           "temp_path":writer.path,
+                                           "memtable":memtable,
+                                           "num_batches":len(batches)})
+
+    def _commit_memtable_flush(self, file_path, temp_path, memtable, num_batches):
+        """
+        Appends flushed rows to a dataset and removes them from its memtable in one step,
+        so readers see each row exactly once.
+        """
+        with self.memtables_lock:
+            is_current = self.memtables.get(file_path) is memtable
+        if not is_current or not os.path.exists(file_path):
+            # the dataset was replaced or deleted since the rows were buffered, rows are only
+            # buffered for existing datasets so they mustn't create it again
+            os.remove(temp_path)
+            with self.memtables_lock:
+                if self.memtables.get(file_path) is memtable:
+                    self.memtables.pop(file_path, None)
+            return
+
+        self._commit_temp_parquet(file_path, temp_path, "append")
+        with self.memtables_lock:
+            memtable.remove_flushed(num_batches)
+            if not memtable.batches and self.memtables.get(file_path) is memtable:
+                self.memtables.pop(file_path, None)
+
+    def _commit_temp_parquet(self, file_path, temp_path, mode):
+        """
+        Publishes a fully written temporary parquet file as the next version of a dataset.
+
+        A new or replaced dataset is swapped in with a rename, and an append adds the file as an
+        additional part. This runs exclusively in the dataset's i/o queue, so a reader sees either the
+        whole of the previous version or the whole of this one. Readers that pinned the previous
+        version keep reading it, see _open_parquet_files() and _link_snapshot().
+        """
+        if os.path.exists(file_path) and mode != "replace":
+            if mode == "error":
+                os.remove(temp_path)
+                self._raise_dataframe_exists_error(os.path.basename(file_path)[:-8])
+            try:
+                self._check_append_columns(file_path, pq.read_schema(temp_path), pq.read_schema(self._parquet_parts(file_path)[0]))
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            if not os.path.isdir(file_path):
+                self._convert_to_parts_dir(file_path)
+            parts = self._parquet_parts(file_path)
+            part_path = self._next_part_path(file_path)
+            os.rename(temp_path, part_path)
+            self._write_manifest(file_path, parts + [part_path], self._read_partitioning(file_path))
+            self._publish_version(file_path, appended_parts=[part_path])
+        else:
+            if self.layout == "segmented":
+                temp_path = self._temp_parts_dir(temp_path)
+            self._replace_parquet(file_path, temp_path)
+            self._discard_memtable(file_path)
+            self._publish_version(file_path)
+
+    def _commit_partitioned_parquet(self, file_path, temp_paths, mode, partitioning):
+        """
+        Publishes fully written temporary parquet files, one per partition directory, as the next version
+        of a dataset, in the same way as _commit_temp_parquet().
+        """
+        if os.path.exists(file_path) and mode != "replace":
+            if mode == "error":
+                for temp_path in temp_paths.values():
+                    os.remove(temp_path)
+                self._raise_dataframe_exists_error(os.path.basename(file_path)[:-8])
+            try:
+                dataset_schema = pq.read_schema(self._parquet_parts(file_path)[0])
+                for temp_path in temp_paths.values():
+                    self._check_append_columns(file_path, pq.read_schema(temp_path), dataset_schema)
+            except BaseException:
+                for temp_path in temp_paths.values():
+                    os.remove(temp_path)
+                raise
+            if not os.path.isdir(file_path):
+                self._convert_to_parts_dir(file_path)
+            parts = self._parquet_parts(file_path)
+            appended_parts = []
+            for directory, temp_path in sorted(temp_paths.items()):
+                part_path = self._next_part_path(file_path, directory)
+                os.makedirs(os.path.dirname(part_path), exist_ok=True)
+                os.rename(temp_path, part_path)
+                appended_parts.append(part_path)
+            self._write_manifest(file_path, parts + appended_parts, self._read_partitioning(file_path))
+            self._publish_version(file_path, appended_parts=appended_parts)
+        else:
+            temp_dir = self._temp_path(file_path)
+            parts = []
+            for i, (directory, temp_path) in enumerate(sorted(temp_paths.items())):
+                part_path = os.path.join(temp_dir, directory, f"part-{i:05d}.parquet")
+                os.makedirs(os.path.dirname(part_path))
+                os.rename(temp_path, part_path)
+                parts.append(part_path)
+            self._write_manifest(temp_dir, parts, partitioning)
+            self._replace_parquet(file_path, temp_dir)
+            self._discard_memtable(file_path)
+            self._publish_version(file_path)
+
+    def _check_append_columns(self, file_path, schema, dataset_schema):
+        """
+        Raises a ValueError if the columns of an append don't match those of the dataset, in name and order,
+        since the dataset couldn't be read as one table afterwards. Pandas index columns are left out,
+        as the write engines store them under different names.
+        """
+        columns = self._data_columns(schema)
+        dataset_columns = self._data_columns(dataset_schema)
+        if columns != dataset_columns:
+            name = self._bucket_and_name(file_path)[1]
+            self._raise_value_error(f"The columns {columns} don't match the columns {dataset_columns} of dataframe {name}")
+
+    def _data_columns(self, schema):
+        index_columns = [column for column in (schema.pandas_metadata or {}).get("index_columns", [])
+                         if isinstance(column, str)]
+        return [name for name in schema.names if name not in index_columns]
+
+    def _replace_parquet(self, file_path, temp_path):
+        if not os.path.exists(file_path):
+            os.rename(temp_path, file_path)
+            return
+        if not os.path.isdir(file_path) and not os.path.isdir(temp_path):
+            os.replace(temp_path, file_path)
+            return
+        # a directory can't be renamed over, so move the old version out of the way first
+        obsolete_path = self._temp_path(file_path)
+        os.rename(file_path, obsolete_path)
+        os.rename(temp_path, file_path)
+        if os.path.isdir(obsolete_path):
+            shutil.rmtree(obsolete_path)
+        else:
+            os.remove(obsolete_path)
+
+    def _publish_version(self, file_path, appended_parts=None):
+        version = self.dataset_versions.get(file_path, 0) + 1
+        self.dataset_versions[file_path] = version
+        self.registrations.invalidate(file_path)
+        self.results.invalidate(file_path)
+        self._update_catalog(file_path, appended_parts)
+        logger.debug(f"published version {version} of {file_path}")
+
+    def _temp_path(self, file_path):
+        # temp files are hidden and don't end in .parquet, so listings never pick them up
+        return os.path.join(os.path.dirname(file_path), f".{uuid.uuid4().hex}.tmp")
         
     def _handle_put_modes(self, name, mode, file_path):
         parquet_exists = os.path.exists(file_path)
         if mode == "error" and parquet_exists:
             self._raise_dataframe_exists_error(name)
-        
-        if mode == "replace" and os.path.exists(file_path):
-            self._enqueue_io_request(self._delete_parquet,
-                                     args={"file_path":file_path})
 
     def _delete_parquet(self, file_path):
-        os.remove(file_path)
+        if os.path.isdir(file_path):
+            shutil.rmtree(file_path)
+        else:
+            os.remove(file_path)
+        self._discard_memtable(file_path)
+        self._publish_version(file_path)
+
+    def _raise_value_error(self, message):
+        exception = {"type":"ValueError",
+                     "message":message}
+        logger.exception(exception)
+        raise flight.FlightServerError(extra_info=json.dumps(exception))
+
+    def _raise_dataframe_not_found_error(self, name, bucket):
+        exception = {"type":"FileNotFoundError",
+                         "message": f"dataframe {name} in bucket {bucket} not found"}
+        logger.exception(exception)
+        raise flight.FlightServerError(extra_info=json.dumps(exception))
 
     def _raise_dataframe_exists_error(self, name):
         exception = {"type":"FileExistsError",
@@ -319,76 +1380,299 @@ class ShootsServer(flight.FlightServerBase):
             logger.exception(f"put mode is {mode}, must be one of {put_modes}")
             raise flight.FlightServerError(f"put mode is {mode}, must be one of {put_modes}")
 
-    def _enqueue_io_request(self, function, args):
+    def _enqueue_io_request(self, function, args, read_only=False):
         """
-        Enqueues a write request and processes it synchronously. The client will
-        block and wait for the result of the write operation.
-        """
-        file_path = args["file_path"]
-        if file_path not in self.io_queues:
-            self.io_queues[file_path] = queue.Queue()
-            self.queue_locks[file_path] = threading.Lock()
-            
-        future = Future()  # Create a Future to track the result of the write operation
-        self.io_queues[file_path].put((function, args, future))
-        logger.debug(f"{str(function)} added to i/o queue. queue length: {self.io_queues[file_path].qsize()}")
-        # Directly process the queue synchronously (relying on Flight's threading model)
-        self._process_io_queue(file_path)
+        Queues an i/o operation on a dataset and blocks until it has been performed, returning its result.
 
-        # Block the client here by waiting for the result of the Future
-        return future.result()
+        Operations on a dataset are started in the order they arrive. Read only operations run
+        concurrently with each other, and all other operations run exclusively.
+        """
+        logger.debug(f"{str(function)} added to i/o queue for {args['file_path']}")
+        return self.io_executor.run(args["file_path"], function, args, read_only=read_only)
 
-    def _process_io_queue(self, file_path):
+    def _convert_to_parts_dir(self, file_path):
         """
-        Processes all pending write requests in the queue for the given file_path.
-        Ensures that only one thread can write to the file at a time using a lock.
+        Moves a single parquet file into a directory of the same name as its first part.
         """
-        while not self.io_queues[file_path].empty():
-            function, args, future = self.io_queues[file_path].get()
-            logger.debug(f"processing i/o queue for {file_path}")
-            try:
-                # Lock the file to ensure that only one thread writes at a time
-                with self.queue_locks[file_path]:
-                    # Perform the actual file write operation
-                    result = function(**args)
-                    
-                # If the write succeeds, set the result on the future
-                future.set_result(result)
+        temp_path = self._temp_path(file_path)
+        os.rename(file_path, temp_path)
+        os.makedirs(file_path)
+        part_path = os.path.join(file_path, "part-00000.parquet")
+        os.rename(temp_path, part_path)
+        self._write_manifest(file_path, [part_path])
+
+    def _temp_parts_dir(self, temp_path):
+        """
+        Moves a temporary parquet file into a new temporary directory as its first part.
+        """
+        temp_dir = self._temp_path(temp_path)
+        os.makedirs(temp_dir)
+        part_path = os.path.join(temp_dir, "part-00000.parquet")
+        os.rename(temp_path, part_path)
+        self._write_manifest(temp_dir, [part_path])
+        return temp_dir
+
+    def _next_part_path(self, file_path, partition=None):
+        # orphaned parts that aren't in the manifest are counted too, so they are never overwritten,
+        # and the parts of all partitions are numbered together
+        indexes = [int(os.path.basename(part)[5:-8]) for part in self._list_part_files(file_path)]
+        next_index = max(indexes) + 1 if indexes else 0
+        return os.path.join(file_path, partition or "", f"part-{next_index:05d}.parquet")
+
+    def _list_part_files(self, file_path):
+        """
+        Returns the paths of the part files in a directory and its partition directories, relative to the directory.
+        """
+        def is_part(f):
+            return f.startswith("part-") and f.endswith(".parquet")
+
+        part_files = []
+        for entry in sorted(os.listdir(file_path)):
+            if is_part(entry):
+                part_files.append(entry)
+            elif "=" in entry and os.path.isdir(os.path.join(file_path, entry)):
+                part_files += [os.path.join(entry, f) for f in sorted(os.listdir(os.path.join(file_path, entry))) if is_part(f)]
+        return part_files
+
+    def _parquet_parts(self, file_path):
+        """
+        Returns the parquet files making up a dataset, in the order they were written.
 
-            except Exception as e:
-                # If there's an error, set the exception on the future
-                future.set_exception(e)
+        The parts of a directory are listed in its manifest. Parts that aren't in the manifest
+        were left behind by an interrupted commit or compaction, and aren't part of the dataset.
+        """
+        if not os.path.isdir(file_path):
+            return [file_path]
+        manifest = self._read_manifest(file_path)
+        if manifest is not None:
+            parts = manifest["parts"]
+        else:
+            # directories written before manifests were added
+            parts = self._list_part_files(file_path)
+        return [os.path.join(file_path, part) for part in parts]
 
-            self.io_queues[file_path].task_done()
+    def _read_partitioning(self, file_path):
+        """
+        Returns the Partitioning of a dataset, or None if it isn't partitioned.
+        """
+        manifest = self._read_manifest(file_path) if os.path.isdir(file_path) else None
+        if manifest is None:
+            return None
+        return Partitioning.from_dict(manifest.get("partitioning"))
+
+    def _read_manifest(self, file_path):
+        manifest_path = os.path.join(file_path, manifest_name)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path) as manifest_file:
+            return json.load(manifest_file)
+
+    def _write_manifest(self, file_path, parts, partitioning=None):
+        """
+        Atomically replaces the manifest listing the parts of a directory, and how it is partitioned.
+        """
+        manifest = {"parts":[os.path.relpath(part, file_path) for part in parts]}
+        if partitioning is not None:
+            manifest["partitioning"] = partitioning.to_dict()
+        temp_path = self._temp_path(os.path.join(file_path, manifest_name))
+        with open(temp_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.replace(temp_path, os.path.join(file_path, manifest_name))
+
+    def _read_dataset_info(self, file_path):
+        """
+        Reads the metadata of a dataset from the footers of its parquet files.
+        """
+        return self._read_parts_info(self._parquet_parts(file_path))
+
+    def _read_parts_info(self, parts):
+        schema = None
+        num_rows = 0
+        num_bytes = 0
+        num_row_groups = 0
+        column_bytes = {}
+        for part in parts:
+            metadata = pq.ParquetFile(part).metadata
+            if schema is None:
+                schema = metadata.schema.to_arrow_schema()
+                writer_options = WriterOptions.from_parquet_metadata(metadata)
+            num_rows += metadata.num_rows
+            num_row_groups += metadata.num_row_groups
+            num_bytes += os.path.getsize(part)
+            for i in range(metadata.num_row_groups):
+                row_group = metadata.row_group(i)
+                for j in range(row_group.num_columns):
+                    column = row_group.column(j)
+                    # nested columns have a chunk per leaf, which are added up under the top level column
+                    name = column.path_in_schema.split(".")[0]
+                    column_bytes[name] = column_bytes.get(name, 0) + column.total_uncompressed_size
+        return DatasetInfo(schema, num_rows, num_bytes, num_row_groups, len(parts), column_bytes, writer_options)
+
+    def _build_catalog(self):
+        """
+        Reads the metadata of all of the datasets in the bucket directory into the catalog.
+        """
+        for bucket in [None] + self._list_buckets():
+            self.catalog.add_bucket(bucket)
+            for file_name in self._list_parquet_files(bucket):
+                file_path = self._create_file_path(file_name[:-8], bucket)
+                try:
+                    self.catalog.put(bucket, file_name[:-8], self._read_dataset_info(file_path))
+                except Exception as e:
+                    logger.exception(f"failed to read the metadata of {file_path}: {e}")
+
+    def _update_catalog(self, file_path, appended_parts=None):
+        """
+        Updates the catalog entry of a dataset after a commit. Appends only read the footers of the
+        appended parts, other commits can rewrite any part, so they read all of them.
+        """
+        bucket, name = self._bucket_and_name(file_path)
+        info = self.catalog.get(bucket, name)
+        if not os.path.exists(file_path):
+            self.catalog.remove(bucket, name)
+        elif appended_parts and info is not None:
+            self.catalog.put(bucket, name, info.with_parts(self._read_parts_info(appended_parts)))
+        else:
+            self.catalog.put(bucket, name, self._read_dataset_info(file_path))
+
+    def _bucket_and_name(self, file_path):
+        bucket_path, file_name = os.path.split(file_path)
+        bucket = None
+        if os.path.normpath(bucket_path) != os.path.normpath(self.bucket_dir):
+            bucket = os.path.basename(bucket_path)
+        return bucket, file_name[:-8]
+
+    def _run_compactor(self):
+        while not self.compactor_stopped.wait(self.compaction_interval):
+            for file_path in self._list_parts_dirs():
+                # the server is shutting down, and waits for the compaction in progress only
+                if self.compactor_stopped.is_set():
+                    break
+                try:
+                    self._compact_dataset(file_path)
+                except Exception as e:
+                    logger.exception(f"compaction of {file_path} failed: {e}")
 
-    def _write_arrow_to_parquet(self, file_path, data_table, mode):
+    def _list_parts_dirs(self):
+        """
+        Returns the paths of all of the datasets stored as more than one part, in all buckets.
+        """
+        file_paths = []
+        for bucket in [None] + self.catalog.buckets():
+            for name, info in self.catalog.datasets(bucket):
+                if info.num_parts > 1:
+                    file_paths.append(self._create_file_path(name, bucket))
+        return file_paths
+
+    def _compact_dataset(self, file_path, force=False):
         """
-        Writes the given Arrow table to a Parquet file at the specified path.
+        Merges a run of consecutive small parts of a dataset, in the same partition, into a single part.
+
+        Parts smaller than row_group_bytes are small. A run is merged once it has compaction_min_parts
+        parts, or once its oldest part is older than compaction_max_age seconds. If force is True,
+        any run of two or more small parts is merged.
+
+        The merged part is written without blocking readers or writers of the dataset, and then
+        committed in the i/o queue. Returns True if parts were merged.
         """
+        parts, part_ids, parquet_files = self._enqueue_io_request(self._open_compaction_run,
+                                                                  args={"file_path":file_path,
+                                                                        "force":force},
+                                                                  read_only=True)
+        if not parts:
+            return False
+
+        logger.info(f"compacting {len(parts)} parts of {file_path}")
+        writer = self._part_writer(file_path, self._resolve_writer_options(file_path, "append"))
         try:
-            df = data_table.to_pandas()
-            if os.path.exists(file_path):
-                    fp.write(file_path, df, append=True)
-            else:
-                fp.write(file_path, df)
-                
-        except FileNotFoundError as e:
-            # Handle a missing file scenario, translate it into a FlightServerError
-            exception = {
-                "type": "FileNotFoundError",
-                "message": f"Attempt to append to missing dataframe {file_path}."
-            }
-            logger.exception(exception)
-            raise flight.FlightServerError(extra_info=json.dumps(exception))
-        
+            schema = parquet_files[0].schema_arrow
+            for row_group in self._coalesce_batches(self._iter_parquet_batches(parquet_files, schema), writer.row_group_rows):
+                writer.write(row_group)
+            writer.close()
+            return self._enqueue_io_request(self._commit_compaction,
+                                            args={"file_path":file_path,
+                                                  "temp_path":writer.path,
+                                                  "compacted_parts":parts,
+                                                  "compacted_part_ids":part_ids})
+        except BaseException:
+            writer.discard()
+            raise
+
+    def _open_compaction_run(self, file_path, force):
+        """
+        Finds the run of parts to compact and opens them, which pins them until they have been merged.
+        Returns the paths of the parts, their file ids, see _part_id(), and the open files.
+        """
+        if not os.path.isdir(file_path):
+            return [], [], []
+        # parts are only merged with the parts of the same partition
+        partition_runs = {}
+        for part in self._parquet_parts(file_path):
+            runs = partition_runs.setdefault(os.path.dirname(part), [[]])
+            if os.path.getsize(part) < self.row_group_bytes:
+                runs[-1].append(part)
+            elif runs[-1]:
+                runs.append([])
+
+        now = time.time()
+        for run in itertools.chain.from_iterable(partition_runs.values()):
+            if len(run) < 2:
+                continue
+            oldest = min(os.path.getmtime(part) for part in run)
+            if force or len(run) >= self.compaction_min_parts or now - oldest >= self.compaction_max_age:
+                parquet_files = [pq.ParquetFile(part) for part in run]
+                return run, [self._part_id(part) for part in run], parquet_files
+        return [], [], []
+
+    def _part_id(self, part):
+        """
+        Identifies a part file by its inode, since a replaced dataset numbers its parts from part-00000 again.
+        An inode can't be reused while the file is open, and the parts being compacted are kept open.
+        """
+        stat = os.stat(part)
+        return (stat.st_dev, stat.st_ino)
+
+    def _commit_compaction(self, file_path, temp_path, compacted_parts, compacted_part_ids):
+        """
+        Replaces the compacted parts of a dataset with the merged part in a single manifest update,
+        in the place of the first of them. Returns False if the dataset was replaced or deleted while
+        the parts were being merged.
+        """
+        parts = self._parquet_parts(file_path) if os.path.isdir(file_path) else []
+        # the parts of a replaced dataset can have the same paths as the compacted parts, but not the same files
+        if not all(part in parts and self._part_id(part) == part_id
+                   for part, part_id in zip(compacted_parts, compacted_part_ids)):
+            os.remove(temp_path)
+            return False
+
+        part_path = self._next_part_path(file_path, self._partition_of(file_path, compacted_parts[0]))
+        os.rename(temp_path, part_path)
+        parts[parts.index(compacted_parts[0])] = part_path
+        parts = [part for part in parts if part not in compacted_parts]
+        self._write_manifest(file_path, parts, self._read_partitioning(file_path))
+        self._publish_version(file_path)
+
+        # pinned readers still have the old parts open or linked, and keep reading them,
+        # this also cleans up parts orphaned by an interrupted commit
+        for part in self._list_part_files(file_path):
+            part = os.path.join(file_path, part)
+            if part not in parts:
+                os.remove(part)
+        return True
+
     def list_flights(self, context, criteria):
         """
         Lists available dataframes based on given criteria.
 
         You can optionally specify a bucket name to list dataframes in the specified bucket.
+        The dataframes are listed in order of name, and can be filtered by a regex that
+        must match somewhere in the name, and by a prefix. The list can be paged with
+        limit, passing the name of the last dataframe of a page as continuation_token
+        to get the next page.
 
         Args:
-            criteria: Criteria to filter datasets.
+            criteria: Criteria to filter datasets. A json object with the keys bucket, regex, 
+                and optionally prefix, limit and continuation_token.
 
         Yields:
             flight.FlightInfo: Information about each available flight (dataset).
@@ -396,7 +1680,7 @@ class ShootsServer(flight.FlightServerBase):
         Example:
             ```python
                 # create the criteria. bucket can be None
-                criteria_data = {"bucket":"my_bucket", "regex":None}
+                criteria_data = {"bucket":"my_bucket", "regex":"^sensor_", "limit":100}
                 criateria_bytes = json.dumps(descriptor_data).encode()
 
                 # get the list of FlightInfos.
@@ -406,46 +1690,184 @@ class ShootsServer(flight.FlightServerBase):
                 for flight in flights:
                     print(flight.descriptor.path[0].decode(), flight.schema)                
             ```
-
-        Note:
-            The regex criteria is not yet implemented on the server.
         """
 
         logger.info("list_flights")
 
         criteria_info = json.loads(criteria.decode())
         bucket = criteria_info["bucket"]
-        regex = criteria_info["regex"]
+        regex = criteria_info.get("regex")
+        prefix = criteria_info.get("prefix")
+        limit = criteria_info.get("limit")
+        continuation_token = criteria_info.get("continuation_token")
+
+        try:
+            pattern = re.compile(regex) if regex else None
+        except re.error as e:
+            self._raise_value_error(f"Invalid regex {regex}: {e}")
+        if limit is not None and (not isinstance(limit, int) or limit < 1):
+            self._raise_value_error(f"limit must be a positive integer, got {limit}")
 
         # gaurd against the bucket not existing
-        if bucket:
-            bucket_dir = os.path.join(self.bucket_dir, bucket)
-            if not os.path.exists(bucket_dir):
-                exception = {"type":"FileNotFoundError",
-                             "message":f"No such bucket {bucket}"}
-                logger.exception(exception)
-                raise flight.FlightServerError(extra_info=json.dumps(exception))
-            
-        # call helper function to get a list of files, bucket may be NONE
-        files = self._list_parquet_files(bucket)
-
-        # open each parquet to grab the schema
-        for file in files:
-            # set the file_path for each parquet file, in a bucket or not
-            file_path = os.path.join(self.bucket_dir, file)
-            if bucket:
-                file_path = os.path.join(self.bucket_dir, bucket, file)
-
-            # read in the schame and yield a FlightDestriptor for each parquet file
-            parquet_file = pq.ParquetFile(file_path)
-            schema = parquet_file.schema.to_arrow_schema()
-            descriptor = flight.FlightDescriptor.for_path(file[:-8])
-
-            yield flight.FlightInfo(schema,
+        bucket = bucket or None
+        if bucket and not self.catalog.has_bucket(bucket):
+            exception = {"type":"FileNotFoundError",
+                         "message":f"No such bucket {bucket}"}
+            logger.exception(exception)
+            raise flight.FlightServerError(extra_info=json.dumps(exception))
+
+        # the metadata comes from the catalog, so no files are opened
+        count = 0
+        for name, info in self.catalog.datasets(bucket):
+            if continuation_token is not None and name <= continuation_token:
+                continue
+            if prefix and not name.startswith(prefix):
+                continue
+            if pattern and not pattern.search(name):
+                continue
+            if limit is not None and count >= limit:
+                break
+            count += 1
+
+            num_rows = info.num_rows + self._buffered_rows(self._create_file_path(name, bucket))
+            descriptor = flight.FlightDescriptor.for_path(name)
+
+            yield flight.FlightInfo(info.schema,
                             descriptor,
                             [],
-                            parquet_file.metadata.num_rows,
-                            parquet_file.metadata.serialized_size)
+                            num_rows,
+                            info.num_bytes)
+
+    def get_flight_info(self, context, descriptor):
+        """
+        Returns the metadata of a dataframe, or of the result of a SQL query against it,
+        without reading any data.
+
+        The metadata of the dataframe comes from the catalog. For a SQL query, the query is planned
+        to get the schema of the result, but not run, so the number of rows is -1 (unknown) unless
+        the result is cached. The estimated size is an upper bound that doesn't account for filters
+        or aggregation. The endpoint's ticket can be passed to do_get to retrieve the data.
+
+        Args:
+            descriptor (flight.FlightDescriptor): A command with the json keys name, bucket and 
+                optionally sql, as in the ticket for do_get.
+
+        Returns:
+            flight.FlightInfo: The schema, number of rows and size on disk of the dataframe, with a json
+                object of num_row_groups, num_parts, estimated_bytes and writer_options as the app_metadata.
+
+        Example:
+            ```python
+                descriptor_bytes = json.dumps({"name":"my_dataset", "bucket":None}).encode()
+                info = client.get_flight_info(flight.FlightDescriptor.for_command(descriptor_bytes))
+                print(info.schema, info.total_records, json.loads(info.app_metadata))
+            ```
+        """
+        descriptor_info = json.loads(descriptor.command.decode())
+        name = descriptor_info["name"]
+        bucket = descriptor_info.get("bucket") or None
+        sql_query = descriptor_info.get("sql")
+        logger.info(f"get_flight_info: {name}, bucket:{bucket}, sql:{sql_query}")
+
+        info = self._dataset_info(name, bucket)
+        file_path = self._create_file_path(name, bucket)
+        buffered_rows = self._buffered_rows(file_path)
+        num_rows = info.num_rows + buffered_rows
+        schema = info.schema
+        estimated_bytes = self._estimate_result_bytes(info, schema, buffered_rows)
+        if sql_query:
+            schema, result = self._plan_query(name, bucket, file_path, sql_query)
+            if result is None:
+                num_rows = -1
+                estimated_bytes = self._estimate_result_bytes(info, schema, buffered_rows)
+            else:
+                num_rows = result.num_rows
+                estimated_bytes = result.nbytes
+
+        metadata = {"num_row_groups":info.num_row_groups,
+                    "num_parts":info.num_parts,
+                    "estimated_bytes":estimated_bytes,
+                    "writer_options":info.writer_options.to_dict()}
+        ticket = flight.Ticket(json.dumps({"name":name, "bucket":bucket, "sql":sql_query}).encode())
+        return flight.FlightInfo(schema,
+                                 descriptor,
+                                 [flight.FlightEndpoint(ticket, [])],
+                                 num_rows,
+                                 info.num_bytes,
+                                 app_metadata=json.dumps(metadata).encode())
+
+    def get_schema(self, context, descriptor):
+        """
+        Returns the schema of a dataframe, or of the result of a SQL query against it, without reading any data.
+
+        Args:
+            descriptor (flight.FlightDescriptor): A command with the json keys name, bucket and 
+                optionally sql, as in the ticket for do_get.
+
+        Returns:
+            flight.SchemaResult: The arrow schema.
+        """
+        descriptor_info = json.loads(descriptor.command.decode())
+        name = descriptor_info["name"]
+        bucket = descriptor_info.get("bucket") or None
+        sql_query = descriptor_info.get("sql")
+        logger.info(f"get_schema: {name}, bucket:{bucket}, sql:{sql_query}")
+
+        schema = self._dataset_info(name, bucket).schema
+        if sql_query:
+            file_path = self._create_file_path(name, bucket)
+            schema, _ = self._plan_query(name, bucket, file_path, sql_query)
+        return flight.SchemaResult(schema)
+
+    def _dataset_info(self, name, bucket):
+        info = self.catalog.get(bucket, name)
+        if info is None:
+            self._raise_dataframe_not_found_error(name, bucket)
+        return info
+
+    def _plan_query(self, name, bucket, file_path, sql_query):
+        """
+        Returns the schema of the result of a SQL query, and the result if it is cached.
+        """
+        schema, references = self._find_references(name, bucket, sql_query)
+        if references is not None:
+            return schema, None
+        try:
+            return self._enqueue_io_request(self._query_schema,
+                                            args={"name":name,
+                                                  "file_path":file_path,
+                                                  "sql_query":sql_query},
+                                            read_only=True)
+        except FileNotFoundError:
+            self._raise_dataframe_not_found_error(name, bucket)
+
+    def _query_schema(self, name, file_path, sql_query):
+        buffered_batches = self._buffered_batches(file_path)
+        version = self._dataset_version(file_path, buffered_batches)
+        table = self.results.get(file_path, version, sql_query)
+        if table is not None:
+            return table.schema, table
+
+        registration = self._registration(name, file_path, version, buffered_batches)
+        try:
+            return registration.ctx.sql(sql_query).schema(), None
+        except Exception as e:
+            self._raise_datafusion_error(e)
+
+    def _estimate_result_bytes(self, info, schema, buffered_rows):
+        """
+        Estimates the in memory size of a result with the given schema, from the uncompressed size of the
+        columns it shares with the dataset, and the width of any other fixed width columns.
+        """
+        num_rows = info.num_rows + buffered_rows
+        scale = num_rows / info.num_rows if info.num_rows else 1
+        estimated_bytes = 0
+        for field in schema:
+            if field.name in info.column_bytes:
+                estimated_bytes += info.column_bytes[field.name] * scale
+            elif pa.types.is_primitive(field.type) and field.type.bit_width >= 8:
+                estimated_bytes += field.type.bit_width // 8 * num_rows
+        return int(estimated_bytes)
 
     def do_action(self, context, action):
         """
@@ -520,6 +1942,9 @@ class ShootsServer(flight.FlightServerBase):
             # ping
             result = self.shoots_client.ping() # result should be pong
 
+            # stats
+            stats = self.shoots_client.stats() # a dict of counters
+
             ```
         """
 
@@ -539,93 +1964,330 @@ class ShootsServer(flight.FlightServerBase):
         if action == "shutdown":
             return self.shutdown()
         if action == "resample":
-            if action_info.get("sql",False):
-                return self._resample_with_sql(action_info)
-            else:
-                return self._resample_time_series(action_info)
+            return self._flight_result_from_dict(self._run_resample(action_info))
+        if action == "create_view":
+            return self._create_view(action_info)
+        if action == "drop_view":
+            return self._drop_view(action_info)
+        if action == "views":
+            return self._views(action_info)
         if action == "ping":
             result = flight.Result(b'pong')
             return [result]
+        if action == "stats":
+            return self._stats()
+
+    def _stats(self):
+        stats = {"registrations":self.registrations.stats(),
+                 "results":self.results.stats(),
+                 "io_queue_depths":self.io_executor.queue_depths()}
+        return self._flight_result_from_dict(stats)
+
+    def _run_resample(self, resample_info):
+        if resample_info.get("sql",False):
+            return self._resample_with_sql(resample_info)
+        else:
+            return self._resample_time_series(resample_info)
 
     def _resample_with_sql(self, resample_info):
         source = resample_info["source"]
-        target = resample_info["target"]
         source_bucket = resample_info["source_bucket"]
-        target_bucket = resample_info["target_bucket"]
         sql = resample_info["sql"]
-        mode = resample_info["mode"]
-
-        self._raise_if_invalid_put_mode(mode)
-
-        target_rows = -1
 
-        source_file_path = self._create_file_path(source, source_bucket)
-        target_file_path = self._create_file_path(target, target_bucket)
-
-        if not os.path.exists(source_file_path):
-            exception = {"type":"FileNotFoundError",
-                "message":f"Dataframe {source} not found"}
-            logger.exception(exception)
-            raise flight.FlightServerError(extra_info=json.dumps(exception))
-        
-        table = self._enqueue_io_request(self._read_arrow_from_parquet,
-                                    args={"name":source,
-                                          "file_path":source_file_path,
-                                          "sql_query":sql})
-        target_rows = table.num_rows
-
-        self._handle_put_modes(target, mode, target_file_path)
-        self._enqueue_io_request(function=self._write_arrow_to_parquet,
-                                 args = {"file_path":target_file_path,
-                                "data_table":table,
-                                "mode":mode})
+        source_file_path = self._resample_source_file_path(source, source_bucket)
+        target_rows = self._resample(resample_info, source_file_path, sql)
         
-        return self._flight_result_from_dict({"target_rows":target_rows})
+        return {"target_rows":target_rows}
     
     def _resample_time_series(self, resample_info):
         source = resample_info["source"]
-        target = resample_info["target"]
-        rule = resample_info["rule"]
-        time_col = resample_info["time_col"]
-        aggregation_func = resample_info["aggregation_func"]
         source_bucket = resample_info["source_bucket"]
-        target_bucket = resample_info["target_bucket"]
-        mode = resample_info["mode"]
-
-        source_rows = -1
-        target_rows = -1
 
-        source_file_path = self._create_file_path(source,source_bucket)
+        source_file_path = self._resample_source_file_path(source, source_bucket)
+        try:
+            resample = Resample.from_dict(resample_info)
+            info = self._dataset_info(source, source_bucket)
+            sql = resample.query(source, info.schema)
+        except ValueError as e:
+            self._raise_value_error(str(e))
+
+        # the source isn't read into memory, so its rows are counted from the catalog
+        source_rows = info.num_rows + self._buffered_rows(source_file_path)
+        if resample_info.get("incremental"):
+            target_rows, watermark = self._resample_incrementally(resample_info, source_file_path, resample, info.schema)
+            return {"source_rows":source_rows,
+                    "target_rows":target_rows,
+                    "watermark":watermark}
+
+        target_rows = self._resample(resample_info, source_file_path, sql)
+
+        return {"source_rows":source_rows,
+                "target_rows":target_rows}
+
+    def _resample_source_file_path(self, source, source_bucket):
+        source_file_path = self._create_file_path(source, source_bucket)
         if not os.path.exists(source_file_path):
             exception = {"type":"FileNotFoundError",
                 "message":f"Dataframe {source} not found"}
             logger.exception(exception)
             raise flight.FlightServerError(extra_info=json.dumps(exception))
-        table = self._enqueue_io_request(self._read_arrow_from_parquet,
-                                    args={"name":target,
-                                          "file_path":source_file_path})
+        return source_file_path
+
+    def _resample(self, resample_info, source_file_path, sql):
+        """
+        Writes the result of a SQL query against the source of a resample into its target.
+
+        Returns the number of rows written.
+        """
+        mode = resample_info["mode"]
+        self._raise_if_invalid_put_mode(mode)
+        target_file_path = self._create_file_path(resample_info["target"], resample_info["target_bucket"])
 
-        df_source = table.to_pandas()
+        _, batches = self._query(resample_info["source"], resample_info["source_bucket"], source_file_path, sql)
 
-        source_rows = df_source.shape[0]
-        df_source.set_index(time_col, inplace=True)
-        df_source = df_source.resample(rule)
+        # the result is streamed from DataFusion into the target rather than collected first
+        self._handle_put_modes(resample_info["target"], mode, target_file_path)
+        return self._write_batches(target_file_path, batches, mode)
 
-        method = getattr(df_source, aggregation_func, None)
-        df_target = method()
-        target_rows = df_target.shape[0]
-        table = pa.Table.from_pandas(df_target, preserve_index=False)
-        target_file_path = self._create_file_path(target, target_bucket)
-        
-        self._handle_put_modes(target, mode, target_file_path)
+    def _resample_incrementally(self, resample_info, source_file_path, resample, schema):
+        """
+        Resamples only the rows of the source from the last bin written to the target by the previous
+        incremental resample on, and replaces the target's rows from that bin on with the result, so that
+        the bin that was still filling is merged with its new rows. The start of the last bin written is
+        kept as the watermark of the source and target pair, in the target's directory.
 
-        self._enqueue_io_request(self._write_arrow_to_parquet,
+        If the target wasn't written by an incremental resample of the same source with the same
+        rule, time column and aggregation function, the whole source is resampled into it instead,
+        replacing it. Rows added to the source with a time before the watermark are not picked up.
+
+        Returns the number of rows written, and the new watermark.
+        """
+        source = resample_info["source"]
+        source_bucket = resample_info["source_bucket"]
+        target_file_path = self._create_file_path(resample_info["target"], resample_info["target_bucket"])
+
+        previous_state = self._enqueue_io_request(self._read_resample_state,
+                                                  args={"file_path":target_file_path},
+                                                  read_only=True)
+        since = None
+        if (previous_state is not None
+                and previous_state["source"] == source
+                and previous_state["source_bucket"] == source_bucket
+                and previous_state["resample"] == resample.to_dict()):
+            since = previous_state["watermark"]
+
+        _, batches = self._enqueue_io_request(self._query_parquet,
+                                              args={"name":source,
+                                                    "file_path":source_file_path,
+                                                    "sql_query":resample.query(source, schema, since)},
+                                              read_only=True)
+
+        if since is not None:
+            # rows buffered by appends to the target are written first, so that the tail replaces them too
+            self._flush_memtable(target_file_path)
+        mode = "append" if since is not None else "replace"
+        writer = self._part_writer(target_file_path, self._resolve_writer_options(target_file_path, mode))
+        watermark = since
+        try:
+            # the bins are in order of time, so the last one written is the new watermark
+            for row_group in self._coalesce_batches(batches, writer.row_group_rows):
+                writer.write(row_group)
+                watermark = pc.max(row_group.column(resample.time_col)).cast(pa.string()).as_py()
+            writer.close()
+        except BaseException:
+            writer.discard()
+            raise
+
+        # the source has no rows from the watermark on, which only happens if it was replaced
+        if not writer.started:
+            return 0, since
+
+        state = {"source":source,
+                 "source_bucket":source_bucket,
+                 "resample":resample.to_dict(),
+                 "watermark":watermark}
+        self._enqueue_io_request(self._commit_resample,
                                  args={"file_path":target_file_path,
-                                "data_table":table,
-                                "mode":mode})
+                                       "temp_path":writer.path,
+                                       "previous_state":previous_state if since is not None else None,
+                                       "state":state})
+        return writer.num_rows, watermark
 
-        return self._flight_result_from_dict({"source_rows":source_rows,
-                                              "target_rows":target_rows})
+    def _commit_resample(self, file_path, temp_path, previous_state, state):
+        """
+        Publishes the bins of an incremental resample as the next version of the target. Without a previous
+        state the target is replaced. Otherwise the target's rows from the previous watermark on are removed,
+        by rewriting the parts that have any, and the new part is appended, in a single manifest update.
+        """
+        if previous_state is None:
+            temp_dir = self._temp_parts_dir(temp_path)
+            self._write_resample_state(temp_dir, state)
+            self._replace_parquet(file_path, temp_dir)
+            self._discard_memtable(file_path)
+            self._publish_version(file_path)
+            return
+
+        if self._read_resample_state(file_path) != previous_state:
+            os.remove(temp_path)
+            exception = {"type":"ShootsIOError",
+                         "message":f"{file_path} was written to while it was being resampled, try again"}
+            logger.exception(exception)
+            raise flight.FlightServerError(extra_info=json.dumps(exception))
+
+        parts = self._parquet_parts(file_path)
+        kept_parts = []
+        for part in parts:
+            kept_part = self._truncate_part(file_path, part, state["resample"]["time_col"], previous_state["watermark"])
+            if kept_part is not None:
+                kept_parts.append(kept_part)
+        part_path = self._next_part_path(file_path)
+        os.rename(temp_path, part_path)
+        self._write_manifest(file_path, kept_parts + [part_path], self._read_partitioning(file_path))
+        self._write_resample_state(file_path, state)
+        self._publish_version(file_path)
+
+        # pinned readers still have the rewritten parts open or linked, and keep reading them
+        for part in parts:
+            if part not in kept_parts:
+                os.remove(part)
+
+    def _truncate_part(self, file_path, part, time_col, since):
+        """
+        Returns the part as is if it has no rows from since on, otherwise writes its earlier rows to
+        a new part and returns that, or None if it has no earlier rows.
+        """
+        with pa.OSFile(part) as file:
+            fragment = parquet_format.make_fragment(file)
+            time_type = fragment.physical_schema.field(time_col).type
+            expression = pc.field(time_col) >= pa.scalar(since).cast(time_type)
+            # row groups that end before since are skipped by their statistics
+            if fragment.count_rows(filter=expression) == 0:
+                return part
+            table = fragment.to_table(filter=~expression)
+        if table.num_rows == 0:
+            return None
+
+        writer = self._part_writer(file_path, self._resolve_writer_options(file_path, "append"))
+        try:
+            writer.write(table)
+            writer.close()
+        except BaseException:
+            writer.discard()
+            raise
+        part_path = self._next_part_path(file_path, self._partition_of(file_path, part))
+        os.rename(writer.path, part_path)
+        return part_path
+
+    def _read_resample_state(self, file_path):
+        """
+        Returns the state of the last incremental resample into a dataset, or None if it wasn't
+        written by one. The state is kept next to the manifest, so replacing or deleting the dataset drops it.
+        """
+        state_path = os.path.join(file_path, resample_state_name)
+        if not os.path.isfile(state_path):
+            return None
+        with open(state_path) as state_file:
+            return json.load(state_file)
+
+    def _remove_resample_state(self, file_path):
+        state_path = os.path.join(file_path, resample_state_name)
+        if os.path.isfile(state_path):
+            os.remove(state_path)
+
+    def _write_resample_state(self, file_path, state):
+        temp_path = self._temp_path(os.path.join(file_path, resample_state_name))
+        with open(temp_path, "w") as state_file:
+            json.dump(state, state_file)
+        os.replace(temp_path, os.path.join(file_path, resample_state_name))
+
+    def _create_view(self, view_info):
+        """
+        Defines a materialized view, and materializes it. Returns the result of the resample that materialized it.
+        """
+        try:
+            view = View.from_dict(view_info)
+        except (ValueError, KeyError, TypeError) as e:
+            self._raise_value_error(f"Invalid view: {e}")
+        if (view.bucket, view.name) in self.views.upstream(view.source_bucket, view.source):
+            self._raise_value_error(f"The view {view.name} can't be computed from itself")
+        target_file_path = self._create_file_path(view.name, view.bucket)
+        if self.views.get(view.bucket, view.name) is None and os.path.exists(target_file_path):
+            self._raise_dataframe_exists_error(view.name)
+
+        # a redefined view starts over
+        result = self._refresh_view(view, full=True)
+        self.views.put(view)
+        return self._flight_result_from_dict(result)
+
+    def _drop_view(self, view_info):
+        # the materialized dataframe is kept, and can be deleted like any other
+        if self.views.remove(view_info.get("bucket"), view_info["name"]) is None:
+            exception = {"type":"FileNotFoundError",
+                         "message":f"View {view_info['name']} not found"}
+            logger.exception(exception)
+            raise flight.FlightServerError(extra_info=json.dumps(exception))
+        return self._flight_result_from_dict({"success":True, "message":f"dropped view {view_info['name']}"})
+
+    def _views(self, view_info):
+        return self._list_to_flight_result([view.to_dict() for view in self.views.list(view_info.get("bucket"))])
+
+    def _schedule_view_refresh(self, file_path, full=False):
+        """
+        Schedules a refresh of the views computed from a dataset, refresh_lag seconds from now,
+        unless one is already scheduled.
+        """
+        views = self.views.of_source(*self._bucket_and_name(file_path))
+        if not views:
+            return
+        now = time.time()
+        with self.view_refreshes_lock:
+            for view in views:
+                due, was_full = self.view_refreshes.get((view.bucket, view.name), (now + view.refresh_lag, False))
+                self.view_refreshes[(view.bucket, view.name)] = (due, was_full or full)
+        self.view_refresh_requested.set()
+
+    def _run_view_refresher(self):
+        while not self.view_refresher_stopped.is_set():
+            with self.view_refreshes_lock:
+                due = min((due for due, _ in self.view_refreshes.values()), default=None)
+            self.view_refresh_requested.wait(None if due is None else max(due - time.time(), 0))
+            self.view_refresh_requested.clear()
+            if not self.view_refresher_stopped.is_set():
+                self._refresh_views()
+
+    def _refresh_views(self, force=False):
+        """
+        Refreshes the views whose refresh is due, or all of those waiting for one if force is True.
+        """
+        now = time.time()
+        with self.view_refreshes_lock:
+            to_refresh = {key:full for key, (due, full) in self.view_refreshes.items() if force or due <= now}
+            for key in to_refresh:
+                del self.view_refreshes[key]
+        for (bucket, name), full in to_refresh.items():
+            view = self.views.get(bucket, name)
+            # the view was dropped since
+            if view is None:
+                continue
+            try:
+                self._refresh_view(view, full)
+            except Exception as e:
+                logger.exception(f"refreshing the view {name} in bucket {bucket} failed: {e}")
+
+    def _refresh_view(self, view, full=False):
+        """
+        Brings a view up to date with its source, and schedules a refresh of the views computed from it.
+        Returns the result of the resample.
+        """
+        logger.debug(f"refreshing the view {view.name} in bucket {view.bucket}")
+        target_file_path = self._create_file_path(view.name, view.bucket)
+        if full and view.resample is not None:
+            self._enqueue_io_request(self._remove_resample_state,
+                                     args={"file_path":target_file_path})
+        result = self._run_resample(view.resample_info())
+        # a SQL view or a full refresh replaces the target, so the views computed from it have to start over too
+        self._schedule_view_refresh(target_file_path, full=full or view.sql is not None)
+        return result
 
     def list_actions(self, context):
         """
@@ -644,7 +2306,11 @@ class ShootsServer(flight.FlightServerBase):
             ("delete_bucket", "Delete a bucket"),
             ("shutdown", "Shutdown the server"),
             ("resample", "Conversion and resampling of time series or with a sql query"),
-            ("ping", "Convenience action for testing if the server is functional")
+            ("create_view", "Create or redefine a materialized view of a dataframe"),
+            ("drop_view", "Stop refreshing a materialized view"),
+            ("views", "List the materialized views in a bucket"),
+            ("ping", "Convenience action for testing if the server is functional"),
+            ("stats", "Counters for the server's caches and queues")
         ]
 
         return [flight.ActionType(action, description) for action, description in actions]
@@ -655,7 +2321,9 @@ class ShootsServer(flight.FlightServerBase):
             bucket_path = os.path.join(self.bucket_dir, bucket)
         else:
             bucket_path = self.bucket_dir
-        os.makedirs(bucket_path, exist_ok=True)
+        if not os.path.isdir(bucket_path):
+            os.makedirs(bucket_path, exist_ok=True)
+            self.catalog.add_bucket(bucket or None)
 
         file_name = f"{name}.parquet"
 
@@ -680,15 +2348,30 @@ class ShootsServer(flight.FlightServerBase):
                 logger.exception(exception)
                 raise flight.FlightServerError(extra_info=json.dumps(exception))
         else:
+            # each dataframe is deleted in its i/o queue, after the operations queued before it, and publishes
+            # a new version, so that queries don't keep reading it from a cached registration or result
+            for file_name in self._list_parquet_files(bucket):
+                try:
+                    self._enqueue_io_request(self._delete_parquet,
+                                             args={"file_path":os.path.join(bucket_path, file_name)})
+                except FileNotFoundError:
+                    # deleted since the bucket was listed
+                    pass
             shutil.rmtree(bucket_path)
+            self.catalog.remove_bucket(bucket)
+            self.views.remove_bucket(bucket)
  
         result_info = {"message":f"bucket {bucket} deleted"}
         return self._flight_result_from_dict(result_info)
 
     def _buckets(self):
+        return self._list_to_flight_result(self.catalog.buckets())
+
+    def _list_buckets(self):
         entries = os.listdir(self.bucket_dir)
-        buckets = [entry for entry in entries if os.path.isdir(os.path.join(self.bucket_dir, entry))]
-        return self._list_to_flight_result(buckets)
+        # hidden directories and dataframes stored as a directory of parts aren't buckets
+        return [entry for entry in entries if os.path.isdir(os.path.join(self.bucket_dir, entry))
+                and not entry.startswith(".") and not entry.endswith(".parquet")]
 
     def _list_to_flight_result(self, strings):
         bytes = json.dumps(strings).encode()
@@ -743,12 +2426,32 @@ class ShootsServer(flight.FlightServerBase):
                 # prints ["shutdown command received"]
             ```
         """
-        shutdown_thread = threading.Thread(target=super(ShootsServer, self).shutdown)
+        shutdown_thread = threading.Thread(target=self._shutdown_server)
         shutdown_thread.start()
         
         logger.info("\nShutting down Shoots server")
         return self._list_to_flight_result(["shutdown command received"])
 
+    def _shutdown_server(self):
+        super(ShootsServer, self).shutdown()
+        self.compactor_stopped.set()
+        # a compaction in progress commits through the i/o executor, so it has to finish before that shuts down
+        if self.compactor_thread is not None:
+            self.compactor_thread.join()
+        self.memtable_flusher_stopped.set()
+        self.memtable_flush_requested.set()
+        # the flusher's last pass can still be committing, and has to be done before the final flush
+        if self.memtable_flusher_thread is not None:
+            self.memtable_flusher_thread.join()
+        # no more puts can arrive, so the buffered rows are written to disk for the last time
+        self._flush_memtables(force=True)
+        self.view_refresher_stopped.set()
+        self.view_refresh_requested.set()
+        self.view_refresher_thread.join()
+        # and the views that are waiting for a refresh are refreshed for the last time
+        self._refresh_views(force=True)
+        self.io_executor.shutdown()
+
     def _self_decode_jwt(self, token):
         decoded_token = jwt.decode(token, "secret", algorithms=["HS256"])
         return decoded_token
@@ -779,6 +2482,24 @@ def main():
     parser.add_argument('--cert_file', type=str, default=None, help='Path to file for cert file for TLS.')
     parser.add_argument('--key_file', type=str, default=None, help='Path to file for key file for TLS.')
     parser.add_argument('--secret', type=str, default=None, help='A secret key used to generate a JWT required for making calls from a client. If no secret is specified, then no JWT is required.')
+    parser.add_argument('--write_engine', type=str, default='fastparquet', choices=write_engines, help='The engine used to write parquet files.')
+    parser.add_argument('--row_group_rows', type=int, default=1_000_000, help='Target number of rows per parquet row group.')
+    parser.add_argument('--row_group_bytes', type=int, default=128 * 1024 * 1024, help='Target number of bytes per parquet row group.')
+    parser.add_argument('--query_memory_limit', type=int, default=None, help='Maximum number of bytes of memory that the SQL queries against a dataframe can use, shared by the queries that run at the same time.')
+    parser.add_argument('--io_workers', type=int, default=8, help='Number of worker threads that read and write datasets.')
+    parser.add_argument('--io_queue_depth', type=int, default=64, help='Number of i/o operations that can wait on a single dataset.')
+    parser.add_argument('--layout', type=str, default='file', choices=layouts, help='How new datasets are stored on disk.')
+    parser.add_argument('--compaction_interval', type=float, default=60, help='Seconds between merging small parts of datasets, 0 disables compaction.')
+    parser.add_argument('--compaction_min_parts', type=int, default=10, help='Number of consecutive small parts that are merged on the next compaction.')
+    parser.add_argument('--compaction_max_age', type=float, default=300, help='Seconds after which two or more consecutive small parts are merged.')
+    parser.add_argument('--memtable', action='store_true', help='Buffer small appends in memory before writing them to disk.')
+    parser.add_argument('--memtable_max_age', type=float, default=5, help='Most seconds that appended rows are buffered in memory.')
+    parser.add_argument('--registration_cache_size', type=int, default=64, help='Number of datasets whose DataFusion context is kept between queries.')
+    parser.add_argument('--result_cache_bytes', type=int, default=64 * 1024 * 1024, help='Memory budget for cached SQL query results, 0 disables the cache.')
+    parser.add_argument('--compression', type=str, default=None, choices=compressions, help='Default compression codec of new datasets.')
+    parser.add_argument('--compression_level', type=int, default=None, help='Default compression level of new datasets.')
+    parser.add_argument('--use_dictionary', action=argparse.BooleanOptionalAction, default=None, help='Whether new datasets dictionary encode their columns, with the pyarrow write engine.')
+    parser.add_argument('--write_statistics', action=argparse.BooleanOptionalAction, default=None, help='Whether new datasets write column statistics.')
 
     args = parser.parse_args()
 
@@ -789,6 +2510,29 @@ def main():
     args.cert_file = os.getenv('SHOOTS_CERT_FILE', args.cert_file)
     args.key_file = os.getenv('SHOOTS_KEY_FILE', args.key_file)
     args.secret = os.getenv('SHOOTS_SECRET', args.secret)
+    args.write_engine = os.getenv('SHOOTS_WRITE_ENGINE', args.write_engine)
+    args.row_group_rows = int(os.getenv('SHOOTS_ROW_GROUP_ROWS', args.row_group_rows))
+    args.row_group_bytes = int(os.getenv('SHOOTS_ROW_GROUP_BYTES', args.row_group_bytes))
+    if os.getenv('SHOOTS_QUERY_MEMORY_LIMIT'):
+        args.query_memory_limit = int(os.getenv('SHOOTS_QUERY_MEMORY_LIMIT'))
+    args.io_workers = int(os.getenv('SHOOTS_IO_WORKERS', args.io_workers))
+    args.io_queue_depth = int(os.getenv('SHOOTS_IO_QUEUE_DEPTH', args.io_queue_depth))
+    args.layout = os.getenv('SHOOTS_LAYOUT', args.layout)
+    args.compaction_interval = float(os.getenv('SHOOTS_COMPACTION_INTERVAL', args.compaction_interval))
+    args.compaction_min_parts = int(os.getenv('SHOOTS_COMPACTION_MIN_PARTS', args.compaction_min_parts))
+    args.compaction_max_age = float(os.getenv('SHOOTS_COMPACTION_MAX_AGE', args.compaction_max_age))
+    if os.getenv('SHOOTS_MEMTABLE'):
+        args.memtable = os.getenv('SHOOTS_MEMTABLE').lower() in ("1", "true", "yes")
+    args.memtable_max_age = float(os.getenv('SHOOTS_MEMTABLE_MAX_AGE', args.memtable_max_age))
+    args.registration_cache_size = int(os.getenv('SHOOTS_REGISTRATION_CACHE_SIZE', args.registration_cache_size))
+    args.result_cache_bytes = int(os.getenv('SHOOTS_RESULT_CACHE_BYTES', args.result_cache_bytes))
+    args.compression = os.getenv('SHOOTS_COMPRESSION', args.compression)
+    if os.getenv('SHOOTS_COMPRESSION_LEVEL'):
+        args.compression_level = int(os.getenv('SHOOTS_COMPRESSION_LEVEL'))
+    if os.getenv('SHOOTS_USE_DICTIONARY'):
+        args.use_dictionary = os.getenv('SHOOTS_USE_DICTIONARY').lower() in ("1", "true", "yes")
+    if os.getenv('SHOOTS_WRITE_STATISTICS'):
+        args.write_statistics = os.getenv('SHOOTS_WRITE_STATISTICS').lower() in ("1", "true", "yes")
 
     if args.cert_file is not None and args.key_file is not None:
         location = flight.Location.for_grpc_tls(args.host, args.port)
@@ -797,12 +2541,50 @@ def main():
         server = ShootsServer(location,
                               bucket_dir=args.bucket_dir,
                               certs=certs,
-                              secret=args.secret
+                              secret=args.secret,
+                              write_engine=args.write_engine,
+                              row_group_rows=args.row_group_rows,
+                              row_group_bytes=args.row_group_bytes,
+                              query_memory_limit=args.query_memory_limit,
+                              io_workers=args.io_workers,
+                              io_queue_depth=args.io_queue_depth,
+                              layout=args.layout,
+                              compaction_interval=args.compaction_interval,
+                              compaction_min_parts=args.compaction_min_parts,
+                              compaction_max_age=args.compaction_max_age,
+                              memtable=args.memtable,
+                              memtable_max_age=args.memtable_max_age,
+                              registration_cache_size=args.registration_cache_size,
+                              result_cache_bytes=args.result_cache_bytes,
+                              compression=args.compression,
+                              compression_level=args.compression_level,
+                              use_dictionary=args.use_dictionary,
+                              write_statistics=args.write_statistics
                               )
         
     elif args.cert_file is None and args.key_file is None:
         location = flight.Location.for_grpc_tcp(args.host, args.port)
-        server = ShootsServer(location, bucket_dir=args.bucket_dir, secret=args.secret)
+        server = ShootsServer(location,
+                              bucket_dir=args.bucket_dir,
+                              secret=args.secret,
+                              write_engine=args.write_engine,
+                              row_group_rows=args.row_group_rows,
+                              row_group_bytes=args.row_group_bytes,
+                              query_memory_limit=args.query_memory_limit,
+                              io_workers=args.io_workers,
+                              io_queue_depth=args.io_queue_depth,
+                              layout=args.layout,
+                              compaction_interval=args.compaction_interval,
+                              compaction_min_parts=args.compaction_min_parts,
+                              compaction_max_age=args.compaction_max_age,
+                              memtable=args.memtable,
+                              memtable_max_age=args.memtable_max_age,
+                              registration_cache_size=args.registration_cache_size,
+                              result_cache_bytes=args.result_cache_bytes,
+                              compression=args.compression,
+                              compression_level=args.compression_level,
+                              use_dictionary=args.use_dictionary,
+                              write_statistics=args.write_statistics)
     else:
         logger.error("Both cert_file and key_file must be provided, or neither should be.")
         raise ValueError("Both cert_file and key_file must be provided, or neither should be.")
@@ -0,0 +1,86 @@
+import pyarrow.dataset as ds
+from datafusion import SessionContext
+from datafusion.catalog import CatalogProvider, SchemaProvider, Table
+
+class TableReference:
+    """
+    A dataset referenced by a SQL query.
+
+    Attributes:
+        schema_name (str): The DataFusion schema the query refers to the dataset in, public for the query's own bucket.
+        table_name (str): The name the query refers to the dataset by, as normalized by DataFusion.
+        bucket (str): The bucket of the dataset, or None.
+        name (str): The name of the dataset.
+    """
+    def __init__(self, schema_name, table_name, bucket, name):
+        self.schema_name = schema_name
+        self.table_name = table_name
+        self.bucket = bucket
+        self.name = name
+
+    def key(self):
+        return (self.bucket, self.name)
+
+def find_references(catalog, sql, bucket=None):
+    """
+    Plans a SQL query against empty tables with the schemas of the datasets in the catalog, and returns
+    the schema of its result and the datasets it references, in the order DataFusion looked them up.
+
+    Unqualified table names are datasets in the given bucket, and bucket.name is a dataset in another
+    bucket. As with the tables of a SessionContext, unquoted names are lower cased by DataFusion, so they
+    also match datasets whose names only differ in case. Raises the DataFusion error if the query can't be planned.
+    """
+    references = {}
+    ctx = SessionContext()
+    ctx.register_catalog_provider("datafusion", _CatalogProbe(catalog, bucket, references))
+    schema = ctx.sql(sql).schema()
+    return schema, list(references.values())
+
+def _match(names, name):
+    if name in names:
+        return name
+    matches = [candidate for candidate in names if candidate.lower() == name]
+    return matches[0] if len(matches) == 1 else None
+
+class _CatalogProbe(CatalogProvider):
+    def __init__(self, catalog, bucket, references):
+        self.catalog = catalog
+        self.bucket = bucket
+        self.references = references
+
+    def schema_names(self):
+        return {"public"} | set(self.catalog.buckets())
+
+    def schema(self, name):
+        if name == "public":
+            return _SchemaProbe(self, name, self.bucket)
+        bucket = _match(self.catalog.buckets(), name)
+        if bucket is None:
+            return None
+        return _SchemaProbe(self, name, bucket)
+
+class _SchemaProbe(SchemaProvider):
+    def __init__(self, catalog_probe, schema_name, bucket):
+        self.catalog_probe = catalog_probe
+        self.schema_name = schema_name
+        self.bucket = bucket
+
+    def _dataset(self, table_name):
+        datasets = dict(self.catalog_probe.catalog.datasets(self.bucket))
+        name = _match(datasets, table_name)
+        return (name, datasets[name]) if name is not None else (None, None)
+
+    def table_names(self):
+        return {name for name, _ in self.catalog_probe.catalog.datasets(self.bucket)}
+
+    def table(self, table_name):
+        name, info = self._dataset(table_name)
+        if name is None:
+            return None
+        reference = TableReference(self.schema_name, table_name, self.bucket, name)
+        self.catalog_probe.references.setdefault((self.schema_name, table_name), reference)
+        # DataFrames can't be created while DataFusion is planning, so the empty table is a pyarrow dataset
+        return Table(ds.dataset(info.schema.empty_table()))
+
+    def table_exist(self, table_name):
+        return self._dataset(table_name)[0] is not None
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import uuid
+
+try:
+    from .resample import Resample
+except ImportError:
+    from shoots.resample import Resample
+
+class View:
+    """
+    A materialized view: a dataset that the server keeps up to date with the result of a SQL query or
+    a time series resample of a source dataset, refreshing it after puts to the source.
+
+    Attributes:
+        name (str): The name of the dataset the view is materialized as.
+        bucket (str): The bucket of the view's dataset, or None.
+        source (str): The name of the dataset the view is computed from.
+        source_bucket (str): The bucket of the source, or None.
+        sql (str): The SQL query against the source, or None for a resample.
+        resample (Resample): The resample of the source, or None for a SQL query.
+        refresh_lag (float): Seconds to wait after a put to the source before refreshing, so that
+            the puts made in the meantime are picked up by the same refresh.
+    """
+    def __init__(self, name, source, bucket=None, source_bucket=None, sql=None, resample=None, refresh_lag=0):
+        if (sql is None) == (resample is None):
+            raise ValueError("A view needs either sql, or a rule, time_col and aggregation_func")
+        if refresh_lag < 0:
+            raise ValueError(f"Invalid refresh lag {refresh_lag}, must be 0 or more seconds")
+        if (name, bucket) == (source, source_bucket):
+            raise ValueError(f"The view {name} can't be its own source")
+        self.name = name
+        self.bucket = bucket
+        self.source = source
+        self.source_bucket = source_bucket
+        self.sql = sql
+        self.resample = resample
+        self.refresh_lag = refresh_lag
+
+    @classmethod
+    def from_dict(cls, view_info):
+        resample = None
+        if view_info.get("sql") is None:
+            resample = Resample.from_dict(view_info)
+        return cls(view_info["name"],
+                   view_info["source"],
+                   bucket=view_info.get("bucket"),
+                   source_bucket=view_info.get("source_bucket"),
+                   sql=view_info.get("sql"),
+                   resample=resample,
+                   refresh_lag=float(view_info.get("refresh_lag", 0)))
+
+    def to_dict(self):
+        view_info = {"name":self.name,
+                     "bucket":self.bucket,
+                     "source":self.source,
+                     "source_bucket":self.source_bucket,
+                     "refresh_lag":self.refresh_lag}
+        if self.sql is not None:
+            view_info["sql"] = self.sql
+        else:
+            view_info.update(self.resample.to_dict())
+        return view_info
+
+    def resample_info(self):
+        """
+        Returns the resample action that refreshes the view. A SQL view is recomputed and replaced,
+        a resample view only resamples the rows added to the source since its last refresh.
+        """
+        resample_info = {"source":self.source,
+                         "target":self.name,
+                         "source_bucket":self.source_bucket,
+                         "target_bucket":self.bucket,
+                         "mode":"replace"}
+        if self.sql is not None:
+            resample_info["sql"] = self.sql
+        else:
+            resample_info.update(self.resample.to_dict())
+            resample_info["incremental"] = True
+        return resample_info
+
+class Views:
+    """
+    The materialized views of a server, by bucket and name, saved to a json file whenever they change
+    so that they outlive a restart.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._views = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as views_file:
+                for view_info in json.load(views_file):
+                    view = View.from_dict(view_info)
+                    self._views[(view.bucket, view.name)] = view
+
+    def put(self, view):
+        with self._lock:
+            self._views[(view.bucket, view.name)] = view
+            self._save()
+
+    def remove(self, bucket, name):
+        """
+        Removes a view, and returns it, or None if there is no such view.
+        """
+        with self._lock:
+            view = self._views.pop((bucket, name), None)
+            if view is not None:
+                self._save()
+            return view
+
+    def remove_bucket(self, bucket):
+        with self._lock:
+            self._views = {key:view for key, view in self._views.items() if view.bucket != bucket}
+            self._save()
+
+    def get(self, bucket, name):
+        with self._lock:
+            return self._views.get((bucket, name))
+
+    def list(self, bucket):
+        """
+        Returns the views in a bucket, in order of name.
+        """
+        with self._lock:
+            return sorted((view for view in self._views.values() if view.bucket == bucket), key=lambda view: view.name)
+
+    def of_source(self, bucket, name):
+        """
+        Returns the views computed from a dataset.
+        """
+        with self._lock:
+            return [view for view in self._views.values() if (view.source_bucket, view.source) == (bucket, name)]
+
+    def upstream(self, bucket, name):
+        """
+        Returns the bucket and name of the datasets a view is computed from, directly or through other views.
+        """
+        with self._lock:
+            sources = []
+            view = self._views.get((bucket, name))
+            while view is not None and (view.source_bucket, view.source) not in sources:
+                sources.append((view.source_bucket, view.source))
+                view = self._views.get((view.source_bucket, view.source))
+            return sources
+
+    def _save(self):
+        temp_path = os.path.join(os.path.dirname(self.path), f".{uuid.uuid4().hex}.tmp")
+        with open(temp_path, "w") as views_file:
+            json.dump([view.to_dict() for view in self._views.values()], views_file)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,83 @@
+from shoots import ShootsServer, ShootsClient, AsyncShootsClient, PutMode, BucketDeleteMode
+import pandas as pd
+import numpy as np
+from pyarrow.flight import Location
+import asyncio
+import threading
+import shutil
+import time
+import unittest
+
+class AsyncClientBenchmark(unittest.TestCase):
+    """
+    Compares the aggregate throughput of many puts and gets made one at a time with ShootsClient,
+    with that of the same calls made concurrently with AsyncShootsClient, at several concurrency limits.
+
+    Each put replaces its own dataframe, so the puts don't wait on each other's i/o queues,
+    and each get reads a different dataframe, so results aren't served from the result cache.
+    """
+    port = 8096
+    bucket_dir = "async_client_benchmark_buckets"
+    bucket = "benchmark"
+    n_requests = 64
+    n_rows = 100_000
+    concurrencies = [1, 4, 16]
+
+    @classmethod
+    def setUpClass(cls):
+        location = Location.for_grpc_tcp("localhost", cls.port)
+        cls.server = ShootsServer(location,
+                                  bucket_dir=cls.bucket_dir,
+                                  compaction_interval=None)
+        cls.server_thread = threading.Thread(target=cls.server.serve)
+        cls.server_thread.start()
+        cls.df = pd.DataFrame(np.random.rand(cls.n_rows, 4), columns=[f"column_{i}" for i in range(4)])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server_thread.join()
+        shutil.rmtree(cls.bucket_dir)
+
+    def _names(self):
+        return [f"df_{i}" for i in range(self.n_requests)]
+
+    def _run_sync(self):
+        client = ShootsClient("localhost", self.port)
+        start = time.perf_counter()
+        for name in self._names():
+            client.put(name, self.df, mode=PutMode.REPLACE, bucket=self.bucket)
+        put_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for name in self._names():
+            client.get(name, bucket=self.bucket)
+        get_seconds = time.perf_counter() - start
+        client.delete_bucket(self.bucket, mode=BucketDeleteMode.DELETE_CONTENTS)
+        return put_seconds, get_seconds
+
+    async def _run_async(self, concurrency):
+        async with AsyncShootsClient("localhost", self.port, max_concurrency=concurrency) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*[client.put(name, self.df, mode=PutMode.REPLACE, bucket=self.bucket)
+                                   for name in self._names()])
+            put_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await asyncio.gather(*[client.get(name, bucket=self.bucket) for name in self._names()])
+            get_seconds = time.perf_counter() - start
+            await client.delete_bucket(self.bucket, mode=BucketDeleteMode.DELETE_CONTENTS)
+        return put_seconds, get_seconds
+
+    def test_throughput(self):
+        results = {"sync":self._run_sync()}
+        for concurrency in self.concurrencies:
+            results[f"async x{concurrency}"] = asyncio.run(self._run_async(concurrency))
+
+        print(f"\n{self.n_requests} puts and gets of {self.n_rows} rows, {len(self.df.columns)} float columns")
+        print(f"{'client':>12} {'puts/sec':>10} {'gets/sec':>10}")
+        for client, (put_seconds, get_seconds) in results.items():
+            print(f"{client:>12} {self.n_requests / put_seconds:>10.1f} {self.n_requests / get_seconds:>10.1f}")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import asyncio
+import numpy as np
+import pandas as pd
+from insecure_test import InsecureTest
+from shoots import ShootsServer, AsyncShootsClient, PutMode, BucketDeleteMode
+from pyarrow.flight import Location
+
+class AsyncClientTest(InsecureTest, unittest.IsolatedAsyncioTestCase):
+    port = 8095
+    bucket_dir = "async_client_buckets"
+    def _set_up_server(self):
+        location = Location.for_grpc_tcp("localhost", self.port)
+        return ShootsServer(location,
+                            bucket_dir=self.bucket_dir,
+                            compaction_interval=None)
+
+    async def asyncSetUp(self):
+        # the tests of ShootsTestBase keep using the blocking shoots_client
+        self.async_client = AsyncShootsClient("localhost", self.port, max_concurrency=4)
+
+    async def asyncTearDown(self):
+        await self.async_client.close()
+
+    async def test_concurrent_puts_and_gets(self):
+        dataframes = {f"df_{i}":pd.DataFrame({"value":np.random.randn(1000)}) for i in range(10)}
+        await asyncio.gather(*[self.async_client.put(name, df, mode=PutMode.REPLACE, bucket="async")
+                               for name, df in dataframes.items()])
+
+        self.assertIn("async", await self.async_client.buckets())
+        listed = await self.async_client.list(bucket="async")
+        self.assertEqual([dataframe["name"] for dataframe in listed], sorted(dataframes))
+
+        results = await asyncio.gather(*[self.async_client.get(name, bucket="async") for name in dataframes])
+        for df, result in zip(dataframes.values(), results):
+            pd.testing.assert_frame_equal(df, result)
+
+        count = await self.async_client.get("df_0", sql="SELECT count(*) AS n FROM df_0", bucket="async")
+        self.assertEqual(count.n[0], 1000)
+
+        await asyncio.gather(*[self.async_client.delete(name, bucket="async") for name in dataframes])
+        self.assertEqual(await self.async_client.list(bucket="async"), [])
+        await self.async_client.delete_bucket("async", mode=BucketDeleteMode.DELETE_CONTENTS)
+
+    async def test_get_arrow_and_batches(self):
+        df = pd.DataFrame({"value":np.arange(1000)})
+        await self.async_client.put("arrow", df, mode=PutMode.REPLACE)
+        table = await self.async_client.get_arrow("arrow")
+        self.assertEqual(table.num_rows, 1000)
+        batches = [batch async for batch in self.async_client.get_batches("arrow", columns=["value"])]
+        self.assertEqual(sum(batch.num_rows for batch in batches), 1000)
+        await self.async_client.delete("arrow")
+
+    async def test_resample(self):
+        df = pd.DataFrame({"timestamp":pd.date_range("2024-01-01", periods=120, freq="1s"),
+                           "value":np.random.randn(120)})
+        await self.async_client.put("series", df, mode=PutMode.REPLACE)
+        res = await self.async_client.resample(source="series",
+                                                target="series_per_minute",
+                                                rule="1min",
+                                                time_col="timestamp",
+                                                aggregation_func="mean",
+                                                mode=PutMode.REPLACE)
+        self.assertEqual(res["target_rows"], 2)
+        await self.async_client.delete("series")
+        await self.async_client.delete("series_per_minute")
+
+    async def test_event_loop_is_not_blocked(self):
+        df = pd.DataFrame({"value":np.random.randn(2_000_000)})
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        ticker = asyncio.create_task(tick())
+        await self.async_client.put("large", df, mode=PutMode.REPLACE)
+        await self.async_client.get("large")
+        ticker.cancel()
+        self.assertGreater(ticks, 1)
+        await self.async_client.delete("large")
+
+    async def test_errors(self):
+        with self.assertRaises(FileNotFoundError):
+            await self.async_client.get("nothing")
+        with self.assertRaises(ValueError):
+            AsyncShootsClient("localhost", self.port, max_concurrency=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,14 @@
 from shoots import PutMode, BucketDeleteMode, DataFusionError, BucketNotEmptyError
 import pandas as pd
 import numpy as np
-from pyarrow.flight import FlightServerError
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow.flight import FlightServerError, FlightDescriptor
 import threading
+import json
+import os
 import shutil
+import tempfile
 import random
 import string
 import unittest
@@ -76,6 +81,243 @@ class ShootsTestBase(unittest.TestCase):
 
         self.shoots_client.delete("test1")
 
+    def test_append_with_other_columns(self):
+        self.shoots_client.put("columns", self.dataframe0, mode=PutMode.REPLACE)
+        with self.assertRaises(ValueError):
+            self.shoots_client.put("columns", pd.DataFrame({"z":[1.5]}), mode=PutMode.APPEND)
+        with self.assertRaises(ValueError):
+            self.shoots_client.put("columns", pa.table({"col2":["two"], "col1":[2]}), mode=PutMode.APPEND)
+
+        # the dataframe can still be read
+        self.assertEqual(list(self.shoots_client.get("columns").col1), [0])
+        self.assertEqual(self.shoots_client.get("columns", sql="SELECT count(*) AS n FROM columns").n[0], 1)
+        self.shoots_client.put("columns", pa.table({"col1":[1], "col2":["one"]}), mode=PutMode.APPEND)
+        self.assertEqual(list(self.shoots_client.get("columns").col1), [0, 1])
+
+        self.shoots_client.delete("columns")
+
+    def test_reads_see_whole_versions_during_writes(self):
+        df = self._generate_dataframe(1000)
+        large_df = self._generate_dataframe(5000)
+        self.shoots_client.put("versions", df, mode=PutMode.REPLACE)
+
+        writes_done = threading.Event()
+        lengths = set()
+        errors = []
+        def read_job():
+            read_client = self._set_up_shoots_client()
+            while not writes_done.is_set():
+                try:
+                    lengths.add(len(read_client.get("versions")))
+                    lengths.add(len(read_client.get("versions", "SELECT * FROM versions")))
+                except Exception as e:
+                    errors.append(e)
+        read_thread = threading.Thread(target=read_job)
+        read_thread.start()
+
+        for i in range(10):
+            self.shoots_client.put("versions", df, mode=PutMode.REPLACE)
+            self.shoots_client.put("versions", df, mode=PutMode.APPEND)
+            self.shoots_client.put("versions", large_df, mode=PutMode.REPLACE)
+        writes_done.set()
+        read_thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertTrue(lengths <= {1000, 2000, 5000}, lengths)
+        self.shoots_client.delete("versions")
+
+    def test_compaction_merges_small_parts(self):
+        self.shoots_client.put("compacted", self.dataframe0, mode=PutMode.REPLACE)
+        for i in range(11):
+            self.shoots_client.put("compacted", self.dataframe1, mode=PutMode.APPEND)
+        file_path = os.path.join(self.bucket_dir, "compacted.parquet")
+        self.assertEqual(len(self.server._parquet_parts(file_path)), 12)
+
+        self.assertTrue(self.server._compact_dataset(file_path))
+        self.assertEqual(len(self.server._parquet_parts(file_path)), 1)
+        self.assertEqual(len([f for f in os.listdir(file_path) if f.endswith(".parquet")]), 1)
+        res = self.shoots_client.get("compacted")
+        self.assertEqual(list(res.col1), [0] + [1] * 11)
+        res = self.shoots_client.get("compacted", "SELECT count(*) AS n FROM compacted")
+        self.assertEqual(res.n[0], 12)
+
+        # too few parts, and too new, to be merged yet
+        self.shoots_client.put("compacted", self.dataframe1, mode=PutMode.APPEND)
+        self.assertFalse(self.server._compact_dataset(file_path))
+        self.shoots_client.delete("compacted")
+
+    def test_compaction_of_replaced_dataframe_is_dropped(self):
+        file_path = os.path.join(self.bucket_dir, "recompacted.parquet")
+        self.shoots_client.put("recompacted", pd.DataFrame({"col1":[0]}), mode=PutMode.REPLACE)
+        for i in range(1, 3):
+            self.shoots_client.put("recompacted", pd.DataFrame({"col1":[i]}), mode=PutMode.APPEND)
+        parts, part_ids, parquet_files = self.server._open_compaction_run(file_path, force=True)
+        self.assertEqual(len(parts), 3)
+
+        # the dataframe is replaced and appended to while the parts are merged, so its parts have the same names
+        self.shoots_client.put("recompacted", pd.DataFrame({"col1":[100]}), mode=PutMode.REPLACE)
+        for i in range(101, 103):
+            self.shoots_client.put("recompacted", pd.DataFrame({"col1":[i]}), mode=PutMode.APPEND)
+        self.assertEqual(self.server._parquet_parts(file_path), parts)
+
+        temp_path = self.server._temp_path(file_path)
+        pq.write_table(parquet_files[0].read(), temp_path)
+        self.assertFalse(self.server._commit_compaction(file_path, temp_path, parts, part_ids))
+        self.assertEqual(list(self.shoots_client.get("recompacted").col1), [100, 101, 102])
+        self.shoots_client.delete("recompacted")
+
+    def test_query_reuses_registration(self):
+        self.shoots_client.put("registered", self.dataframe0, mode=PutMode.REPLACE)
+        sql = "SELECT * FROM registered"
+        self.shoots_client.get("registered", sql)
+        hits = self.shoots_client.stats()["registrations"]["hits"]
+
+        # a different query, so that it isn't answered from the result cache
+        self.assertEqual(len(self.shoots_client.get("registered", "SELECT col1 FROM registered")), 1)
+        self.assertEqual(self.shoots_client.stats()["registrations"]["hits"], hits + 1)
+
+        # a write invalidates the registration, so the query sees the new data
+        self.shoots_client.put("registered", self.dataframe1, mode=PutMode.APPEND)
+        self.assertEqual(len(self.shoots_client.get("registered", sql)), 2)
+        self.assertEqual(self.shoots_client.stats()["registrations"]["hits"], hits + 1)
+        self.shoots_client.delete("registered")
+
+    def test_query_results_are_cached(self):
+        self.shoots_client.put("cached", self.dataframe0, mode=PutMode.REPLACE)
+        sql = "SELECT * FROM cached WHERE col2 = 'zero'"
+        self.assertEqual(len(self.shoots_client.get("cached", sql)), 1)
+        hits = self.shoots_client.stats()["results"]["hits"]
+
+        res = self.shoots_client.get("cached", "SELECT *  FROM cached\n WHERE col2 = 'zero';")
+        self.assertEqual(list(res.col1), [0])
+        self.assertEqual(self.shoots_client.stats()["results"]["hits"], hits + 1)
+
+        # writes invalidate the cached results
+        self.shoots_client.put("cached", self.dataframe0, mode=PutMode.APPEND)
+        self.assertEqual(len(self.shoots_client.get("cached", sql)), 2)
+        self.assertEqual(self.shoots_client.stats()["results"]["hits"], hits + 1)
+        self.shoots_client.delete("cached")
+
+    def test_list_reads_metadata_from_catalog(self):
+        self.shoots_client.put("catalogued", self.dataframe0, mode=PutMode.REPLACE, bucket="catalog")
+        self.shoots_client.put("catalogued", self.dataframe1, mode=PutMode.APPEND, bucket="catalog")
+        self.assertIn("catalog", self.shoots_client.buckets())
+
+        criteria = json.dumps({"bucket":"catalog", "regex":None}).encode()
+        flights = list(self.flight_client.list_flights(criteria=criteria))
+        self.assertEqual(len(flights), 1)
+        self.assertEqual(flights[0].descriptor.path[0].decode(), "catalogued")
+        self.assertEqual(flights[0].total_records, 2)
+        self.assertGreater(flights[0].total_bytes, 0)
+
+        self.shoots_client.delete("catalogued", bucket="catalog")
+        self.assertEqual(list(self.flight_client.list_flights(criteria=criteria)), [])
+        self.shoots_client.delete_bucket("catalog")
+        self.assertNotIn("catalog", self.shoots_client.buckets())
+
+    def test_catalog_is_updated_by_appends(self):
+        self.shoots_client.put("appended", self.dataframe0, mode=PutMode.REPLACE)
+        self.shoots_client.put("appended", self.dataframe1, mode=PutMode.APPEND)
+        self.shoots_client.put("appended", self.dataframe0, mode=PutMode.APPEND)
+
+        # appends only read the footers of the new parts, which must add up to the same as reading all of them
+        info = self.server.catalog.get(None, "appended")
+        expected = self.server._read_dataset_info(os.path.join(self.bucket_dir, "appended.parquet"))
+        self.assertEqual(info.num_rows, expected.num_rows)
+        self.assertEqual(info.num_bytes, expected.num_bytes)
+        self.assertEqual(info.num_row_groups, expected.num_row_groups)
+        self.assertEqual(info.num_parts, expected.num_parts)
+        self.assertEqual(info.column_bytes, expected.column_bytes)
+        self.assertEqual(info.schema, expected.schema)
+        self.shoots_client.delete("appended")
+
+    def test_info_and_schema(self):
+        df = self._generate_dataframe_with_timestamp(1000)
+        self.shoots_client.put("described", df, mode=PutMode.REPLACE)
+
+        info = self.shoots_client.info("described")
+        self.assertEqual(info["num_rows"], 1000)
+        self.assertEqual(info["schema"].names, ["timestamp", "data"])
+        self.assertGreater(info["num_bytes"], 0)
+        self.assertGreaterEqual(info["num_row_groups"], 1)
+        self.assertGreaterEqual(info["estimated_bytes"], 16000)
+
+        sql = "SELECT data FROM described WHERE data > 0"
+        info = self.shoots_client.info("described", sql=sql)
+        self.assertEqual(info["schema"].names, ["data"])
+        self.assertEqual(info["num_rows"], -1)
+        self.assertGreaterEqual(info["estimated_bytes"], 8000)
+
+        self.assertEqual(self.shoots_client.schema("described").names, ["timestamp", "data"])
+        self.assertEqual(self.shoots_client.schema("described", sql=sql).names, ["data"])
+        self.assertEqual(self.flight_client.get_schema(FlightDescriptor.for_command(b'{"name":"described"}')).schema.names,
+                         ["timestamp", "data"])
+
+        # once the query has run, its result is cached and its size is known
+        rows = len(self.shoots_client.get("described", sql))
+        self.assertEqual(self.shoots_client.info("described", sql=sql)["num_rows"], rows)
+
+        with self.assertRaises(FileNotFoundError):
+            self.shoots_client.info("thereisnodataframenamedthis")
+        with self.assertRaises(DataFusionError):
+            self.shoots_client.schema("described", sql="SELECT nothing FROM described")
+        self.shoots_client.delete("described")
+
+    def test_get_with_columns_and_filter(self):
+        df = self._generate_dataframe_with_timestamp(1000)
+        df["flag"] = df.index % 2 == 0
+        self.shoots_client.put("pushdown", df, mode=PutMode.REPLACE)
+
+        res = self.shoots_client.get("pushdown", columns=["data"])
+        self.assertEqual(list(res.columns), ["data"])
+        self.assertEqual(len(res), 1000)
+
+        res = self.shoots_client.get("pushdown", 
+                                     columns=["timestamp", "data"],
+                                     filter=[("timestamp", ">=", "2020-01-01 00:00:09"),
+                                             ("flag", "==", True)])
+        self.assertEqual(list(res.columns), ["timestamp", "data"])
+        self.assertEqual(len(res), 50)
+
+        res = self.shoots_client.get("pushdown", filter=[("timestamp", "<", df.timestamp[10])])
+        self.assertEqual(list(res.columns), ["timestamp", "data", "flag"])
+        self.assertEqual(len(res), 10)
+
+        with self.assertRaises(ValueError):
+            self.shoots_client.get("pushdown", columns=["nothing"])
+        with self.assertRaises(ValueError):
+            self.shoots_client.get("pushdown", filter=[("data", "like", 1)])
+        self.shoots_client.delete("pushdown")
+
+    def test_writer_options_are_kept(self):
+        df = self._generate_dataframe(1000)
+        self.shoots_client.put("options", df, mode=PutMode.REPLACE, compression="zstd", row_group_rows=100)
+        self.shoots_client.put("options", df, mode=PutMode.APPEND)
+
+        parts = self.server._parquet_parts(os.path.join(self.bucket_dir, "options.parquet"))
+        self.assertEqual(len(parts), 2)
+        for part in parts:
+            metadata = pq.ParquetFile(part).metadata
+            self.assertEqual(metadata.num_row_groups, 10)
+            self.assertEqual(metadata.row_group(0).column(0).compression, "ZSTD")
+
+        info = self.shoots_client.info("options")
+        self.assertEqual(info["writer_options"]["compression"], "zstd")
+        self.assertEqual(len(self.shoots_client.get("options")), 2000)
+
+        with self.assertRaises(ValueError):
+            self.shoots_client.put("options", df, mode=PutMode.REPLACE, compression="lzma")
+        self.shoots_client.delete("options")
+
+    def test_put_coalesces_chunks(self):
+        df = self._generate_dataframe(1000)
+        self.shoots_client.put("test1", df, mode=PutMode.REPLACE, batch_size=10)
+        parts = self.server._parquet_parts(os.path.join(self.bucket_dir, "test1.parquet"))
+        parquet_file = pq.ParquetFile(parts[0])
+        self.assertEqual(parquet_file.metadata.num_row_groups, 1)
+        self.assertEqual(len(self.shoots_client.get("test1")), 1000)
+        self.shoots_client.delete("test1")
+
     def test_read_with_select_star(self):
         self.shoots_client.put("test1",self.dataframe0,mode=PutMode.ERROR)
         self.shoots_client.put("test1",self.dataframe1,mode=PutMode.APPEND)  
@@ -92,6 +334,21 @@ class ShootsTestBase(unittest.TestCase):
         self.assertEqual(res.shape[0],1)
         self.shoots_client.delete("test1")
     
+    def test_read_with_select_many_batches(self):
+        df = self._generate_dataframe(1000000)
+        self.shoots_client.put("test1", df, mode=PutMode.REPLACE)
+        sql = "SELECT int_col FROM test1 WHERE int_col < 50"
+        res = self.shoots_client.get("test1", sql)
+        self.assertEqual(res.shape[0], (df.int_col < 50).sum())
+        self.shoots_client.delete("test1")
+
+    def test_read_with_aggregate(self):
+        self.shoots_client.put("test1",self.dataframe0,mode=PutMode.ERROR)
+        self.shoots_client.put("test1",self.dataframe1,mode=PutMode.APPEND)
+        res = self.shoots_client.get("test1", "SELECT max(col1) AS max_col1 FROM test1")
+        self.assertEqual(res.max_col1[0], 1)
+        self.shoots_client.delete("test1")
+
     def test_read_write_to_bucket(self):
         bucket = "test_bucket"
         self.shoots_client.put("test1",self.dataframe0,mode=PutMode.REPLACE,bucket=bucket)
@@ -139,6 +396,32 @@ class ShootsTestBase(unittest.TestCase):
         buckets = self.shoots_client.buckets()
         self.assertNotIn(bucket, buckets)
 
+    def test_delete_bucket_drops_registrations(self):
+        bucket = "registered_bucket"
+        sql = "SELECT count(*) AS n FROM registered"
+        self.shoots_client.put("registered", pd.DataFrame({"x":[1, 2, 3]}), mode=PutMode.REPLACE, bucket=bucket)
+        self.assertEqual(self.shoots_client.get("registered", sql=sql, bucket=bucket).n[0], 3)
+
+        self.shoots_client.delete_bucket(bucket, mode=BucketDeleteMode.DELETE_CONTENTS)
+        with self.assertRaises(FileNotFoundError):
+            self.shoots_client.get("registered", sql=sql, bucket=bucket)
+        self.shoots_client.delete_bucket(bucket)
+
+    def test_delete_bucket_drops_cached_results(self):
+        bucket = "cached_bucket"
+        sql = "SELECT sum(x) AS total FROM cached"
+        self.shoots_client.put("cached", pd.DataFrame({"x":[1, 2, 3]}), mode=PutMode.REPLACE, bucket=bucket)
+        self.assertEqual(self.shoots_client.get("cached", sql=sql, bucket=bucket).total[0], 6)
+        file_path = os.path.join(self.bucket_dir, bucket, "cached.parquet")
+        version = self.server._dataset_version(file_path, [])
+        self.assertIsNotNone(self.server.results.get(file_path, version, sql))
+
+        self.shoots_client.delete_bucket(bucket, mode=BucketDeleteMode.DELETE_CONTENTS)
+        self.assertIsNone(self.server.results.get(file_path, version, sql))
+        with self.assertRaises(FileNotFoundError):
+            self.shoots_client.get("cached", sql=sql, bucket=bucket)
+        self.shoots_client.delete_bucket(bucket)
+
     def test_list(self):
         self.shoots_client.put("test1",self.dataframe0,mode=PutMode.REPLACE)
         self.shoots_client.put("test2",self.dataframe0,mode=PutMode.REPLACE)
@@ -170,6 +453,128 @@ class ShootsTestBase(unittest.TestCase):
         self.shoots_client.delete(source)
         self.shoots_client.delete("ten")
 
+    def test_sql_across_datasets(self):
+        orders = pd.DataFrame({"order_id":[1, 2, 3, 4], "customer_id":[10, 20, 10, 30]})
+        customers = pd.DataFrame({"customer_id":[10, 20], "customer_name":["ada", "grace"]})
+        self.shoots_client.put("orders", orders, mode=PutMode.REPLACE)
+        self.shoots_client.put("customers", customers, mode=PutMode.REPLACE, bucket="crm")
+        self.shoots_client.put("old_orders", orders[:1], mode=PutMode.REPLACE)
+
+        sql = """SELECT o.order_id, c.customer_name FROM orders o
+                 JOIN crm.customers c ON o.customer_id = c.customer_id ORDER BY o.order_id"""
+        df = self.shoots_client.get("orders", sql=sql)
+        self.assertEqual(list(df.customer_name), ["ada", "grace", "ada"])
+        self.assertEqual(self.shoots_client.schema("orders", sql=sql).names, ["order_id", "customer_name"])
+
+        # a cached result isn't returned once any of the datasets changes
+        self.shoots_client.put("customers", customers.assign(customer_name=["ada", "hopper"]), mode=PutMode.REPLACE, bucket="crm")
+        df = self.shoots_client.get("orders", sql=sql)
+        self.assertEqual(list(df.customer_name), ["ada", "hopper", "ada"])
+
+        sql = "SELECT order_id FROM orders UNION ALL SELECT order_id FROM old_orders"
+        res = self.shoots_client.resample(source="orders", target="all_orders", sql=sql)
+        self.assertEqual(res["target_rows"], 5)
+
+        with self.assertRaises(DataFusionError):
+            self.shoots_client.get("orders", sql="SELECT * FROM orders JOIN crm.nothing USING (customer_id)")
+
+        self.shoots_client.delete("orders")
+        self.shoots_client.delete("old_orders")
+        self.shoots_client.delete("all_orders")
+        self.shoots_client.delete_bucket("crm", mode=BucketDeleteMode.DELETE_CONTENTS)
+
+    def test_get_arrow_and_batches(self):
+        df = pd.DataFrame({"timestamp":pd.date_range("2024-01-01", periods=1000, freq="1s"),
+                           "value":np.arange(1000)})
+        self.shoots_client.put("arrow", df, mode=PutMode.REPLACE, batch_size=100)
+
+        table = self.shoots_client.get_arrow("arrow")
+        self.assertIsInstance(table, pa.Table)
+        pd.testing.assert_frame_equal(table.to_pandas(), df)
+
+        table = self.shoots_client.get_arrow("arrow", sql="SELECT sum(value) AS total FROM arrow")
+        self.assertEqual(table.column("total").to_pylist(), [df.value.sum()])
+
+        batches = self.shoots_client.get_batches("arrow", columns=["value"], filter=[("value", ">=", 500)])
+        num_rows = 0
+        for batch in batches:
+            self.assertIsInstance(batch, pa.RecordBatch)
+            self.assertEqual(batch.schema.names, ["value"])
+            num_rows += batch.num_rows
+        self.assertEqual(num_rows, 500)
+
+        # the rest of the stream is cancelled if the batches aren't all read
+        batches = self.shoots_client.get_batches("arrow")
+        next(batches)
+        batches.close()
+
+        with self.assertRaises(FileNotFoundError):
+            self.shoots_client.get_batches("nothing")
+        with self.assertRaises(DataFusionError):
+            self.shoots_client.get_arrow("arrow", sql="SELECT nothing FROM arrow")
+
+        self.shoots_client.delete("arrow")
+
+    def test_put_arrow_and_parquet(self):
+        table = pa.table({"id":pa.array(range(1000), pa.int32()),
+                          "timestamp":pa.array(range(1000), pa.timestamp("us")),
+                          "label":pa.array([str(i % 7) for i in range(1000)])})
+
+        self.shoots_client.put("from_table", table, mode=PutMode.REPLACE, batch_size=300)
+        self.assertTrue(self.shoots_client.get_arrow("from_table").equals(table))
+
+        # batches larger than batch_size are sliced, and the reader is consumed as it is sent
+        reader = pa.RecordBatchReader.from_batches(table.schema, table.to_batches(max_chunksize=400))
+        self.shoots_client.put("from_reader", reader, mode=PutMode.REPLACE, batch_size=300)
+        self.assertTrue(self.shoots_client.get_arrow("from_reader").equals(table))
+
+        self.shoots_client.put("from_reader", table.to_batches()[0], mode=PutMode.APPEND)
+        self.assertEqual(self.shoots_client.info("from_reader")["num_rows"], 2000)
+
+        upload_dir = tempfile.mkdtemp()
+        parquet_path = os.path.join(upload_dir, "upload.parquet")
+        pq.write_table(table, parquet_path, row_group_size=250)
+        self.shoots_client.put("from_file", parquet_path, mode=PutMode.REPLACE, batch_size=100)
+        self.assertTrue(self.shoots_client.get_arrow("from_file").equals(table))
+        shutil.rmtree(upload_dir)
+
+        with self.assertRaises(FileNotFoundError):
+            self.shoots_client.put("from_file", parquet_path, mode=PutMode.REPLACE)
+
+        for name in ["from_table", "from_reader", "from_file"]:
+            self.shoots_client.delete(name)
+
+    def test_sql_over_glob(self):
+        days = []
+        for day in range(1, 4):
+            df = pd.DataFrame({"timestamp":pd.date_range(f"2024-01-0{day}", periods=10, freq="1h"),
+                               "value":np.arange(10, dtype="int32" if day == 1 else "int64")})
+            if day == 3:
+                df["note"] = "late"
+            self.shoots_client.put(f"day_2024-01-0{day}", df, mode=PutMode.REPLACE, bucket="days")
+            days.append(df)
+        self.shoots_client.put("day_2024-02-01", days[0], mode=PutMode.REPLACE, bucket="days")
+        # on servers with the memtable enabled, as in MemTableTest, this append is buffered and must be included too
+        self.shoots_client.put("day_2024-01-03", days[2][:2], mode=PutMode.APPEND, bucket="days")
+
+        sql = "SELECT count(*) AS n, sum(value) AS total, count(note) AS notes FROM january"
+        df = self.shoots_client.get("january", sql=sql, glob="day_2024-01-*", bucket="days")
+        self.assertEqual(list(df.iloc[0]), [32, 136, 12])
+
+        df = self.shoots_client.get("all_days", glob="*", bucket="days")
+        self.assertEqual(len(df), 42)
+        self.assertEqual(list(df.columns), ["timestamp", "value", "note"])
+
+        # a cached result isn't returned once any of the matching datasets changes
+        self.shoots_client.delete("day_2024-01-02", bucket="days")
+        df = self.shoots_client.get("january", sql=sql, glob="day_2024-01-*", bucket="days")
+        self.assertEqual(df.n[0], 22)
+
+        with self.assertRaises(FileNotFoundError):
+            self.shoots_client.get("march", glob="day_2024-03-*", bucket="days")
+
+        self.shoots_client.delete_bucket("days", mode=BucketDeleteMode.DELETE_CONTENTS)
+
     def test_resample_with_bad_sql(self):
         df_name = "100x"
         self.shoots_client.put(df_name,self.dataframe0,mode=PutMode.REPLACE)
@@ -278,6 +683,66 @@ class ShootsTestBase(unittest.TestCase):
                                    target="yyyy",
                                    sql=sql)
 
+    def test_resample_matches_pandas(self):
+        df = self._generate_dataframe_with_timestamp(100000)
+        df["count"] = np.arange(len(df))
+        name = "resample_source"
+        self.shoots_client.put(name=name, dataframe=df, mode=PutMode.REPLACE)
+
+        for aggregation_func in ["mean", "max", "first", "count"]:
+            res = self.shoots_client.resample(source=name,
+                                              target="resampled",
+                                              rule="5s",
+                                              time_col="timestamp",
+                                              aggregation_func=aggregation_func,
+                                              mode=PutMode.REPLACE)
+            self.assertEqual(res["source_rows"], 100000)
+            expected = getattr(df.set_index("timestamp").resample("5s"), aggregation_func)().reset_index()
+            pd.testing.assert_frame_equal(self.shoots_client.get("resampled"), expected, check_dtype=False)
+
+        with self.assertRaises(ValueError):
+            self.shoots_client.resample(source=name, target="resampled", rule="5 parsecs",
+                                        time_col="timestamp", aggregation_func="mean")
+        with self.assertRaises(ValueError):
+            self.shoots_client.resample(source=name, target="resampled", rule="5s",
+                                        time_col="data", aggregation_func="mean")
+
+        self.shoots_client.delete(name)
+        self.shoots_client.delete("resampled")
+
+    def test_resample_incremental(self):
+        timestamps = pd.date_range(start="2020-01-01", periods=1250, freq="100ms")
+        df = pd.DataFrame({"timestamp":timestamps, "value":np.arange(1250, dtype=float)})
+        name = "incremental_source"
+        self.shoots_client.put(name=name, dataframe=df[:950], mode=PutMode.REPLACE)
+
+        # the first run resamples the whole source, ending in the bin that is still filling at 90s
+        res = self.shoots_client.resample(source=name, target="rollup", rule="10s", time_col="timestamp",
+                                          aggregation_func="mean", incremental=True)
+        self.assertEqual(res["target_rows"], 10)
+        self.assertEqual(pd.Timestamp(res["watermark"]), pd.Timestamp("2020-01-01 00:01:30"))
+
+        self.shoots_client.put(name=name, dataframe=df[950:], mode=PutMode.APPEND)
+        res = self.shoots_client.resample(source=name, target="rollup", rule="10s", time_col="timestamp",
+                                          aggregation_func="mean", incremental=True)
+        # only the bins from 90s on are aggregated again
+        self.assertEqual(res["target_rows"], 4)
+        expected = df.set_index("timestamp").resample("10s").mean().reset_index()
+        pd.testing.assert_frame_equal(self.shoots_client.get("rollup"), expected, check_dtype=False)
+
+        # a different rule starts over
+        res = self.shoots_client.resample(source=name, target="rollup", rule="1min", time_col="timestamp",
+                                          aggregation_func="max", incremental=True)
+        self.assertEqual(res["target_rows"], 3)
+        expected = df.set_index("timestamp").resample("1min").max().reset_index()
+        pd.testing.assert_frame_equal(self.shoots_client.get("rollup"), expected, check_dtype=False)
+
+        with self.assertRaises(ValueError):
+            self.shoots_client.resample(source=name, target="rollup", sql=f"SELECT * FROM {name}", incremental=True)
+
+        self.shoots_client.delete(name)
+        self.shoots_client.delete("rollup")
+
     def _generate_dataframe(self, num_rows):
         integers = np.random.randint(0, 100, size=num_rows)  # Random integers between 0 and 99
         floats = np.random.random(size=num_rows)  # Random floats
@@ -335,6 +800,35 @@ class ShootsTestBase(unittest.TestCase):
         self.shoots_client.delete("test2",
                         bucket="listybucket")
 
+    def test_list_with_filters_and_pages(self):
+        names = ["sensor_a", "sensor_b", "sensor_c", "weather_a"]
+        for name in names:
+            self.shoots_client.put(name, self.dataframe0, mode=PutMode.REPLACE, bucket="filterbucket")
+
+        try:
+            listed = self.shoots_client.list(bucket="filterbucket", regex="_a$")
+            self.assertEqual([d["name"] for d in listed], ["sensor_a", "weather_a"])
+
+            listed = self.shoots_client.list(bucket="filterbucket", prefix="sensor_")
+            self.assertEqual([d["name"] for d in listed], ["sensor_a", "sensor_b", "sensor_c"])
+
+            pages = []
+            page = self.shoots_client.list(bucket="filterbucket", prefix="sensor_", limit=2)
+            while page:
+                pages.append([d["name"] for d in page])
+                page = self.shoots_client.list(bucket="filterbucket", 
+                                               prefix="sensor_",
+                                               limit=2, 
+                                               continuation_token=page[-1]["name"])
+            self.assertEqual(pages, [["sensor_a", "sensor_b"], ["sensor_c"]])
+
+            with self.assertRaises(ValueError):
+                self.shoots_client.list(bucket="filterbucket", regex="[")
+            with self.assertRaises(ValueError):
+                self.shoots_client.list(bucket="filterbucket", limit=0)
+        finally:
+            self.shoots_client.delete_bucket("filterbucket", mode=BucketDeleteMode.DELETE_CONTENTS)
+
     def test_ping(self):
         result = self.shoots_client.ping()
         self.assertEqual(result,"pong")
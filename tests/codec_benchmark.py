@@ -0,0 +1,77 @@
+from shoots import ShootsServer
+from shoots.parquet_writer import WriterOptions
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+from pyarrow.flight import Location
+import shutil
+import time
+import unittest
+
+class CodecBenchmark(unittest.TestCase):
+    """
+    Compares the file size, write speed and scan speed of the parquet compression codecs,
+    on data shaped like that of tests/large_datasets_test.py: 10 float columns of 100 repeated random rows.
+
+    The server is not started, the benchmark calls the write and read paths directly,
+    so client conversion and network costs are excluded. The pyarrow write engine is used,
+    since it supports all of the codecs.
+    """
+    port = 8093
+    bucket_dir = "codec_benchmark_buckets"
+    dataset_name = "benchmark"
+    n_rows = 10_000_000
+    batch_size = 500_000
+    codecs = ["none", "snappy", "lz4", "zstd", "gzip", "brotli"]
+
+    @classmethod
+    def setUpClass(cls):
+        n_cols = 10
+        small_data = np.random.rand(100, n_cols)
+        data = np.tile(small_data, (cls.n_rows // small_data.shape[0], 1))
+        df = pd.DataFrame(data, columns=[f'column_{i}' for i in range(1, n_cols + 1)])
+        cls.batches = pa.Table.from_pandas(df).to_batches(max_chunksize=cls.batch_size)
+
+    def _run_codec(self, server, codec):
+        file_path = server._create_file_path(f"{self.dataset_name}_{codec}")
+        start = time.perf_counter()
+        server._write_batches(file_path, self.batches, "replace", writer_options=WriterOptions(compression=codec))
+        write_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parquet_files, buffered_batches = server._open_dataset(file_path)
+        schema = parquet_files[0].schema_arrow
+        num_rows = sum(batch.num_rows for batch in server._iter_parquet_batches(parquet_files, schema, buffered_batches))
+        scan_seconds = time.perf_counter() - start
+        self.assertEqual(num_rows, self.n_rows)
+
+        start = time.perf_counter()
+        schema, batches = server._read_with_pushdown(file_path, None, file_path, ["column_1", "column_2"], None)
+        self.assertEqual(sum(batch.num_rows for batch in batches), self.n_rows)
+        projected_scan_seconds = time.perf_counter() - start
+
+        num_bytes = server._read_dataset_info(file_path).num_bytes
+        return num_bytes, write_seconds, scan_seconds, projected_scan_seconds
+
+    def test_codecs(self):
+        location = Location.for_grpc_tcp("localhost", self.port)
+        server = ShootsServer(location,
+                              bucket_dir=self.bucket_dir,
+                              write_engine="pyarrow",
+                              compaction_interval=None)
+        results = {}
+        try:
+            for codec in self.codecs:
+                results[codec] = self._run_codec(server, codec)
+        finally:
+            server.shutdown()
+            shutil.rmtree(self.bucket_dir)
+
+        print(f"\n{self.n_rows} rows, {len(self.batches[0].schema)} float columns")
+        print(f"{'codec':>8} {'MB':>8} {'write rows/sec':>16} {'scan rows/sec':>16} {'2 column scan rows/sec':>24}")
+        for codec, (num_bytes, write_seconds, scan_seconds, projected_scan_seconds) in results.items():
+            print(f"{codec:>8} {num_bytes / 1024 / 1024:>8.1f} {self.n_rows / write_seconds:>16,.0f} "
+                  f"{self.n_rows / scan_seconds:>16,.0f} {self.n_rows / projected_scan_seconds:>24,.0f}")
+
+if __name__ == '__main__':
+    unittest.main()
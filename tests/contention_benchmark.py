@@ -0,0 +1,84 @@
+import unittest
+import threading
+import time
+import numpy as np
+import pandas as pd
+from shoots import ShootsServer, ShootsClient, PutMode, BucketDeleteMode
+from pyarrow.flight import Location
+
+class ContentionBenchmark(unittest.TestCase):
+    """
+    Measures read latency for several clients reading the same dataset while another
+    client appends a trickle of small dataframes to it, like tests/observe.py.
+    """
+    port = 8088
+    bucket_dir = "contention_benchmark_buckets"
+    readers = 10
+    duration = 20
+    append_interval = 0.05
+
+    def setUp(self):
+        location = Location.for_grpc_tcp("localhost", self.port)
+        self.server = ShootsServer(location, self.bucket_dir)
+        self.server_thread = threading.Thread(target=self.server.serve)
+        self.server_thread.start()
+        self.client = ShootsClient("localhost", self.port)
+
+        num_rows = 1000000
+        self.client.put("contended",
+                        pd.DataFrame({'column1': range(num_rows)}),
+                        mode=PutMode.REPLACE,
+                        bucket="test_bucket")
+
+    def tearDown(self):
+        self.client.delete_bucket("test_bucket", BucketDeleteMode.DELETE_CONTENTS)
+        self.server.shutdown()
+        self.server_thread.join()
+
+    def test_read_latency_under_appends(self):
+        stop = threading.Event()
+        append_latencies = []
+        read_latencies = []
+
+        def append_job():
+            client = ShootsClient("localhost", self.port)
+            start_value = 1000000
+            while not stop.is_set():
+                dataframe = pd.DataFrame({'column1': range(start_value, start_value + 50)})
+                start = time.perf_counter()
+                client.put("contended", dataframe, mode=PutMode.APPEND, bucket="test_bucket")
+                append_latencies.append(time.perf_counter() - start)
+                start_value += 50
+                time.sleep(self.append_interval)
+
+        def read_job(reader):
+            client = ShootsClient("localhost", self.port)
+            i = 0
+            while not stop.is_set():
+                sql = None
+                if (i + reader) % 2:
+                    sql = "SELECT max(column1) FROM contended"
+                start = time.perf_counter()
+                client.get("contended", bucket="test_bucket", sql=sql)
+                read_latencies.append(time.perf_counter() - start)
+                i += 1
+
+        threads = [threading.Thread(target=append_job)]
+        threads += [threading.Thread(target=read_job, args=(reader,)) for reader in range(self.readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(self.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        print(f"\n{self.readers} readers and 1 appender for {self.duration}s")
+        for label, latencies in [("read", read_latencies), ("append", append_latencies)]:
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+            print(f"{label:>6}: {len(latencies)} requests, p50 {p50:.1f}ms, p90 {p90:.1f}ms, "
+                  f"p99 {p99:.1f}ms, max {max(latencies) * 1000:.1f}ms")
+        self.assertGreater(len(read_latencies), 0)
+        self.assertGreater(len(append_latencies), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import threading
+import time
+from shoots.io_executor import IOExecutor
+
+class IOExecutorTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = IOExecutor(max_workers=4, max_queue_depth=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_reads_run_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def read():
+            # all three reads must be running at once to pass the barrier
+            barrier.wait()
+
+        futures = [self.executor.submit("dataset", read, {}, read_only=True) for _ in range(3)]
+        for future in futures:
+            future.result()
+        self.assertFalse(barrier.broken)
+
+    def test_writer_is_not_starved_by_readers(self):
+        events = []
+        release_reader = threading.Event()
+
+        def read(name):
+            release_reader.wait(5)
+            events.append(name)
+
+        def write():
+            events.append("write")
+
+        first_read = self.executor.submit("dataset", read, {"name":"first read"}, read_only=True)
+        write_future = self.executor.submit("dataset", write, {})
+        # this read arrives after the write, so it must wait for the write to finish
+        second_read = self.executor.submit("dataset", read, {"name":"second read"}, read_only=True)
+        time.sleep(0.1)
+        self.assertEqual(events, [])
+
+        release_reader.set()
+        for future in [first_read, write_future, second_read]:
+            future.result()
+        self.assertEqual(events, ["first read", "write", "second read"])
+
+    def test_writes_run_in_order(self):
+        events = []
+
+        def write(i):
+            time.sleep(0.01)
+            events.append(i)
+
+        futures = []
+        for i in range(10):
+            futures.append(self.executor.submit("dataset", write, {"i":i}))
+        for future in futures:
+            future.result()
+        self.assertEqual(events, list(range(10)))
+
+    def test_datasets_do_not_block_each_other(self):
+        release = threading.Event()
+        blocked = self.executor.submit("blocked", release.wait, {"timeout":5})
+        self.executor.run("other", lambda: None, {})
+        self.assertFalse(blocked.done())
+        release.set()
+        blocked.result()
+
+    def test_full_queue_blocks_submit(self):
+        release = threading.Event()
+        self.executor.submit("dataset", release.wait, {"timeout":5})
+        # the first write is running, so these two fill the queue
+        self.executor.submit("dataset", lambda: None, {})
+        self.executor.submit("dataset", lambda: None, {})
+        self.assertEqual(self.executor.queue_depths(), {"dataset":2})
+
+        submitted = threading.Event()
+        def submit():
+            self.executor.submit("dataset", lambda: None, {})
+            submitted.set()
+        thread = threading.Thread(target=submit)
+        thread.start()
+        self.assertFalse(submitted.wait(0.2))
+
+        release.set()
+        thread.join(5)
+        self.assertTrue(submitted.is_set())
+
+    def test_exceptions_are_returned_to_the_caller(self):
+        def fail():
+            raise ValueError("failed")
+        with self.assertRaises(ValueError):
+            self.executor.run("dataset", fail, {})
+        # the dataset's queue keeps working after a failure
+        self.assertEqual(self.executor.run("dataset", lambda: 1, {}), 1)
+
+    def test_operations_waiting_at_shutdown_fail(self):
+        release = threading.Event()
+        running = self.executor.submit("dataset", release.wait, {"timeout":5})
+        waiting = self.executor.submit("dataset", lambda: None, {})
+        self.executor.shutdown(wait=False)
+        release.set()
+        self.assertTrue(running.result(5))
+        with self.assertRaises(RuntimeError):
+            waiting.result(5)
+        with self.assertRaises(RuntimeError):
+            self.executor.submit("dataset", lambda: None, {})
+        self.assertEqual(self.executor.queue_depths(), {})
+
+    def test_idle_queues_are_evicted(self):
+        for i in range(100):
+            self.executor.run(f"dataset_{i}", lambda: None, {})
+        time.sleep(0.1)
+        self.assertEqual(self.executor.queue_depths(), {})
+
+if __name__ == '__main__':
+    unittest.main()
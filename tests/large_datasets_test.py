@@ -1,9 +1,11 @@
 from shoots import PutMode, BucketDeleteMode, ShootsServer, ShootsClient
 import pandas as pd
 import numpy as np
-from pyarrow.flight import Location
+from pyarrow.flight import Location, Ticket
 import threading
 import shutil
+import json
+import time
 import unittest
 
 class LargeDatasetsTest(unittest.TestCase):
@@ -57,6 +59,18 @@ class LargeDatasetsTest(unittest.TestCase):
 
         self.client.delete(self.dataset_name)
     
+    def test_time_to_first_batch(self):
+        self.client.put(self.dataset_name, dataframe=self.large_df)
+
+        ticket = Ticket(json.dumps({"name":self.dataset_name, "bucket":None}))
+        start = time.perf_counter()
+        reader = self.client.client.do_get(ticket)
+        reader.read_chunk()
+        print(f"time to first batch: {time.perf_counter() - start:.3f}s")
+        reader.cancel()
+
+        self.client.delete(self.dataset_name)
+
     def test_batch_size(self):
         batch_sizes = [1000000]#, 5000, 10000]
         
@@ -0,0 +1,157 @@
+import unittest
+import threading
+import time
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+from insecure_test import InsecureTest
+from shoots import ShootsServer, PutMode
+from pyarrow.flight import Location
+
+class MemTableTest(InsecureTest):
+    port = 8090
+    bucket_dir = "memtable_buckets"
+    def _set_up_server(self):
+        location = Location.for_grpc_tcp("localhost", self.port)
+        return ShootsServer(location,
+                            bucket_dir=self.bucket_dir,
+                            row_group_rows=10_000,
+                            memtable=True,
+                            memtable_max_age=3600)
+
+    def _dataframe(self, start, num_rows):
+        return pd.DataFrame({"col1":range(start, start + num_rows)})
+
+    def _table(self, start, num_rows):
+        return pa.Table.from_pandas(self._dataframe(start, num_rows))
+
+    def _parts(self, name):
+        return self.server._parquet_parts(os.path.join(self.bucket_dir, f"{name}.parquet"))
+
+    def _without_memtable(self, test):
+        # for the tests of ShootsTestBase that count the parts written by small appends, which are buffered here
+        self.server.memtable = False
+        try:
+            test()
+        finally:
+            self.server.memtable = True
+
+    def test_compaction_merges_small_parts(self):
+        self._without_memtable(super().test_compaction_merges_small_parts)
+
+    def test_compaction_of_replaced_dataframe_is_dropped(self):
+        self._without_memtable(super().test_compaction_of_replaced_dataframe_is_dropped)
+
+    def test_writer_options_are_kept(self):
+        self._without_memtable(super().test_writer_options_are_kept)
+
+    def test_small_appends_are_buffered_and_read(self):
+        self.shoots_client.put("buffered", self._dataframe(0, 10), mode=PutMode.REPLACE)
+        self.shoots_client.put("buffered", self._dataframe(10, 10), mode=PutMode.APPEND)
+        self.shoots_client.put("buffered", self._dataframe(20, 10), mode=PutMode.APPEND)
+        self.assertEqual(len(self._parts("buffered")), 1)
+
+        res = self.shoots_client.get("buffered")
+        self.assertEqual(list(res.col1), list(range(30)))
+        res = self.shoots_client.get("buffered", "SELECT count(*) AS n FROM buffered WHERE col1 >= 5")
+        self.assertEqual(res.n[0], 25)
+
+        res = self.shoots_client.get("buffered", columns=["col1"], filter=[("col1", ">=", 25)])
+        self.assertEqual(list(res.col1), list(range(25, 30)))
+
+        self.server._flush_memtables(force=True)
+        self.assertEqual(len(self._parts("buffered")), 2)
+        res = self.shoots_client.get("buffered")
+        self.assertEqual(list(res.col1), list(range(30)))
+        self.shoots_client.delete("buffered")
+
+    def test_full_memtable_is_flushed(self):
+        self.shoots_client.put("full", self._dataframe(0, 1000), mode=PutMode.REPLACE)
+        for i in range(1, 11):
+            self.shoots_client.put("full", self._dataframe(i * 1000, 1000), mode=PutMode.APPEND)
+
+        # the flusher runs in the background, once a row group of rows is buffered
+        for _ in range(50):
+            if len(self._parts("full")) == 2:
+                break
+            time.sleep(0.1)
+        self.assertEqual(len(self._parts("full")), 2)
+        self.assertEqual(list(self.shoots_client.get("full").col1), list(range(11_000)))
+        self.shoots_client.delete("full")
+
+    def test_large_append_is_written_after_buffered_rows(self):
+        self.shoots_client.put("large", self._dataframe(0, 10), mode=PutMode.REPLACE)
+        self.shoots_client.put("large", self._dataframe(10, 10), mode=PutMode.APPEND)
+        self.shoots_client.put("large", self._dataframe(20, 20_000), mode=PutMode.APPEND)
+        self.assertEqual(len(self._parts("large")), 3)
+        self.assertEqual(list(self.shoots_client.get("large").col1), list(range(20_020)))
+        self.shoots_client.delete("large")
+
+    def test_replace_discards_buffered_rows(self):
+        self.shoots_client.put("replaced", self._dataframe(0, 10), mode=PutMode.REPLACE)
+        self.shoots_client.put("replaced", self._dataframe(10, 10), mode=PutMode.APPEND)
+        self.shoots_client.put("replaced", self._dataframe(100, 5), mode=PutMode.REPLACE)
+        self.server._flush_memtables(force=True)
+        self.assertEqual(list(self.shoots_client.get("replaced").col1), list(range(100, 105)))
+        self.shoots_client.delete("replaced")
+
+    def test_small_append_with_other_columns_is_rejected(self):
+        self.shoots_client.put("mismatched", self._dataframe(0, 10), mode=PutMode.REPLACE)
+        with self.assertRaises(ValueError):
+            self.shoots_client.put("mismatched", pd.DataFrame({"z":[1.5]}), mode=PutMode.APPEND)
+        self.assertEqual(self.server._buffered_rows(os.path.join(self.bucket_dir, "mismatched.parquet")), 0)
+        self.assertEqual(list(self.shoots_client.get("mismatched").col1), list(range(10)))
+        self.shoots_client.delete("mismatched")
+
+    def test_flush_does_not_recreate_a_removed_dataframe(self):
+        self.shoots_client.put("removed", self._dataframe(0, 10), mode=PutMode.REPLACE)
+        self.shoots_client.put("removed", self._dataframe(10, 10), mode=PutMode.APPEND)
+        # removed from under the server, so its buffered rows are still there
+        file_path = os.path.join(self.bucket_dir, "removed.parquet")
+        os.remove(file_path)
+        self.server._flush_memtables(force=True)
+        self.assertFalse(os.path.exists(file_path))
+        self.assertEqual(self.server._buffered_rows(file_path), 0)
+        # the catalog isn't told about files removed from under the server
+        self.server.catalog.remove(None, "removed")
+
+    def test_shutdown_flushes_buffered_rows(self):
+        location = Location.for_grpc_tcp("localhost", self.port + 1)
+        bucket_dir = "memtable_shutdown_buckets"
+        server = ShootsServer(location, bucket_dir=bucket_dir, memtable=True)
+        try:
+            file_path = server._create_file_path("shutdown")
+            server._write_batches(file_path, self._table(0, 10).to_batches(), "error")
+            server._write_batches(file_path, self._table(10, 10).to_batches(), "append")
+            self.assertEqual(len(server._parquet_parts(file_path)), 1)
+            server._shutdown_server()
+            self.assertEqual(len(server._parquet_parts(file_path)), 2)
+        finally:
+            shutil.rmtree(bucket_dir)
+
+    def test_shutdown_waits_for_the_flusher(self):
+        bucket_dir = "memtable_flusher_buckets"
+        server = ShootsServer(Location.for_grpc_tcp("localhost", 8098), bucket_dir=bucket_dir, memtable=True)
+        flush_memtables = server._flush_memtables
+        lock = threading.Lock()
+        running = []
+        concurrent = []
+        def flush(force=False):
+            with lock:
+                running.append(force)
+                concurrent.append(len(running))
+            time.sleep(0.1)
+            flush_memtables(force)
+            with lock:
+                running.remove(force)
+        server._flush_memtables = flush
+        try:
+            server._shutdown_server()
+            # the flusher's last pass and the final forced flush don't overlap
+            self.assertEqual(max(concurrent), 1)
+        finally:
+            shutil.rmtree(bucket_dir)
+
+if __name__ == '__main__':
+    unittest.main()
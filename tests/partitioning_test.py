@@ -0,0 +1,101 @@
+import unittest
+import datetime
+import os
+import pandas as pd
+import pyarrow as pa
+from insecure_test import InsecureTest
+from shoots import ShootsServer, PutMode
+from shoots.partitioning import Partitioning
+from pyarrow.flight import Location
+
+class PartitioningTest(InsecureTest):
+    port = 8092
+    bucket_dir = "partitioning_buckets"
+    def _set_up_server(self):
+        location = Location.for_grpc_tcp("localhost", self.port)
+        return ShootsServer(location,
+                            bucket_dir=self.bucket_dir,
+                            compaction_interval=None)
+
+    def _dataframe(self, start, days):
+        # one row per hour
+        timestamps = pd.date_range(start=start, periods=days * 24, freq="h")
+        return pd.DataFrame({"timestamp":timestamps, "value":range(len(timestamps))})
+
+    def _file_path(self, name):
+        return os.path.join(self.bucket_dir, f"{name}.parquet")
+
+    def test_rows_are_written_to_partitions(self):
+        self.shoots_client.put("events", self._dataframe("2024-01-01", 3),
+                               mode=PutMode.REPLACE,
+                               partition_by="timestamp")
+        self.assertEqual(sorted(d for d in os.listdir(self._file_path("events")) if "=" in d),
+                         ["timestamp_day=2024-01-01", "timestamp_day=2024-01-02", "timestamp_day=2024-01-03"])
+
+        # appends follow the partitioning of the dataframe
+        self.shoots_client.put("events", self._dataframe("2024-01-03", 2), mode=PutMode.APPEND)
+        self.assertIn("timestamp_day=2024-01-04", os.listdir(self._file_path("events")))
+        self.assertEqual(len(self.server._parquet_parts(self._file_path("events"))), 5)
+        self.assertEqual(len(self.shoots_client.get("events")), 5 * 24)
+
+        sql = "SELECT count(*) AS n FROM events WHERE timestamp BETWEEN '2024-01-03 00:00:00' AND '2024-01-03 23:00:00'"
+        self.assertEqual(self.shoots_client.get("events", sql).n[0], 48)
+        self.shoots_client.delete("events")
+
+    def test_filter_skips_partitions(self):
+        self.shoots_client.put("pruned", self._dataframe("2024-01-01", 5),
+                               mode=PutMode.REPLACE,
+                               partition_by="timestamp")
+
+        filters = [["timestamp", ">=", "2024-01-04 12:00:00"]]
+        _, files, _ = self.server._open_dataset_files(self._file_path("pruned"), filters)
+        for file in files:
+            file.close()
+        self.assertEqual(len(files), 2)
+
+        res = self.shoots_client.get("pruned", columns=["value"], filter=filters)
+        self.assertEqual(list(res.value), list(range(3 * 24 + 12, 5 * 24)))
+        res = self.shoots_client.get("pruned", filter=[["timestamp", "<", "2024-01-01 03:00:00"]])
+        self.assertEqual(len(res), 3)
+        self.shoots_client.delete("pruned")
+
+    def test_compaction_keeps_partitions_apart(self):
+        self.shoots_client.put("compacted", self._dataframe("2024-01-01", 2),
+                               mode=PutMode.REPLACE,
+                               partition_by="timestamp")
+        for _ in range(3):
+            self.shoots_client.put("compacted", self._dataframe("2024-01-01", 2), mode=PutMode.APPEND)
+        self.assertEqual(len(self.server._parquet_parts(self._file_path("compacted"))), 8)
+
+        while self.server._compact_dataset(self._file_path("compacted"), force=True):
+            pass
+        parts = self.server._parquet_parts(self._file_path("compacted"))
+        self.assertEqual(sorted(os.path.basename(os.path.dirname(part)) for part in parts),
+                         ["timestamp_day=2024-01-01", "timestamp_day=2024-01-02"])
+        self.assertEqual(len(self.shoots_client.get("compacted")), 4 * 2 * 24)
+        self.shoots_client.delete("compacted")
+
+    def test_invalid_partitioning(self):
+        with self.assertRaises(ValueError):
+            self.shoots_client.put("invalid", self._dataframe("2024-01-01", 1),
+                                   mode=PutMode.REPLACE,
+                                   partition_by="value")
+        with self.assertRaises(ValueError):
+            self.shoots_client.put("invalid", self._dataframe("2024-01-01", 1),
+                                   mode=PutMode.REPLACE,
+                                   partition_by="timestamp",
+                                   partition_granularity="week")
+        self.assertEqual(self.shoots_client.list(), [])
+
+    def test_partition_bounds(self):
+        partitioning = Partitioning("ts", "month")
+        self.assertEqual(partitioning.bounds("ts_month=2024-12"),
+                         (datetime.datetime(2024, 12, 1), datetime.datetime(2025, 1, 1)))
+        column_type = pa.timestamp("ns")
+        self.assertFalse(partitioning.may_match("ts_month=2024-12", [["ts", ">=", "2025-01-01"]], column_type))
+        self.assertTrue(partitioning.may_match("ts_month=2024-12", [["ts", ">", "2024-12-31 23:00:00"]], column_type))
+        self.assertTrue(partitioning.may_match("ts_month=2024-12", [["other", "==", 1]], column_type))
+        self.assertFalse(partitioning.may_match("ts_month=__HIVE_DEFAULT_PARTITION__", [["ts", "<", "2025-01-01"]], column_type))
+
+if __name__ == '__main__':
+    unittest.main()
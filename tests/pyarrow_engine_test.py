@@ -0,0 +1,28 @@
+from insecure_test import InsecureTest
+from shoots import ShootsServer, PutMode
+from pyarrow.flight import Location
+import os
+
+class PyArrowEngineTest(InsecureTest):
+    port = 8086
+    bucket_dir = "pyarrow_engine_buckets"
+    def _set_up_server(self):
+        location = Location.for_grpc_tcp("localhost", self.port)
+        return ShootsServer(location,
+                            bucket_dir=self.bucket_dir,
+                            write_engine="pyarrow")
+
+    def test_append_writes_parts(self):
+        self.shoots_client.put("parts",self.dataframe0,mode=PutMode.REPLACE)
+        self.assertTrue(os.path.isfile(os.path.join(self.bucket_dir, "parts.parquet")))
+
+        self.shoots_client.put("parts",self.dataframe1,mode=PutMode.APPEND)
+        self.shoots_client.put("parts",self.dataframe1,mode=PutMode.APPEND)
+        parts = os.listdir(os.path.join(self.bucket_dir, "parts.parquet"))
+        self.assertEqual(sorted(parts), ["_manifest.json", "part-00000.parquet", "part-00001.parquet", "part-00002.parquet"])
+
+        res = self.shoots_client.get("parts")
+        self.assertEqual(list(res.col1), [0, 1, 1])
+        self.assertEqual(len(self.shoots_client.list()), 1)
+
+        self.shoots_client.delete("parts")
@@ -0,0 +1,64 @@
+import unittest
+import pyarrow as pa
+from shoots.result_cache import ResultCache, normalize_sql
+
+class ResultCacheTest(unittest.TestCase):
+    def _table(self, num_rows):
+        return pa.table({"col1":pa.array(range(num_rows), type=pa.int64())})
+
+    def test_normalize_sql(self):
+        self.assertEqual(normalize_sql(" SELECT *\n  FROM  df ; "), "SELECT * FROM df")
+        # whitespace inside of quotes is part of the query
+        self.assertEqual(normalize_sql("SELECT 'a  b'  FROM df"), "SELECT 'a  b' FROM df")
+
+    def test_versions_are_not_shared(self):
+        cache = ResultCache(max_bytes=1024 * 1024)
+        cache.put("df", 1, "SELECT * FROM df", self._table(10))
+        self.assertIsNotNone(cache.get("df", 1, "SELECT  *  FROM df"))
+        self.assertIsNone(cache.get("df", 2, "SELECT * FROM df"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_least_recently_used_are_evicted(self):
+        table = self._table(100)
+        cache = ResultCache(max_bytes=table.nbytes * 2, max_entry_bytes=table.nbytes)
+        cache.put("df", 1, "SELECT 1", table)
+        cache.put("df", 1, "SELECT 2", table)
+        cache.get("df", 1, "SELECT 1")
+        cache.put("df", 1, "SELECT 3", table)
+        self.assertIsNotNone(cache.get("df", 1, "SELECT 1"))
+        self.assertIsNone(cache.get("df", 1, "SELECT 2"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertLessEqual(cache.stats()["bytes"], cache.max_bytes)
+
+    def test_uncacheable_results(self):
+        cache = ResultCache(max_bytes=1024)
+        cache.put("df", 1, "SELECT * FROM df", self._table(1000))
+        cache.put("df", 1, "SELECT now() FROM df", self._table(1))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_large_results_are_not_cached(self):
+        table = self._table(100)
+        cache = ResultCache(max_bytes=table.nbytes * 8)
+        self.assertEqual(cache.max_entry_bytes, table.nbytes)
+        cache.put("df", 1, "SELECT 1", table)
+        cache.put("df", 1, "SELECT 2", self._table(101))
+        self.assertIsNotNone(cache.get("df", 1, "SELECT 1"))
+        self.assertIsNone(cache.get("df", 1, "SELECT 2"))
+
+    def test_invalidate(self):
+        cache = ResultCache(max_bytes=1024 * 1024)
+        cache.put("df", 1, "SELECT 1", self._table(1))
+        cache.put("other", 1, "SELECT 1", self._table(1))
+        cache.invalidate("df")
+        self.assertIsNone(cache.get("df", 1, "SELECT 1"))
+        self.assertIsNotNone(cache.get("other", 1, "SELECT 1"))
+
+    def test_invalidate_queries_over_several_datasets(self):
+        cache = ResultCache(max_bytes=1024 * 1024)
+        cache.put(("df", "other"), (1, 1), "SELECT 1", self._table(1))
+        cache.invalidate("other")
+        self.assertIsNone(cache.get(("df", "other"), (1, 1), "SELECT 1"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,8 +12,16 @@ if __name__ == "__main__":
     from insecure_test import InsecureTest
     from jwt_test import JWTTest
     from queue_test import QueueTest
+    from pyarrow_engine_test import PyArrowEngineTest
+    from io_executor_test import IOExecutorTest
+    from segmented_layout_test import SegmentedLayoutTest
+    from memtable_test import MemTableTest
+    from result_cache_test import ResultCacheTest
+    from partitioning_test import PartitioningTest
+    from views_test import ViewsTest
+    from async_client_test import AsyncClientTest
 
-    test_cases = [TLSTest, JWTTest, InsecureTest, QueueTest]
+    test_cases = [TLSTest, JWTTest, InsecureTest, QueueTest, PyArrowEngineTest, IOExecutorTest, SegmentedLayoutTest, MemTableTest, ResultCacheTest, PartitioningTest, ViewsTest, AsyncClientTest]
 
     with concurrent.futures.ThreadPoolExecutor() as executor:
         executor.map(run_test_case, test_cases)
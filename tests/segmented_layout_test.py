@@ -0,0 +1,54 @@
+from insecure_test import InsecureTest
+from shoots import ShootsServer, PutMode
+from pyarrow.flight import Location
+import os
+import shutil
+import threading
+import time
+
+class SegmentedLayoutTest(InsecureTest):
+    port = 8089
+    bucket_dir = "segmented_layout_buckets"
+    def _set_up_server(self):
+        location = Location.for_grpc_tcp("localhost", self.port)
+        return ShootsServer(location,
+                            bucket_dir=self.bucket_dir,
+                            layout="segmented")
+
+    def test_datasets_are_directories(self):
+        self.shoots_client.put("segments",self.dataframe0,mode=PutMode.REPLACE)
+        file_path = os.path.join(self.bucket_dir, "segments.parquet")
+        self.assertTrue(os.path.isdir(file_path))
+        self.assertTrue(os.path.isfile(os.path.join(file_path, "_manifest.json")))
+
+        self.shoots_client.put("segments",self.dataframe1,mode=PutMode.APPEND)
+        self.shoots_client.put("segments",self.dataframe1,mode=PutMode.REPLACE)
+        res = self.shoots_client.get("segments")
+        self.assertEqual(list(res.col1), [1])
+        self.assertEqual([dataframe["name"] for dataframe in self.shoots_client.list()], ["segments"])
+        # a dataframe stored as a directory is not a bucket
+        self.assertEqual(self.shoots_client.buckets(), [])
+
+        self.shoots_client.delete("segments")
+
+    def test_shutdown_waits_for_compaction(self):
+        bucket_dir = "segmented_shutdown_buckets"
+        server = ShootsServer(Location.for_grpc_tcp("localhost", 8097),
+                              bucket_dir=bucket_dir,
+                              layout="segmented",
+                              compaction_interval=0.01)
+        started = threading.Event()
+        committed = []
+        def compact_dataset(file_path):
+            started.set()
+            time.sleep(0.2)
+            # a compaction commits through the i/o executor, which mustn't be shut down yet
+            committed.append(server._enqueue_io_request(lambda file_path: True, args={"file_path":file_path}))
+        server._list_parts_dirs = lambda: [os.path.join(bucket_dir, "compacting.parquet")]
+        server._compact_dataset = compact_dataset
+        try:
+            self.assertTrue(started.wait(5))
+            server._shutdown_server()
+            self.assertEqual(committed, [True])
+        finally:
+            shutil.rmtree(bucket_dir)
@@ -0,0 +1,167 @@
+import unittest
+import os
+import time
+import numpy as np
+import pandas as pd
+from insecure_test import InsecureTest
+from shoots import ShootsServer, PutMode, BucketDeleteMode
+from shoots.views import Views
+from pyarrow.flight import Location
+
+class ViewsTest(InsecureTest):
+    port = 8094
+    bucket_dir = "views_buckets"
+    def _set_up_server(self):
+        location = Location.for_grpc_tcp("localhost", self.port)
+        return ShootsServer(location,
+                            bucket_dir=self.bucket_dir,
+                            compaction_interval=None)
+
+    def _dataframe(self, start, num_rows):
+        timestamps = pd.date_range(start=start, periods=num_rows, freq="1s")
+        return pd.DataFrame({"timestamp":timestamps, "value":np.random.randn(num_rows)})
+
+    def _wait_for_rows(self, name, num_rows, timeout=10):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            df = self.shoots_client.get(name)
+            if len(df) == num_rows:
+                return df
+            time.sleep(0.05)
+        self.fail(f"{name} didn't reach {num_rows} rows")
+
+    def test_resample_view_is_refreshed_on_append(self):
+        df = self._dataframe("2024-01-01", 150)
+        self.shoots_client.put("events", df[:90], mode=PutMode.REPLACE)
+        res = self.shoots_client.create_view("events_per_minute",
+                                             source="events",
+                                             rule="1min",
+                                             time_col="timestamp",
+                                             aggregation_func="mean")
+        self.assertEqual(res["target_rows"], 2)
+
+        self.shoots_client.put("events", df[90:], mode=PutMode.APPEND)
+        view = self._wait_for_rows("events_per_minute", 3)
+        expected = df.set_index("timestamp").resample("1min").mean().reset_index()
+        pd.testing.assert_frame_equal(view, expected, check_dtype=False)
+
+        self.shoots_client.drop_view("events_per_minute")
+        self.shoots_client.delete("events")
+        self.shoots_client.delete("events_per_minute")
+
+    def test_views_of_views(self):
+        df = self._dataframe("2024-01-01", 120)
+        self.shoots_client.put("readings", df, mode=PutMode.REPLACE)
+        self.shoots_client.create_view("high_readings",
+                                       source="readings",
+                                       sql="SELECT * FROM readings WHERE value > 0")
+        self.shoots_client.create_view("high_count",
+                                       source="high_readings",
+                                       sql="SELECT count(*) AS n FROM high_readings",
+                                       bucket="dashboards")
+        self.assertEqual(self.shoots_client.get("high_count", bucket="dashboards").n[0], (df.value > 0).sum())
+
+        more = self._dataframe("2024-01-02", 60)
+        self.shoots_client.put("readings", more, mode=PutMode.APPEND)
+        expected = (df.value > 0).sum() + (more.value > 0).sum()
+        deadline = time.time() + 10
+        while self.shoots_client.get("high_count", bucket="dashboards").n[0] != expected:
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.05)
+
+        self.assertEqual([view["name"] for view in self.shoots_client.views(bucket="dashboards")], ["high_count"])
+        self.shoots_client.drop_view("high_count", bucket="dashboards")
+        self.shoots_client.drop_view("high_readings")
+        self.assertEqual(self.shoots_client.views(), [])
+        self.shoots_client.delete_bucket("dashboards", mode=BucketDeleteMode.DELETE_CONTENTS)
+        self.shoots_client.delete("readings")
+        self.shoots_client.delete("high_readings")
+
+    def test_replace_refreshes_views_of_views_fully(self):
+        self.shoots_client.put("sensor", self._dataframe("2024-01-01", 3 * 3600), mode=PutMode.REPLACE)
+        self.shoots_client.create_view("sensor_per_minute",
+                                       source="sensor",
+                                       rule="1min",
+                                       time_col="timestamp",
+                                       aggregation_func="mean")
+        self.shoots_client.create_view("sensor_per_hour",
+                                       source="sensor_per_minute",
+                                       rule="1h",
+                                       time_col="timestamp",
+                                       aggregation_func="mean")
+
+        # the replacement changes every hour, not only the last one that an incremental refresh recomputes
+        df = self._dataframe("2024-01-01", 3 * 3600)
+        self.shoots_client.put("sensor", df, mode=PutMode.REPLACE)
+        expected = df.set_index("timestamp").resample("1min").mean().resample("1h").mean().reset_index()
+        deadline = time.time() + 10
+        while not np.allclose(self.shoots_client.get("sensor_per_hour").value, expected.value):
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.05)
+
+        self.shoots_client.drop_view("sensor_per_hour")
+        self.shoots_client.drop_view("sensor_per_minute")
+        for name in ["sensor", "sensor_per_minute", "sensor_per_hour"]:
+            self.shoots_client.delete(name)
+
+    def test_refresh_lag(self):
+        df = self._dataframe("2024-01-01", 30)
+        self.shoots_client.put("lagged", df[:10], mode=PutMode.REPLACE)
+        self.shoots_client.create_view("lagged_count",
+                                       source="lagged",
+                                       sql="SELECT count(*) AS n FROM lagged",
+                                       refresh_lag=1)
+        # both appends are picked up by the refresh a second after the first
+        self.shoots_client.put("lagged", df[10:20], mode=PutMode.APPEND)
+        self.shoots_client.put("lagged", df[20:], mode=PutMode.APPEND)
+        self.assertEqual(self.shoots_client.get("lagged_count").n[0], 10)
+        time.sleep(1.5)
+        self.assertEqual(self.shoots_client.get("lagged_count").n[0], 30)
+
+        self.shoots_client.drop_view("lagged_count")
+        self.shoots_client.delete("lagged")
+        self.shoots_client.delete("lagged_count")
+
+    def test_views_are_saved(self):
+        self.shoots_client.put("saved", self._dataframe("2024-01-01", 10), mode=PutMode.REPLACE)
+        self.shoots_client.create_view("saved_max",
+                                       source="saved",
+                                       rule="1h",
+                                       time_col="timestamp",
+                                       aggregation_func="max",
+                                       refresh_lag=2.5)
+        views = Views(os.path.join(self.bucket_dir, ".views.json"))
+        self.assertEqual(views.get(None, "saved_max").to_dict(), self.shoots_client.views()[0])
+        self.assertEqual(views.get(None, "saved_max").refresh_lag, 2.5)
+
+        self.shoots_client.drop_view("saved_max")
+        self.shoots_client.delete("saved")
+        self.shoots_client.delete("saved_max")
+
+    def test_invalid_views(self):
+        self.shoots_client.put("plain", self._dataframe("2024-01-01", 10), mode=PutMode.REPLACE)
+        self.shoots_client.put("other", self._dataframe("2024-01-01", 10), mode=PutMode.REPLACE)
+        with self.assertRaises(FileNotFoundError):
+            self.shoots_client.create_view("view", source="nothing", sql="SELECT * FROM nothing")
+        with self.assertRaises(FileExistsError):
+            self.shoots_client.create_view("other", source="plain", sql="SELECT * FROM plain")
+        with self.assertRaises(ValueError):
+            self.shoots_client.create_view("plain", source="plain", sql="SELECT * FROM plain")
+        with self.assertRaises(ValueError):
+            self.shoots_client.create_view("view", source="plain", rule="1min", time_col="timestamp",
+                                           aggregation_func="mean", sql="SELECT * FROM plain")
+
+        self.shoots_client.create_view("view", source="plain", sql="SELECT * FROM plain")
+        self.shoots_client.create_view("cycle", source="view", sql="SELECT * FROM view")
+        with self.assertRaises(ValueError):
+            self.shoots_client.create_view("view", source="cycle", sql="SELECT * FROM cycle")
+        with self.assertRaises(FileNotFoundError):
+            self.shoots_client.drop_view("plain")
+
+        for view in self.shoots_client.views():
+            self.shoots_client.drop_view(view["name"])
+        for name in ["plain", "other", "view", "cycle"]:
+            self.shoots_client.delete(name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+from shoots import ShootsServer
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+from pyarrow.flight import Location
+import shutil
+import time
+import unittest
+
+class WriteEngineBenchmark(unittest.TestCase):
+    """
+    Compares the rows/sec of the server's put path for the fastparquet and pyarrow write engines.
+
+    The server is not started, the benchmark streams the record batches that do_put() receives
+    into _write_batches() directly, so client conversion and network costs are excluded.
+    """
+    port = 8087
+    bucket_dir = "write_engine_benchmark_buckets"
+    dataset_name = "benchmark"
+    n_rows = 10_000_000
+    batch_size = 500_000
+
+    @classmethod
+    def setUpClass(cls):
+        n_cols = 8
+        small_data = np.random.rand(100, n_cols)
+        data = np.tile(small_data, (cls.n_rows // small_data.shape[0], 1))
+        df = pd.DataFrame(data, columns=[f'column_{i}' for i in range(1, n_cols + 1)])
+        # string and timestamp columns like those in tests/observe.py
+        df["timestamp"] = pd.date_range(start='2020-01-01', periods=cls.n_rows, freq='10ms')
+        df["language"] = np.tile(["en", "de", "fr", "es", "ja"], cls.n_rows // 5)
+        cls.batches = pa.Table.from_pandas(df).to_batches(max_chunksize=cls.batch_size)
+
+    def _run_engine(self, write_engine):
+        location = Location.for_grpc_tcp("localhost", self.port)
+        bucket_dir = f"{self.bucket_dir}_{write_engine}"
+        server = ShootsServer(location,
+                              bucket_dir=bucket_dir,
+                              write_engine=write_engine)
+        try:
+            file_path = server._create_file_path(self.dataset_name)
+            start = time.perf_counter()
+            server._write_batches(file_path, iter(self.batches), "error")
+            elapsed = time.perf_counter() - start
+            num_rows = server._read_dataset_info(file_path).num_rows
+            self.assertEqual(num_rows, self.n_rows)
+        finally:
+            server.shutdown()
+            shutil.rmtree(bucket_dir)
+        return self.n_rows / elapsed
+
+    def test_write_engines(self):
+        results = {}
+        for write_engine in ["fastparquet", "pyarrow"]:
+            results[write_engine] = self._run_engine(write_engine)
+
+        print(f"\nputting {self.n_rows} rows in batches of {self.batch_size}")
+        for write_engine, rows_per_second in results.items():
+            print(f"{write_engine:>12}: {rows_per_second:,.0f} rows/sec")
+        print(f"     speedup: {results['pyarrow'] / results['fastparquet']:.2f}x")